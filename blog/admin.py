@@ -1,6 +1,21 @@
-from django.contrib import admin
+import io
 
-from .models import Client, Parking, ParkingLot, ParkingSpace, Reservation
+from django.contrib import admin, messages
+from django.shortcuts import redirect
+from django.template.response import TemplateResponse
+from django.urls import path
+
+from .forms import ReservationImportForm
+from .imports import detect_format, import_reservations
+from .models import (
+    Client,
+    Parking,
+    ParkingLot,
+    ParkingSpace,
+    Reservation,
+    Tariff,
+    TariffBand,
+)
 
 
 @admin.register(Client)
@@ -14,6 +29,7 @@ class ParkingSpaceAdmin(admin.ModelAdmin):
     list_display = ("label", "floor_number", "space_type", "is_active")
     list_filter = ("space_type", "is_active")
     search_fields = ("label",)
+    readonly_fields = ("sensor_occupied", "sensor_reported_at")
 
 
 @admin.register(Reservation)
@@ -29,6 +45,78 @@ class ReservationAdmin(admin.ModelAdmin):
     )
     list_filter = ("reservation_status", "parking_slot")
     search_fields = ("reservation_number", "client__full_name", "parking_slot__label")
+    readonly_fields = ("arrived_at", "departed_at")
+    change_list_template = "admin/blog/reservation/change_list.html"
+
+    def get_urls(self):
+        urls = [
+            path(
+                "import/",
+                self.admin_site.admin_view(self.import_view),
+                name="blog_reservation_import",
+            ),
+        ]
+        return urls + super().get_urls()
+
+    def import_view(self, request):
+        """Upload a CSV/JSONL file and stream it through the bulk importer."""
+        if not self.has_add_permission(request):
+            messages.error(request, "You are not allowed to import reservations.")
+            return redirect("admin:blog_reservation_changelist")
+
+        form = ReservationImportForm(request.POST or None, request.FILES or None)
+        if request.method == "POST" and form.is_valid():
+            upload = form.cleaned_data["file"]
+            fmt = form.cleaned_data["format"] or detect_format(upload.name)
+            stream = io.TextIOWrapper(upload.file, encoding="utf-8", newline="")
+            result = import_reservations(
+                stream, fmt, dry_run=form.cleaned_data["dry_run"]
+            )
+            level = messages.WARNING if result.errors else messages.SUCCESS
+            self.message_user(
+                request,
+                f"{result.created} of {result.rows} rows "
+                f"{'validated' if form.cleaned_data['dry_run'] else 'imported'} "
+                f"in {result.elapsed:.2f}s ({result.rows_per_second:.0f} rows/s).",
+                level,
+            )
+            for line, message in result.errors[:20]:
+                self.message_user(request, f"Line {line}: {message}", messages.ERROR)
+            if len(result.errors) > 20:
+                self.message_user(
+                    request,
+                    f"{len(result.errors) - 20} more errors not shown; use the "
+                    "import_reservations command for a full report.",
+                    messages.ERROR,
+                )
+            return redirect("admin:blog_reservation_changelist")
+
+        context = {
+            **self.admin_site.each_context(request),
+            "opts": self.model._meta,
+            "form": form,
+            "title": "Import reservations",
+        }
+        return TemplateResponse(request, "admin/blog/reservation/import.html", context)
+
+
+class TariffBandInline(admin.TabularInline):
+    model = TariffBand
+    extra = 0
+
+
+@admin.register(Tariff)
+class TariffAdmin(admin.ModelAdmin):
+    list_display = (
+        "name",
+        "parking_lot",
+        "space_type",
+        "hourly_rate",
+        "daily_cap",
+        "is_active",
+    )
+    list_filter = ("is_active", "space_type")
+    inlines = [TariffBandInline]
 
 
 admin.site.register(Parking)
@@ -0,0 +1,172 @@
+"""Best-fit slot allocation.
+
+Active slots are held per process in a ``SlotIndex``: one list per lot and
+floor, sorted by ``dimension_limit``. The candidates for a vehicle are found
+by bisecting each list at the vehicle's dimension and merging the tails, so
+they come smallest-fitting first. They are checked in small batches against
+the availability bitmaps (``blog.availability``) until a free one turns up,
+which keeps large slots free for large vehicles.
+
+The index is rebuilt when the slot version stored in the Django cache
+changes (slot writes bump it), or at the latest after ``INDEX_MAX_AGE``
+seconds for deployments without a shared cache.
+
+``book_best_slot`` relies on the database overlap guard (migration 0012)
+and on a row lock on the slot. Two requests racing for the last free slot
+cannot both book it: the loser moves on to the next candidate.
+"""
+
+from __future__ import annotations
+
+import heapq
+import threading
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from itertools import islice
+
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.utils import timezone
+
+from blog.availability import busy_slot_ids
+
+SLOT_INDEX_VERSION_KEY = "allocation:version"
+INDEX_MAX_AGE = 300
+# Candidates checked against reservations per query.
+CANDIDATE_BATCH = 50
+# Slots tried by ``book_best_slot`` before giving up on a contended window.
+BOOK_ATTEMPTS = 5
+
+_lock = threading.Lock()
+_index = {"version": None, "index": None, "built_at": 0.0}
+
+
+class NoSlotAvailable(Exception):
+    """No active slot fitting the vehicle is free for the window."""
+
+
+class SlotIndex:
+    """Active slots per ``(lot_id, floor_number)``, sorted by ``dimension_limit``."""
+
+    def __init__(self, slots):
+        groups = defaultdict(list)
+        for pk, lot_id, floor, dimension_limit, label in slots:
+            groups[lot_id, floor].append((dimension_limit, label or "", pk))
+        self._groups = {}
+        for key, entries in groups.items():
+            entries.sort()
+            self._groups[key] = ([entry[0] for entry in entries], entries)
+
+    def __len__(self):
+        return sum(len(entries) for _, entries in self._groups.values())
+
+    def candidates(self, dimension, lot=None, floor=None):
+        """Yield the ids of slots fitting ``dimension``, smallest first.
+
+        Ties are broken by label. ``lot`` and ``floor`` narrow the groups
+        searched.
+        """
+        tails = []
+        for (lot_id, floor_number), (limits, entries) in self._groups.items():
+            if lot is not None and lot_id != lot:
+                continue
+            if floor is not None and floor_number != floor:
+                continue
+            tails.append(islice(entries, bisect_left(limits, dimension), None))
+        for _, _, pk in heapq.merge(*tails):
+            yield pk
+
+
+def build_slot_index():
+    from blog.models import ParkingSpace
+
+    return SlotIndex(
+        ParkingSpace.objects.filter(is_active=True).values_list(
+            "pk", "parking_lot_id", "floor_number", "dimension_limit", "label"
+        )
+    )
+
+
+def bump_slot_index_version():
+    """Invalidate the slot index in every process."""
+    cache.set(SLOT_INDEX_VERSION_KEY, timezone.now().timestamp(), None)
+
+
+def get_slot_index():
+    version = cache.get(SLOT_INDEX_VERSION_KEY)
+    with _lock:
+        stale = time.monotonic() - _index["built_at"] > INDEX_MAX_AGE
+        if _index["index"] is None or _index["version"] != version or stale:
+            _index["index"] = build_slot_index()
+            _index["version"] = version
+            _index["built_at"] = time.monotonic()
+        return _index["index"]
+
+
+def best_slot(dimension, start_time, end_time, lot=None, floor=None, exclude=()):
+    """Return the id of the smallest free slot fitting ``dimension``, or None.
+
+    When the window covers the current time, slots whose sensor reports a
+    vehicle (``blog.sensors``) count as taken as well.
+    """
+    from blog.models import ParkingSpace
+
+    candidates = (
+        pk
+        for pk in get_slot_index().candidates(dimension, lot=lot, floor=floor)
+        if pk not in exclude
+    )
+    current = start_time <= timezone.now() < end_time
+    while batch := list(islice(candidates, CANDIDATE_BATCH)):
+        busy = busy_slot_ids(start_time, end_time, slot_ids=batch)
+        if current:
+            busy.update(
+                ParkingSpace.objects.filter(
+                    pk__in=batch, sensor_occupied=True
+                ).values_list("pk", flat=True)
+            )
+        for pk in batch:
+            if pk not in busy:
+                return pk
+    return None
+
+
+def book_best_slot(client, start_time, end_time, lot=None, floor=None, **fields):
+    """Reserve the smallest free slot fitting ``client`` for the window.
+
+    ``fields`` are passed on to the new ``Reservation``. Raise
+    ``NoSlotAvailable`` when no fitting slot is free, or when every slot
+    tried was taken by a concurrent booking.
+    """
+    from blog.models import ParkingSpace, Reservation
+
+    tried = set()
+    for _ in range(BOOK_ATTEMPTS):
+        slot_id = best_slot(
+            client.dimension, start_time, end_time, lot=lot, floor=floor, exclude=tried
+        )
+        if slot_id is None:
+            break
+        tried.add(slot_id)
+        try:
+            with transaction.atomic():
+                slot = (
+                    ParkingSpace.objects.select_for_update()
+                    .filter(pk=slot_id, is_active=True)
+                    .first()
+                )
+                if slot is None:
+                    continue
+                return Reservation.objects.create(
+                    client=client,
+                    parking_slot=slot,
+                    start_time=start_time,
+                    end_time=end_time,
+                    **fields,
+                )
+        except ValidationError as exc:
+            if Reservation.OVERLAP_ERROR not in exc.messages:
+                raise
+    raise NoSlotAvailable("No free slot fits this vehicle for the selected window.")
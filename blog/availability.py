@@ -0,0 +1,256 @@
+"""Precomputed availability index.
+
+Each ``SlotAvailability`` row holds a bitset for one slot and one UTC day,
+with one bit per ``AVAILABILITY_BUCKET_MINUTES`` bucket; a set bit means an
+active reservation touches that bucket. Checking a window then becomes a
+bitwise AND against a mask instead of a range scan over reservations.
+
+Buckets are conservative: a reservation that only partly covers a bucket
+marks the whole bucket busy. A booked bucket lying wholly inside the window
+proves an overlap, but one the window covers only in part does not, so
+``busy_slot_ids`` checks the few slots booked only in those edge buckets
+against their reservations. Bucket-aligned windows never read reservations.
+
+``blog.services.available_spaces`` (and so the availability API) and
+``blog.allocation.best_slot`` read busy slots from here.
+"""
+
+from __future__ import annotations
+
+import datetime as dt
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import transaction
+
+UTC = dt.timezone.utc
+
+
+def bucket_minutes():
+    return settings.AVAILABILITY_BUCKET_MINUTES
+
+
+def buckets_per_day():
+    return 24 * 60 // bucket_minutes()
+
+
+def _bitmap_size():
+    return (buckets_per_day() + 7) // 8
+
+
+def _to_bytes(bits):
+    return bits.to_bytes(_bitmap_size(), "little")
+
+
+def _from_bytes(value):
+    return int.from_bytes(bytes(value), "little")
+
+
+def days_between(start_time, end_time):
+    """Return the UTC days touched by the half-open window ``[start, end)``."""
+    first = start_time.astimezone(UTC).date()
+    last = (end_time.astimezone(UTC) - dt.timedelta(microseconds=1)).date()
+    return [first + dt.timedelta(days=n) for n in range((last - first).days + 1)]
+
+
+def day_mask(start_time, end_time, day):
+    """Return the bucket mask covered by ``[start, end)`` on ``day``."""
+    day_start = dt.datetime.combine(day, dt.time.min, tzinfo=UTC)
+    day_end = day_start + dt.timedelta(days=1)
+    start = max(start_time, day_start)
+    end = min(end_time, day_end)
+    if end <= start:
+        return 0
+    size = dt.timedelta(minutes=bucket_minutes())
+    first = int((start - day_start) // size)
+    last = int((end - day_start - dt.timedelta(microseconds=1)) // size)
+    return ((1 << (last - first + 1)) - 1) << first
+
+
+def day_whole_mask(start_time, end_time, day):
+    """Return the mask of buckets on ``day`` lying wholly inside ``[start, end)``."""
+    day_start = dt.datetime.combine(day, dt.time.min, tzinfo=UTC)
+    day_end = day_start + dt.timedelta(days=1)
+    start = max(start_time, day_start)
+    end = min(end_time, day_end)
+    if end <= start:
+        return 0
+    size = dt.timedelta(minutes=bucket_minutes())
+    first = -((day_start - start) // size)
+    last = (end - day_start) // size
+    if last <= first:
+        return 0
+    return ((1 << (last - first)) - 1) << first
+
+
+def window_masks(start_time, end_time):
+    """Return ``{day: mask}`` for every day the window touches."""
+    return {
+        day: day_mask(start_time, end_time, day)
+        for day in days_between(start_time, end_time)
+    }
+
+
+def reindex_slot_days(slot_id, days):
+    """Recompute the bitmaps of one slot for the given days from its reservations."""
+    from blog.models import Reservation, SlotAvailability
+
+    days = sorted(set(days))
+    if slot_id is None or not days:
+        return
+    window_start = dt.datetime.combine(days[0], dt.time.min, tzinfo=UTC)
+    window_end = dt.datetime.combine(days[-1], dt.time.min, tzinfo=UTC) + dt.timedelta(
+        days=1
+    )
+    bitmaps = dict.fromkeys(days, 0)
+    bookings = Reservation.objects.filter(
+        parking_slot_id=slot_id,
+        reservation_status__in=Reservation.ACTIVE_STATUSES,
+        start_time__lt=window_end,
+        end_time__gt=window_start,
+    ).values_list("start_time", "end_time")
+    for start, end in bookings:
+        for day in bitmaps:
+            bitmaps[day] |= day_mask(start, end, day)
+
+    with transaction.atomic():
+        empty = [day for day, bits in bitmaps.items() if not bits]
+        if empty:
+            SlotAvailability.objects.filter(
+                parking_slot_id=slot_id, day__in=empty
+            ).delete()
+        for day, bits in bitmaps.items():
+            if bits:
+                SlotAvailability.objects.update_or_create(
+                    parking_slot_id=slot_id,
+                    day=day,
+                    defaults={"bitmap": _to_bytes(bits)},
+                )
+
+
+def reindex_reservation(slot_id, start_time, end_time):
+    """Refresh the index rows touched by a reservation's slot and window."""
+    if slot_id is None or not start_time or not end_time or end_time <= start_time:
+        return
+    reindex_slot_days(slot_id, days_between(start_time, end_time))
+
+
+def _index_rows(start_time, end_time, slot_ids):
+    from blog.models import SlotAvailability
+
+    rows = SlotAvailability.objects.filter(day__in=days_between(start_time, end_time))
+    if slot_ids is not None:
+        rows = rows.filter(parking_slot_id__in=slot_ids)
+    return rows.values_list("parking_slot_id", "day", "bitmap")
+
+
+def _overlapping_slot_ids(start_time, end_time, slot_ids):
+    from blog.models import Reservation
+
+    return (
+        Reservation.objects.filter(
+            parking_slot_id__in=slot_ids,
+            start_time__lt=end_time,
+            end_time__gt=start_time,
+            reservation_status__in=Reservation.ACTIVE_STATUSES,
+        )
+        .values_list("parking_slot_id", flat=True)
+        .distinct()
+    )
+
+
+def _split_busy(rows, start_time, end_time):
+    """Split index rows into slots surely busy and slots booked only at the edges."""
+    masks = window_masks(start_time, end_time)
+    whole = {day: day_whole_mask(start_time, end_time, day) for day in masks}
+    busy, edges = set(), set()
+    for slot_id, day, bitmap in rows:
+        bits = _from_bytes(bitmap)
+        if bits & whole[day]:
+            busy.add(slot_id)
+        elif bits & masks[day]:
+            edges.add(slot_id)
+    return busy, edges - busy
+
+
+def busy_slot_ids(start_time, end_time, slot_ids=None):
+    """Return the ids of slots with an active reservation overlapping the window."""
+    busy, edges = _split_busy(
+        _index_rows(start_time, end_time, slot_ids), start_time, end_time
+    )
+    if edges:
+        busy.update(_overlapping_slot_ids(start_time, end_time, edges))
+    return busy
+
+
+async def abusy_slot_ids(start_time, end_time, slot_ids=None):
+    """Async ``busy_slot_ids``."""
+    rows = [row async for row in _index_rows(start_time, end_time, slot_ids)]
+    busy, edges = _split_busy(rows, start_time, end_time)
+    if edges:
+        busy.update(
+            [pk async for pk in _overlapping_slot_ids(start_time, end_time, edges)]
+        )
+    return busy
+
+
+def free_slot_ids(start_time, end_time, slot_ids=None):
+    """Return the ids of active slots that no active reservation overlaps."""
+    from blog.models import ParkingSpace
+
+    candidates = ParkingSpace.objects.filter(is_active=True)
+    if slot_ids is not None:
+        candidates = candidates.filter(pk__in=slot_ids)
+    busy = busy_slot_ids(start_time, end_time, slot_ids=slot_ids)
+    return set(candidates.values_list("pk", flat=True)) - busy
+
+
+async def afree_slot_ids(start_time, end_time, slot_ids=None):
+    """Async ``free_slot_ids``."""
+    from blog.models import ParkingSpace
+
+    candidates = ParkingSpace.objects.filter(is_active=True)
+    if slot_ids is not None:
+        candidates = candidates.filter(pk__in=slot_ids)
+    busy = await abusy_slot_ids(start_time, end_time, slot_ids=slot_ids)
+    return {pk async for pk in candidates.values_list("pk", flat=True)} - busy
+
+
+def rebuild_availability_index(since=None, batch_size=1000):
+    """Rebuild the whole index from active reservations ending after ``since``.
+
+    ``since`` defaults to the start of the current UTC day. Return the number
+    of rows written.
+    """
+    from django.utils import timezone
+
+    from blog.models import Reservation, SlotAvailability
+
+    if since is None:
+        since = (
+            timezone.now()
+            .astimezone(UTC)
+            .replace(hour=0, minute=0, second=0, microsecond=0)
+        )
+    first_day = since.astimezone(UTC).date()
+    bitmaps = defaultdict(int)
+    bookings = Reservation.objects.filter(
+        reservation_status__in=Reservation.ACTIVE_STATUSES,
+        parking_slot__isnull=False,
+        end_time__gt=since,
+    ).values_list("parking_slot_id", "start_time", "end_time")
+    for slot_id, start, end in bookings.iterator(chunk_size=batch_size):
+        if not start or end <= start:
+            continue
+        for day, mask in window_masks(start, end).items():
+            if day >= first_day:
+                bitmaps[(slot_id, day)] |= mask
+
+    rows = [
+        SlotAvailability(parking_slot_id=slot_id, day=day, bitmap=_to_bytes(bits))
+        for (slot_id, day), bits in bitmaps.items()
+    ]
+    with transaction.atomic():
+        SlotAvailability.objects.filter(day__gte=first_day).delete()
+        SlotAvailability.objects.bulk_create(rows, batch_size=batch_size)
+    return len(rows)
@@ -0,0 +1,68 @@
+"""Cache helpers shared by the read-heavy views."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+
+from django.core.cache import cache
+
+LOCK_SUFFIX = ":lock"
+
+
+def get_or_compute(key, compute, timeout, lock_timeout=10, wait=2.0, poll=0.05):
+    """Return ``cache[key]``, computing it at most once across workers on a miss.
+
+    The first worker to miss takes a short lock with ``cache.add`` and fills
+    the entry; the others poll for up to ``wait`` seconds for that value
+    instead of recomputing it themselves. If the lock holder is too slow (or
+    died), waiters fall back to computing the value on their own.
+    """
+    value = cache.get(key)
+    if value is not None:
+        return value
+
+    lock_key = key + LOCK_SUFFIX
+    if cache.add(lock_key, 1, lock_timeout):
+        try:
+            value = compute()
+            cache.set(key, value, timeout)
+            return value
+        finally:
+            cache.delete(lock_key)
+
+    deadline = time.monotonic() + wait
+    while time.monotonic() < deadline:
+        time.sleep(poll)
+        value = cache.get(key)
+        if value is not None:
+            return value
+    return compute()
+
+
+async def aget_or_compute(key, compute, timeout, lock_timeout=10, wait=2.0, poll=0.05):
+    """Async ``get_or_compute``; ``compute`` is a coroutine function.
+
+    Waiters poll with ``asyncio.sleep`` so they do not hold a thread.
+    """
+    value = await cache.aget(key)
+    if value is not None:
+        return value
+
+    lock_key = key + LOCK_SUFFIX
+    if await cache.aadd(lock_key, 1, lock_timeout):
+        try:
+            value = await compute()
+            await cache.aset(key, value, timeout)
+            return value
+        finally:
+            await cache.adelete(lock_key)
+
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + wait
+    while loop.time() < deadline:
+        await asyncio.sleep(poll)
+        value = await cache.aget(key)
+        if value is not None:
+            return value
+    return await compute()
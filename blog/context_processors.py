@@ -1,11 +1,20 @@
 from django.contrib.auth.forms import AuthenticationForm
+from django.utils.functional import SimpleLazyObject
 
 
-def global_login_form(request):
-    """Provide a login form to every template so we can render the modal globally."""
+def _login_form(request):
     form = AuthenticationForm(request=request)
     for field in form.fields.values():
         field.widget.attrs.setdefault("class", "form-control")
+    return form
+
+
+def global_login_form(request):
+    """Provide the login modal's form to every template.
+
+    The form is only built when a template actually uses it; ``base.html``
+    renders the modal for anonymous visitors only.
+    """
     return {
-        "global_login_form": form,
+        "global_login_form": SimpleLazyObject(lambda: _login_form(request)),
     }
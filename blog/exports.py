@@ -0,0 +1,134 @@
+"""Streaming CSV / JSON Lines export of reservations and clients.
+
+Rows are read with ``.iterator(chunk_size=...)`` over a single joined
+``values_list`` query and encoded in batches, so memory use stays flat
+however many rows are exported. Reservation exports use the column names
+that ``blog.imports`` reads, so an export can be imported elsewhere as is.
+"""
+
+from __future__ import annotations
+
+import csv
+import io
+import json
+import zlib
+from itertools import islice
+
+FORMATS = ("csv", "jsonl")
+# Dataset name -> permission needed to export it.
+DATASETS = {
+    "reservations": "blog.view_reservation",
+    "clients": "blog.view_client",
+}
+DEFAULT_CHUNK_SIZE = 2000
+
+RESERVATION_COLUMNS = [
+    ("reservation_number", "reservation_number"),
+    ("client_id", "client_id"),
+    ("client_name", "client__full_name"),
+    ("plate_number", "client__plate_number"),
+    ("parking_slot_id", "parking_slot_id"),
+    ("slot_label", "parking_slot__label"),
+    ("start_time", "start_time"),
+    ("end_time", "end_time"),
+    ("reservation_status", "reservation_status"),
+    ("type_of_reservation", "type_of_reservation"),
+    ("total_cost", "total_cost"),
+]
+CLIENT_COLUMNS = [
+    ("client_id", "id"),
+    ("full_name", "full_name"),
+    ("contact", "contact"),
+    ("plate_number", "plate_number"),
+    ("dimension", "dimension"),
+    ("car_type", "car_type"),
+    ("created_at", "created_at"),
+]
+
+
+def _plain(value):
+    """Return ``value`` as something both csv and json can write."""
+    if value is None:
+        return ""
+    if isinstance(value, (int, float, str)):
+        return value
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return str(value)
+
+
+def reservation_rows(start=None, end=None, status=None):
+    """Return the export queryset for reservations starting in ``[start, end)``."""
+    from blog.models import Reservation
+
+    reservations = Reservation.objects.order_by("start_time", "id")
+    if start is not None:
+        reservations = reservations.filter(start_time__gte=start)
+    if end is not None:
+        reservations = reservations.filter(start_time__lt=end)
+    if status:
+        reservations = reservations.filter(reservation_status=status)
+    return reservations.values_list(*(field for _, field in RESERVATION_COLUMNS))
+
+
+def client_rows():
+    from blog.models import Client
+
+    return Client.objects.order_by("id").values_list(
+        *(field for _, field in CLIENT_COLUMNS)
+    )
+
+
+def encode_rows(rows, header, fmt, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Yield UTF-8 encoded batches of ``rows`` as CSV (with header) or JSONL."""
+    if fmt not in FORMATS:
+        raise ValueError(f"Unsupported format: {fmt}")
+    rows = rows.iterator(chunk_size=chunk_size)
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if fmt == "csv":
+        writer.writerow(header)
+    while batch := list(islice(rows, chunk_size)):
+        if fmt == "csv":
+            writer.writerows([[_plain(value) for value in row] for row in batch])
+        else:
+            for row in batch:
+                record = dict(zip(header, (_plain(value) for value in row)))
+                buffer.write(json.dumps(record) + "\n")
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+
+def gzip_stream(chunks):
+    """Gzip a stream of byte chunks on the fly."""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, zlib.MAX_WBITS | 16)
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def export_stream(
+    dataset,
+    fmt="csv",
+    compress=False,
+    chunk_size=DEFAULT_CHUNK_SIZE,
+    **filters,
+):
+    """Return an iterator of bytes for ``dataset`` in ``fmt``, optionally gzipped."""
+    if dataset == "reservations":
+        rows, columns = reservation_rows(**filters), RESERVATION_COLUMNS
+    elif dataset == "clients":
+        rows, columns = client_rows(), CLIENT_COLUMNS
+    else:
+        raise ValueError(f"Unknown dataset: {dataset}")
+    chunks = encode_rows(rows, [name for name, _ in columns], fmt, chunk_size)
+    return gzip_stream(chunks) if compress else chunks
+
+
+def export_filename(dataset, fmt, compress=False):
+    return f"{dataset}.{fmt}" + (".gz" if compress else "")
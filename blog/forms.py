@@ -1,9 +1,70 @@
+from datetime import datetime, time, timedelta
+
 from django import forms
+from django.core.exceptions import ValidationError
 from django.forms import ModelForm
+from django.forms.utils import flatatt
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.html import format_html
 
+from blog.allocation import book_best_slot
 from blog.models import Client, ParkingLot, ParkingSpace, Reservation
 
 
+class AutocompleteInput(forms.Widget):
+    """Search box for a ``ModelChoiceField``, backed by a JSON endpoint.
+
+    Unlike a ``Select`` it renders only the current choice; matches are
+    fetched from ``url_name`` as the user types (``static/js/autocomplete.js``)
+    with the values of the ``forward`` fields sent along.
+    """
+
+    class Media:
+        js = ["js/autocomplete.js"]
+
+    def __init__(self, url_name, forward=(), attrs=None):
+        super().__init__(attrs)
+        self.url_name = url_name
+        self.forward = tuple(forward)
+        self.choices = ()
+
+    def selected_label(self, value):
+        queryset = getattr(self.choices, "queryset", None)
+        if queryset is None or value in (None, ""):
+            return ""
+        try:
+            selected = queryset.filter(pk=value).first()
+        except (TypeError, ValueError, ValidationError):
+            return ""
+        return "" if selected is None else str(selected)
+
+    def format_value(self, value):
+        return super().format_value(getattr(value, "pk", value))
+
+    def render(self, name, value, attrs=None, renderer=None):
+        value = self.format_value(value) or ""
+        attrs = self.build_attrs(self.attrs, attrs)
+        options_id = f"{attrs.get('id', name)}_options"
+        return format_html(
+            '<div class="autocomplete" data-autocomplete-url="{}"'
+            ' data-autocomplete-forward="{}">'
+            '<input type="hidden" name="{}" value="{}" data-autocomplete-value>'
+            '<input type="search" autocomplete="off" list="{}"{} value="{}"'
+            " data-autocomplete-input>"
+            '<datalist id="{}"></datalist>'
+            "</div>",
+            reverse(self.url_name),
+            ",".join(self.forward),
+            name,
+            value,
+            options_id,
+            flatatt(attrs),
+            self.selected_label(value),
+            options_id,
+        )
+
+
 class StyledModelForm(ModelForm):
     """Base form that injects Bootstrap styling."""
 
@@ -99,8 +160,8 @@ class ReservationForm(StyledModelForm):
             "reservation_status",
         ]
         widgets = {
-            "client": forms.Select(attrs={"class": "form-select"}),
-            "parking_slot": forms.Select(attrs={"class": "form-select"}),
+            "client": AutocompleteInput("client_autocomplete"),
+            "parking_slot": AutocompleteInput("slot_autocomplete", forward=["client"]),
             "type_of_reservation": forms.Select(attrs={"class": "form-select"}),
             "reservation_status": forms.Select(attrs={"class": "form-select"}),
         }
@@ -110,6 +171,32 @@ class ReservationForm(StyledModelForm):
         self.fields["reservation_status"].initial = (
             Reservation.ReservationStatus.CONFIRMED
         )
+        if not self.instance.pk:
+            self.fields["parking_slot"].required = False
+            self.fields["parking_slot"].help_text = (
+                "Leave empty to book the smallest free slot that fits the client."
+            )
+
+    def save(self, commit=True):
+        """Save the reservation, allocating the best-fit slot when none was picked.
+
+        Allocation raises ``NoSlotAvailable`` when no fitting slot is free.
+        """
+        if (
+            self.errors
+            or not commit
+            or self.instance.pk
+            or self.instance.parking_slot_id
+        ):
+            return super().save(commit)
+        self.instance = book_best_slot(
+            self.cleaned_data["client"],
+            self.cleaned_data["start_time"],
+            self.cleaned_data["end_time"],
+            type_of_reservation=self.cleaned_data.get("type_of_reservation"),
+            reservation_status=self.cleaned_data["reservation_status"],
+        )
+        return self.instance
 
     def clean(self):
         cleaned_data = super().clean()
@@ -117,6 +204,10 @@ class ReservationForm(StyledModelForm):
         start = cleaned_data.get("start_time")
         end = cleaned_data.get("end_time")
 
+        if start and end and end <= start:
+            raise forms.ValidationError(
+                "Checkout time must be later than check in time."
+            )
         if slot and start and end:
             exclude_id = (
                 self.instance.pk if self.instance and self.instance.pk else None
@@ -127,3 +218,81 @@ class ReservationForm(StyledModelForm):
                 )
 
         return cleaned_data
+
+
+class ReservationImportForm(forms.Form):
+    FORMAT_CHOICES = [
+        ("", "Guess from file name"),
+        ("csv", "CSV"),
+        ("jsonl", "JSON Lines"),
+    ]
+
+    file = forms.FileField()
+    format = forms.ChoiceField(choices=FORMAT_CHOICES, required=False)
+    dry_run = forms.BooleanField(required=False, label="Validate only")
+
+
+def _start_of_day(day):
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+class ReservationFilterForm(forms.Form):
+    status = forms.ChoiceField(
+        choices=[("", "Any status")] + Reservation.ReservationStatus.choices,
+        required=False,
+        widget=forms.Select(attrs={"class": "form-select"}),
+    )
+    start_from = forms.DateField(
+        required=False,
+        widget=forms.DateInput(attrs={"type": "date", "class": "form-control"}),
+    )
+    start_to = forms.DateField(
+        required=False,
+        widget=forms.DateInput(attrs={"type": "date", "class": "form-control"}),
+    )
+    slot = forms.ModelChoiceField(
+        queryset=ParkingSpace.objects.order_by("label"),
+        required=False,
+        widget=AutocompleteInput(
+            "slot_autocomplete", attrs={"class": "form-control", "placeholder": "Any"}
+        ),
+    )
+    client = forms.ModelChoiceField(
+        queryset=Client.objects.order_by("full_name"),
+        required=False,
+        widget=AutocompleteInput(
+            "client_autocomplete",
+            attrs={"class": "form-control", "placeholder": "Any"},
+        ),
+    )
+
+    def clean(self):
+        cleaned_data = super().clean()
+        start_from = cleaned_data.get("start_from")
+        start_to = cleaned_data.get("start_to")
+        if start_from and start_to and start_to < start_from:
+            raise forms.ValidationError("The end date must not precede the start.")
+        return cleaned_data
+
+    def filter(self, reservations):
+        """Narrow ``reservations`` to the valid filters of this form."""
+        if not self.is_valid():
+            return reservations
+        data = self.cleaned_data
+        if data["status"]:
+            reservations = reservations.filter(reservation_status=data["status"])
+        # Compare against datetime bounds rather than ``__date`` so the
+        # start_time index can be used.
+        if data["start_from"]:
+            reservations = reservations.filter(
+                start_time__gte=_start_of_day(data["start_from"])
+            )
+        if data["start_to"]:
+            reservations = reservations.filter(
+                start_time__lt=_start_of_day(data["start_to"] + timedelta(days=1))
+            )
+        if data["slot"]:
+            reservations = reservations.filter(parking_slot=data["slot"])
+        if data["client"]:
+            reservations = reservations.filter(client=data["client"])
+        return reservations
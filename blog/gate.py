@@ -0,0 +1,177 @@
+"""Gate check-in and check-out keyed by plate number.
+
+The barrier asks one question per vehicle: does this plate hold a booking
+it may pass on right now, and for which slot? The answer is read from one
+cache entry per normalized plate (``Client.plate_key``) listing the plate's
+open bookings: active ones that have not ended yet, plus any whose vehicle
+arrived and has not left. Whether a booking is current is decided against
+the clock on every read, so an entry only changes when a reservation or
+client does, and ``blog.signals`` drops it on those writes. Plates without
+bookings are cached as well, so an unknown vehicle at the barrier does not
+reach the database either.
+"""
+
+from __future__ import annotations
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from blog.caching import get_or_compute
+
+GATE_PLATE_KEY = "gate:plate:{}"
+# Open bookings kept per plate; later ones are read once the entry expires.
+GATE_BOOKING_LIMIT = 10
+
+
+class GateError(ValueError):
+    """The plate has no booking the gate action applies to."""
+
+
+def _open_bookings(plate_key):
+    from blog.models import Reservation
+
+    now = timezone.now()
+    rows = (
+        Reservation.objects.filter(client__plate_key=plate_key)
+        .filter(
+            Q(reservation_status__in=Reservation.ACTIVE_STATUSES, end_time__gt=now)
+            | Q(arrived_at__isnull=False, departed_at__isnull=True)
+        )
+        .order_by("start_time", "pk")
+        .values(
+            "id",
+            "reservation_number",
+            "reservation_status",
+            "start_time",
+            "end_time",
+            "arrived_at",
+            "departed_at",
+            slot_id=F("parking_slot_id"),
+            slot_label=F("parking_slot__label"),
+            lot_id=F("parking_slot__parking_lot_id"),
+        )
+    )
+    return list(rows[:GATE_BOOKING_LIMIT])
+
+
+def plate_bookings(plate):
+    """Return the open bookings of ``plate`` as dicts, from cache when possible."""
+    from blog.models import Client
+
+    key = Client.normalize_plate(plate)
+    if not key:
+        return []
+    return get_or_compute(
+        GATE_PLATE_KEY.format(key),
+        lambda: _open_bookings(key),
+        settings.GATE_CACHE_SECONDS,
+    )
+
+
+def current_booking(plate, now=None):
+    """Return the booking ``plate`` may enter on at ``now``, or None.
+
+    A booking is current from ``GATE_EARLY_ARRIVAL_MINUTES`` before its
+    start until its end, unless the vehicle already left.
+    """
+    from blog.models import Reservation
+
+    now = now or timezone.now()
+    early = timedelta(minutes=settings.GATE_EARLY_ARRIVAL_MINUTES)
+    for booking in plate_bookings(plate):
+        if (
+            booking["reservation_status"] in Reservation.ACTIVE_STATUSES
+            and booking["departed_at"] is None
+            and booking["start_time"] - early <= now < booking["end_time"]
+        ):
+            return booking
+    return None
+
+
+def parked_booking(plate):
+    """Return the booking whose vehicle is inside (arrived, not left), or None."""
+    for booking in plate_bookings(plate):
+        if booking["arrived_at"] is not None and booking["departed_at"] is None:
+            return booking
+    return None
+
+
+def check_in(plate, now=None):
+    """Record the arrival of ``plate`` and return its current booking.
+
+    Repeating a check-in keeps the first arrival time. Raise ``GateError``
+    when the plate has no current booking.
+    """
+    from blog.models import Client, Reservation
+
+    now = now or timezone.now()
+    booking = current_booking(plate, now)
+    if booking is None:
+        raise GateError("No active reservation for this plate.")
+    if booking["arrived_at"] is None:
+        Reservation.objects.filter(pk=booking["id"], arrived_at__isnull=True).update(
+            arrived_at=now
+        )
+        invalidate_plates(Client.normalize_plate(plate))
+        booking = {
+            **booking,
+            "arrived_at": Reservation.objects.filter(pk=booking["id"])
+            .values_list("arrived_at", flat=True)
+            .first(),
+        }
+    return booking
+
+
+def check_out(plate, now=None):
+    """Record the departure of ``plate`` and complete its booking.
+
+    Applies to the booking the vehicle arrived on, or else to its current
+    booking (a vehicle let in without a check-in). Completing the booking
+    frees the slot for the rest of its window. Raise ``GateError`` when
+    neither exists.
+    """
+    from blog.models import Reservation
+
+    now = now or timezone.now()
+    booking = parked_booking(plate) or current_booking(plate, now)
+    if booking is None:
+        raise GateError("No reservation to check out for this plate.")
+    with transaction.atomic():
+        reservation = (
+            Reservation.objects.select_for_update().filter(pk=booking["id"]).first()
+        )
+        if reservation is None:
+            raise GateError("No reservation to check out for this plate.")
+        if reservation.departed_at is None:
+            reservation.departed_at = now
+            if reservation.reservation_status in Reservation.ACTIVE_STATUSES:
+                reservation.reservation_status = Reservation.ReservationStatus.COMPLETED
+            reservation.save()
+    return {
+        **booking,
+        "reservation_status": reservation.reservation_status,
+        "arrived_at": reservation.arrived_at,
+        "departed_at": reservation.departed_at,
+    }
+
+
+def invalidate_plates(*plate_keys):
+    cache.delete_many([GATE_PLATE_KEY.format(key) for key in plate_keys if key])
+
+
+def invalidate_client_plates(*client_ids):
+    """Drop the gate entries of the plates these clients are registered with."""
+    from blog.models import Client
+
+    client_ids = {pk for pk in client_ids if pk is not None}
+    if client_ids:
+        invalidate_plates(
+            *Client.objects.filter(pk__in=client_ids).values_list(
+                "plate_key", flat=True
+            )
+        )
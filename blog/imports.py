@@ -0,0 +1,392 @@
+"""Streaming bulk import of reservations from CSV or JSON Lines.
+
+Rows are parsed lazily and processed in chunks. For each chunk the referenced
+clients and slots are checked with one query each, overlaps are validated per
+slot with a sort-and-sweep against the chunk itself and the active bookings
+already stored for those slots, costs are quoted in bulk by the tariff engine
+and the valid rows are written with ``bulk_create``.
+
+Expected columns: ``client_id``, ``parking_slot_id`` (or ``slot_label``),
+``start_time``, ``end_time`` and optionally ``reservation_number``,
+``reservation_status`` (default ``CONFIRMED``) and ``type_of_reservation``.
+"""
+
+from __future__ import annotations
+
+import bisect
+import csv
+import json
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from itertools import islice
+
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from blog.tariffs import quote_many
+
+FORMATS = ("csv", "jsonl")
+DEFAULT_CHUNK_SIZE = 5000
+
+
+class RowError(ValueError):
+    pass
+
+
+@dataclass
+class ImportResult:
+    rows: int = 0
+    created: int = 0
+    errors: list = field(default_factory=list)
+    elapsed: float = 0.0
+
+    @property
+    def rows_per_second(self):
+        return self.rows / self.elapsed if self.elapsed else 0.0
+
+    def add_error(self, line, message):
+        self.errors.append((line, message))
+
+
+def detect_format(filename):
+    return "jsonl" if filename.lower().endswith((".jsonl", ".ndjson")) else "csv"
+
+
+def iter_rows(stream, fmt):
+    """Yield ``(line_number, row_dict)`` pairs from a text stream."""
+    if fmt == "csv":
+        reader = csv.DictReader(stream)
+        for row in reader:
+            yield reader.line_num, row
+        return
+    if fmt != "jsonl":
+        raise ValueError(f"Unsupported format: {fmt}")
+    for line_number, line in enumerate(stream, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            row = json.loads(line)
+        except json.JSONDecodeError as exc:
+            row = RowError(f"Invalid JSON: {exc.msg}.")
+        yield line_number, row
+
+
+def _chunks(iterable, size):
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def _text(row, name):
+    value = row.get(name)
+    if value is None:
+        return ""
+    return str(value).strip()
+
+
+def _optional_int(row, name):
+    value = _text(row, name)
+    if not value:
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        raise RowError(f"{name} must be an integer.") from None
+
+
+def _datetime(row, name):
+    value = parse_datetime(_text(row, name))
+    if value is None:
+        raise RowError(f"{name} must be an ISO 8601 datetime.")
+    if timezone.is_naive(value):
+        value = timezone.make_aware(value)
+    return value
+
+
+def _parse(row):
+    """Return the typed fields of one input row."""
+    from blog.models import Reservation
+
+    if isinstance(row, RowError):
+        raise row
+    if not isinstance(row, dict):
+        raise RowError("Row is not a JSON object.")
+    client_id = _optional_int(row, "client_id")
+    if client_id is None:
+        raise RowError("client_id is required.")
+    slot_id = _optional_int(row, "parking_slot_id")
+    slot_label = _text(row, "slot_label")
+    if slot_id is None and not slot_label:
+        raise RowError("parking_slot_id or slot_label is required.")
+    start = _datetime(row, "start_time")
+    end = _datetime(row, "end_time")
+    if end <= start:
+        raise RowError("Checkout time must be later than check in time.")
+    status = _text(row, "reservation_status") or Reservation.ReservationStatus.CONFIRMED
+    if status not in Reservation.ReservationStatus.values:
+        raise RowError(f"Unknown reservation_status {status!r}.")
+    kind = _text(row, "type_of_reservation") or None
+    if kind and kind not in dict(Reservation.RESERVATION_TYPE_OPTIONS):
+        raise RowError(f"Unknown type_of_reservation {kind!r}.")
+    return {
+        "reservation_number": _optional_int(row, "reservation_number"),
+        "client_id": client_id,
+        "parking_slot_id": slot_id,
+        "slot_label": slot_label,
+        "start_time": start,
+        "end_time": end,
+        "reservation_status": status,
+        "type_of_reservation": kind,
+    }
+
+
+def sweep_overlaps(candidates, stored):
+    """Split candidates into accepted and rejected by sort-and-sweep.
+
+    ``candidates`` are ``(start, end, key)`` tuples for a single slot and
+    ``stored`` the ``(start, end)`` intervals already booked on it.
+    Earlier candidates win over later ones.
+    """
+    stored = sorted(stored)
+    stored_starts = [start for start, _ in stored]
+    reach = []  # reach[i]: latest end among stored[: i + 1]
+    for _, end in stored:
+        reach.append(max(reach[-1], end) if reach else end)
+
+    accepted, rejected = [], []
+    latest_end = None
+    for start, end, key in sorted(candidates, key=lambda item: item[:2]):
+        before = bisect.bisect_left(stored_starts, end)
+        hits_stored = before > 0 and reach[before - 1] > start
+        if hits_stored or (latest_end is not None and start < latest_end):
+            rejected.append(key)
+            continue
+        accepted.append(key)
+        latest_end = end if latest_end is None else max(latest_end, end)
+    return accepted, rejected
+
+
+class ReservationImporter:
+    """Validate and insert reservations chunk by chunk."""
+
+    def __init__(self, chunk_size=DEFAULT_CHUNK_SIZE, dry_run=False):
+        self.chunk_size = chunk_size
+        self.dry_run = dry_run
+        self.result = ImportResult()
+        self._seen_numbers = set()
+        self._highest_number = 0
+        self._client_ids = set()
+        self._slot_ids = set()
+
+    def run(self, rows):
+        """Import ``(line_number, row)`` pairs and return an ``ImportResult``."""
+        from blog.availability import rebuild_availability_index
+        from blog.gate import invalidate_client_plates
+        from blog.sequences import reservation_numbers
+        from blog.services import (
+            bump_occupancy_version,
+            invalidate_dashboard_stats,
+            invalidate_slot_detail,
+            refresh_parking_state,
+        )
+
+        started = time.perf_counter()
+        for chunk in _chunks(rows, self.chunk_size):
+            self.result.rows += len(chunk)
+            self._import_chunk(chunk)
+
+        if self.result.created and not self.dry_run:
+            if self._highest_number:
+                reservation_numbers.advance_past(self._highest_number)
+            refresh_parking_state()
+            rebuild_availability_index()
+            # bulk_create skips the signal receivers that drop these caches.
+            invalidate_client_plates(*self._client_ids)
+            invalidate_slot_detail(*self._slot_ids)
+            invalidate_dashboard_stats()
+            bump_occupancy_version()
+        self.result.elapsed = time.perf_counter() - started
+        return self.result
+
+    def _import_chunk(self, chunk):
+        from blog.models import Client, ParkingSpace, Reservation
+
+        parsed = {}
+        for line, row in chunk:
+            try:
+                parsed[line] = _parse(row)
+            except RowError as exc:
+                self.result.add_error(line, str(exc))
+        if not parsed:
+            return
+
+        labels = {row["slot_label"] for row in parsed.values() if row["slot_label"]}
+        label_to_id = dict(
+            ParkingSpace.objects.filter(label__in=labels).values_list("label", "id")
+        )
+        for line, row in list(parsed.items()):
+            if row["parking_slot_id"] is None:
+                row["parking_slot_id"] = label_to_id.get(row["slot_label"])
+                if row["parking_slot_id"] is None:
+                    self._reject(parsed, line, f"Unknown slot {row['slot_label']!r}.")
+
+        client_ids = set(
+            Client.objects.filter(
+                pk__in={row["client_id"] for row in parsed.values()}
+            ).values_list("pk", flat=True)
+        )
+        slots = {
+            pk: (lot_id, space_type)
+            for pk, lot_id, space_type in ParkingSpace.objects.filter(
+                pk__in={row["parking_slot_id"] for row in parsed.values()}
+            ).values_list("pk", "parking_lot_id", "space_type")
+        }
+        for line, row in list(parsed.items()):
+            if row["client_id"] not in client_ids:
+                self._reject(parsed, line, f"Unknown client {row['client_id']}.")
+            elif row["parking_slot_id"] not in slots:
+                self._reject(parsed, line, f"Unknown slot {row['parking_slot_id']}.")
+            else:
+                row["lot_id"], row["space_type"] = slots[row["parking_slot_id"]]
+
+        self._check_numbers(parsed)
+        self._check_overlaps(parsed, Reservation.ACTIVE_STATUSES)
+        if parsed and not self.dry_run:
+            self._insert(parsed)
+        elif parsed:
+            self.result.created += len(parsed)
+
+    def _reject(self, parsed, line, message):
+        parsed.pop(line, None)
+        self.result.add_error(line, message)
+
+    def _check_numbers(self, parsed):
+        from blog.models import Reservation
+
+        explicit = {
+            row["reservation_number"]: line
+            for line, row in parsed.items()
+            if row["reservation_number"] is not None
+        }
+        taken = set(
+            Reservation.objects.filter(reservation_number__in=explicit).values_list(
+                "reservation_number", flat=True
+            )
+        )
+        for line, row in list(parsed.items()):
+            number = row["reservation_number"]
+            if number is None:
+                continue
+            if number in taken or number in self._seen_numbers:
+                self._reject(parsed, line, f"reservation_number {number} exists.")
+                continue
+            self._seen_numbers.add(number)
+            self._highest_number = max(self._highest_number, number)
+
+    def _check_overlaps(self, parsed, active_statuses):
+        from blog.models import Reservation
+
+        by_slot = defaultdict(list)
+        for line, row in parsed.items():
+            if row["reservation_status"] in active_statuses:
+                by_slot[row["parking_slot_id"]].append(
+                    (row["start_time"], row["end_time"], line)
+                )
+        if not by_slot:
+            return
+
+        window_start = min(c[0] for group in by_slot.values() for c in group)
+        window_end = max(c[1] for group in by_slot.values() for c in group)
+        stored = defaultdict(list)
+        existing = Reservation.objects.filter(
+            parking_slot_id__in=by_slot,
+            reservation_status__in=active_statuses,
+            start_time__lt=window_end,
+            end_time__gt=window_start,
+        ).values_list("parking_slot_id", "start_time", "end_time")
+        for slot_id, start, end in existing:
+            stored[slot_id].append((start, end))
+
+        for slot_id, candidates in by_slot.items():
+            _, rejected = sweep_overlaps(candidates, stored[slot_id])
+            for line in rejected:
+                self._reject(
+                    parsed, line, "The slot is already booked for that period."
+                )
+
+    def _build(self, parsed):
+        from blog.models import Reservation
+        from blog.sequences import reservation_numbers
+
+        now = timezone.now()
+        missing = [row for row in parsed.values() if row["reservation_number"] is None]
+        for row, number in zip(missing, reservation_numbers.allocate(len(missing))):
+            row["reservation_number"] = number
+
+        costs = quote_many(
+            [
+                (row["lot_id"], row["space_type"], row["start_time"], row["end_time"])
+                for row in parsed.values()
+            ]
+        )
+        reservations = []
+        for row, cost in zip(parsed.values(), costs):
+            status = row["reservation_status"]
+            if (
+                status == Reservation.ReservationStatus.CONFIRMED
+                and row["end_time"] <= now
+            ):
+                status = Reservation.ReservationStatus.COMPLETED
+            reservations.append(
+                Reservation(
+                    reservation_number=row["reservation_number"],
+                    client_id=row["client_id"],
+                    parking_slot_id=row["parking_slot_id"],
+                    type_of_reservation=row["type_of_reservation"],
+                    start_time=row["start_time"],
+                    end_time=row["end_time"],
+                    reservation_status=status,
+                    total_cost=cost,
+                )
+            )
+        return reservations
+
+    def _insert(self, parsed):
+        from blog.models import Reservation
+
+        lines = list(parsed)
+        reservations = self._build(parsed)
+        try:
+            with transaction.atomic():
+                Reservation.objects.bulk_create(reservations)
+            self.result.created += len(reservations)
+            self._record(reservations)
+            return
+        except IntegrityError:
+            pass
+
+        # A concurrent writer got in first; fall back to row-by-row inserts so
+        # only the conflicting rows are reported.
+        for line, reservation in zip(lines, reservations):
+            try:
+                with transaction.atomic():
+                    Reservation.objects.bulk_create([reservation])
+            except IntegrityError as exc:
+                self.result.add_error(line, f"Rejected by the database: {exc}")
+            else:
+                self.result.created += 1
+                self._record([reservation])
+
+    def _record(self, reservations):
+        for reservation in reservations:
+            self._client_ids.add(reservation.client_id)
+            self._slot_ids.add(reservation.parking_slot_id)
+
+
+def import_reservations(stream, fmt, chunk_size=DEFAULT_CHUNK_SIZE, dry_run=False):
+    """Import reservations from a text stream and return an ``ImportResult``."""
+    importer = ReservationImporter(chunk_size=chunk_size, dry_run=dry_run)
+    return importer.run(iter_rows(stream, fmt))
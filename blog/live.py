@@ -0,0 +1,202 @@
+"""Live occupancy feed (Server-Sent Events).
+
+One ``Broadcaster`` per worker process watches the occupancy version (see
+``blog.services.occupancy_version``), which every lot, slot and reservation
+write bumps, including writes made by other processes such as the
+reconciler. When the version moves it reads the lot counters and slot
+states once, diffs them against the previous read and puts ``lot`` /
+``space`` events on the queue of every connected client. Clients are plain
+asyncio queues consumed by ``event_stream``, so an idle connection costs a
+coroutine and a queue rather than a thread, and the database is read once
+per change per worker however many clients are connected.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+
+QUEUE_SIZE = 256
+RETRY_MILLISECONDS = 3000
+
+
+def _read_state():
+    from blog.models import ParkingLot, ParkingSpace
+    from blog.services import occupancy_version
+
+    version = occupancy_version()
+    lots = {}
+    rows = ParkingLot.objects.values_list(
+        "pk",
+        "lot_id",
+        "lot_capacity",
+        "total_spaces",
+        "occupied_spaces",
+        "current_status",
+    )
+    for pk, lot_id, capacity, total, occupied, status in rows:
+        capacity = capacity or total
+        lots[pk] = {
+            "id": pk,
+            "lot_id": lot_id,
+            "capacity": capacity,
+            "total": total,
+            "occupied": occupied,
+            "available": max(capacity - occupied, 0),
+            "status": status,
+        }
+    spaces = {
+        pk: {"id": pk, "lot": lot, "is_occupied": occupied, "is_active": active}
+        for pk, lot, occupied, active in ParkingSpace.objects.values_list(
+            "pk", "parking_lot_id", "is_occupied", "is_active"
+        )
+    }
+    return version, lots, spaces
+
+
+def diff_state(previous, current, kind):
+    """Return the events turning ``previous`` into ``current``.
+
+    Both map primary keys to records; removed records are sent as
+    ``{"id": pk, "deleted": True}``, plus their ``lot`` when they had one so
+    that streams filtered by lot still see them go.
+    """
+    events = [
+        (kind, record) for pk, record in current.items() if previous.get(pk) != record
+    ]
+    for pk in previous.keys() - current:
+        removed = {"id": pk, "deleted": True}
+        if "lot" in previous[pk]:
+            removed["lot"] = previous[pk]["lot"]
+        events.append((kind, removed))
+    return events
+
+
+def format_event(name, data, event_id=None):
+    """Encode one SSE message."""
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"event: {name}")
+    lines.append("data: " + json.dumps(data, separators=(",", ":")))
+    return ("\n".join(lines) + "\n\n").encode()
+
+
+class Broadcaster:
+    """Fan occupancy changes out to the queues of connected clients."""
+
+    def __init__(self):
+        self._subscribers = set()
+        self._task = None
+        self._loop = None
+        self._version = None
+        self._lots = {}
+        self._spaces = {}
+        self._event_id = 0
+
+    @property
+    def subscriber_count(self):
+        return len(self._subscribers)
+
+    def subscribe(self):
+        """Register a client and return its event queue.
+
+        Starts the watcher on the running loop for the first client.
+        """
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._task is None or self._task.done():
+            self._loop = loop
+            self._version = None
+            self._task = loop.create_task(self._watch())
+        queue = asyncio.Queue(maxsize=QUEUE_SIZE)
+        self._subscribers.add(queue)
+        return queue
+
+    def unsubscribe(self, queue):
+        self._subscribers.discard(queue)
+        if not self._subscribers and self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def publish(self, name, data):
+        """Queue an event for every client.
+
+        A client that fell ``QUEUE_SIZE`` events behind has its backlog
+        replaced by a single ``resync`` event; it should reload the current
+        state from ``/api/lots/`` and ``/api/spaces/``.
+        """
+        self._event_id += 1
+        for queue in self._subscribers:
+            try:
+                queue.put_nowait((self._event_id, name, data))
+            except asyncio.QueueFull:
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait((self._event_id, "resync", {}))
+
+    async def snapshot(self):
+        """Return the current lot records, reading them if not watched yet."""
+        if self._version is None:
+            await self.refresh()
+        return list(self._lots.values())
+
+    async def refresh(self):
+        """Read the current state and publish what changed since the last read."""
+        version, lots, spaces = await sync_to_async(_read_state)()
+        if self._version is not None:
+            for name, data in diff_state(self._lots, lots, "lot") + diff_state(
+                self._spaces, spaces, "space"
+            ):
+                self.publish(name, data)
+        self._version, self._lots, self._spaces = version, lots, spaces
+
+    async def _watch(self):
+        from blog.services import occupancy_version
+
+        while True:
+            version = await sync_to_async(occupancy_version)()
+            if version != self._version:
+                await self.refresh()
+            await asyncio.sleep(settings.LIVE_POLL_SECONDS)
+
+
+broadcaster = Broadcaster()
+
+
+async def event_stream(lot=None, lifetime=None):
+    """Yield SSE messages for one client until ``lifetime`` seconds have passed.
+
+    The stream starts with a ``snapshot`` of every lot, followed by ``lot``
+    and ``space`` change events (only those of ``lot`` when given) and a
+    comment line every ``LIVE_HEARTBEAT_SECONDS`` to keep proxies from
+    closing an idle connection. Ending after ``lifetime`` bounds the life
+    of connections whose client went away unnoticed; browsers reconnect
+    on their own.
+    """
+    lifetime = settings.LIVE_STREAM_SECONDS if lifetime is None else lifetime
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + lifetime
+    queue = broadcaster.subscribe()
+    try:
+        yield f"retry: {RETRY_MILLISECONDS}\n\n".encode()
+        lots = await broadcaster.snapshot()
+        if lot is not None:
+            lots = [record for record in lots if record["id"] == lot]
+        yield format_event("snapshot", {"lots": lots})
+        while (remaining := deadline - loop.time()) > 0:
+            try:
+                event_id, name, data = await asyncio.wait_for(
+                    queue.get(), min(settings.LIVE_HEARTBEAT_SECONDS, remaining)
+                )
+            except asyncio.TimeoutError:
+                yield b": ping\n\n"
+                continue
+            if lot is not None and name != "resync":
+                if data.get("id" if name == "lot" else "lot") != lot:
+                    continue
+            yield format_event(name, data, event_id)
+    finally:
+        broadcaster.unsubscribe(queue)
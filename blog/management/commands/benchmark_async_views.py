@@ -0,0 +1,177 @@
+import asyncio
+import statistics
+import threading
+import time
+from collections import Counter
+from datetime import timedelta
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.asgi import get_asgi_application
+from django.core.management.base import BaseCommand, CommandError
+from django.db.backends.signals import connection_created
+from django.test import Client
+from django.urls import reverse
+from django.utils import timezone
+
+# Page -> (sync URL name, async URL name).
+PAGES = {
+    "dashboard": ("dashboard_page", "async_dashboard"),
+    "lots": ("parking_lot_page", "async_parking_lot"),
+    "availability": ("availability_api", "async_availability_api"),
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Drive the sync and async variants of the read-heavy pages through the "
+        "ASGI application in this process and compare throughput, latency and "
+        "peak thread count at the same concurrency."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("username", help="Existing user to sign in as.")
+        parser.add_argument(
+            "--page", choices=list(PAGES), action="append", dest="pages"
+        )
+        parser.add_argument("--requests", type=int, default=500)
+        parser.add_argument("--concurrency", type=int, default=50)
+        parser.add_argument(
+            "--db-latency",
+            type=float,
+            default=0,
+            help="Milliseconds added to every query to mimic a networked database.",
+        )
+
+    def handle(self, *args, **options):
+        user = get_user_model().objects.filter(username=options["username"]).first()
+        if user is None:
+            raise CommandError(f"No user named {options['username']!r}.")
+        if options["requests"] < 1 or options["concurrency"] < 1:
+            raise CommandError("--requests and --concurrency must be positive.")
+
+        browser = Client()
+        browser.force_login(user)
+        cookie = "; ".join(
+            f"{name}={morsel.value}" for name, morsel in browser.cookies.items()
+        )
+        start = timezone.now() + timedelta(hours=1)
+        query = urlencode(
+            {
+                "start": start.isoformat(),
+                "end": (start + timedelta(hours=1)).isoformat(),
+            }
+        )
+
+        delay = options["db_latency"] / 1000
+
+        def add_latency(execute, sql, params, many, context):
+            time.sleep(delay)
+            return execute(sql, params, many, context)
+
+        def install_latency(sender, connection, **kwargs):
+            connection.execute_wrappers.append(add_latency)
+
+        if delay:
+            connection_created.connect(install_latency, weak=False)
+        app = get_asgi_application()
+        try:
+            for page in options["pages"] or list(PAGES):
+                for variant, name in zip(("sync", "async"), PAGES[page]):
+                    stats = asyncio.run(
+                        _drive(
+                            app,
+                            reverse(name),
+                            query if page == "availability" else "",
+                            cookie,
+                            options["requests"],
+                            options["concurrency"],
+                        )
+                    )
+                    self.stdout.write(_report(page, variant, stats))
+        finally:
+            connection_created.disconnect(install_latency)
+
+
+async def _request(app, path, query, cookie):
+    host = next(
+        (host for host in settings.ALLOWED_HOSTS if "*" not in host), "localhost"
+    )
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": query.encode(),
+        "root_path": "",
+        "headers": [(b"host", host.encode()), (b"cookie", cookie.encode())],
+        "client": ("127.0.0.1", 0),
+        "server": (host, 80),
+    }
+    sent_body = False
+    status = None
+
+    async def receive():
+        nonlocal sent_body
+        if not sent_body:
+            sent_body = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await asyncio.Event().wait()
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+
+    await app(scope, receive, send)
+    return status
+
+
+async def _drive(app, path, query, cookie, total, concurrency):
+    gate = asyncio.Semaphore(concurrency)
+    latencies = []
+    statuses = Counter()
+    peak_threads = threading.active_count()
+
+    async def sample_threads():
+        nonlocal peak_threads
+        while True:
+            peak_threads = max(peak_threads, threading.active_count())
+            await asyncio.sleep(0.005)
+
+    async def one():
+        async with gate:
+            began = time.perf_counter()
+            statuses[await _request(app, path, query, cookie)] += 1
+            latencies.append(time.perf_counter() - began)
+
+    sampler = asyncio.create_task(sample_threads())
+    began = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(total)))
+    elapsed = time.perf_counter() - began
+    sampler.cancel()
+    latencies.sort()
+    return {
+        "path": path,
+        "elapsed": elapsed,
+        "throughput": total / elapsed,
+        "p50": statistics.median(latencies),
+        "p95": latencies[max(int(len(latencies) * 0.95) - 1, 0)],
+        "peak_threads": peak_threads,
+        "statuses": dict(statuses),
+    }
+
+
+def _report(page, variant, stats):
+    return (
+        f"{page:<13}{variant:<6}{stats['path']:<28}"
+        f"{stats['throughput']:>9.1f} req/s  "
+        f"p50 {stats['p50'] * 1000:>7.1f} ms  "
+        f"p95 {stats['p95'] * 1000:>7.1f} ms  "
+        f"threads {stats['peak_threads']:>4}  "
+        f"status {stats['statuses']}"
+    )
@@ -0,0 +1,56 @@
+import statistics
+import time
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.contrib.sessions.backends.base import SessionBase
+from django.core.management.base import BaseCommand, CommandError
+from django.template.loader import render_to_string
+from django.test import RequestFactory
+
+from blog.services import dashboard_stats
+
+# Template -> context builder for the main pages built on base.html.
+PAGES = {
+    "index.html": dict,
+    "about_us.html": dict,
+    "dashboard.html": dashboard_stats,
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Time full template renders (context processors included) of the main "
+        "pages, for an anonymous visitor and optionally a signed-in user."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--username", help="Also render as this existing user.")
+        parser.add_argument("--iterations", type=int, default=200)
+
+    def handle(self, *args, **options):
+        if options["iterations"] < 1:
+            raise CommandError("--iterations must be positive.")
+        visitors = {"anonymous": AnonymousUser()}
+        if options["username"]:
+            user = get_user_model().objects.filter(username=options["username"]).first()
+            if user is None:
+                raise CommandError(f"No user named {options['username']!r}.")
+            visitors["signed in"] = user
+
+        factory = RequestFactory()
+        for template, context in PAGES.items():
+            for label, user in visitors.items():
+                request = factory.get("/")
+                request.user = user
+                request.session = SessionBase()
+                timings = []
+                for _ in range(options["iterations"]):
+                    began = time.perf_counter()
+                    render_to_string(template, context(), request=request)
+                    timings.append(time.perf_counter() - began)
+                self.stdout.write(
+                    f"{template:<16}{label:<11}"
+                    f"mean {statistics.fmean(timings) * 1000:>7.3f} ms  "
+                    f"median {statistics.median(timings) * 1000:>7.3f} ms"
+                )
@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from blog.services import lot_counter_drift, repair_lot_counters
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare the stored per-lot slot counters with the slots table and "
+        "optionally repair lots that drifted."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--repair",
+            action="store_true",
+            help="Overwrite drifted counters with the counted values.",
+        )
+
+    def handle(self, *args, **options):
+        drift = lot_counter_drift()
+        for lot, total, occupied in drift:
+            self.stdout.write(
+                f"{lot}: stored {lot.total_spaces}/{lot.occupied_spaces}, "
+                f"counted {total}/{occupied} (total/occupied)"
+            )
+        if not drift:
+            self.stdout.write(self.style.SUCCESS("All lot counters match."))
+            return
+        if not options["repair"]:
+            raise CommandError(
+                f"{len(drift)} lot(s) have drifted counters; rerun with --repair."
+            )
+        repaired = repair_lot_counters(drift)
+        self.stdout.write(self.style.SUCCESS(f"Repaired {repaired} lot(s)."))
@@ -0,0 +1,67 @@
+import sys
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from blog.exports import DATASETS, DEFAULT_CHUNK_SIZE, FORMATS, export_stream
+
+
+class Command(BaseCommand):
+    help = "Stream reservations or clients to a CSV or JSON Lines file."
+
+    def add_arguments(self, parser):
+        parser.add_argument("dataset", choices=list(DATASETS))
+        parser.add_argument(
+            "--output", "-o", default="-", help="File to write, or - for stdout."
+        )
+        parser.add_argument("--format", choices=FORMATS, default="csv")
+        parser.add_argument("--gzip", action="store_true", help="Gzip the output.")
+        parser.add_argument(
+            "--start", help="Reservations starting on or after this date."
+        )
+        parser.add_argument("--end", help="Reservations starting before this date.")
+        parser.add_argument("--status", help="Only reservations with this status.")
+        parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        filters = {}
+        if options["dataset"] == "reservations":
+            filters = {
+                "start": self._day(options["start"], "--start"),
+                "end": self._day(options["end"], "--end"),
+                "status": options["status"],
+            }
+        chunks = export_stream(
+            options["dataset"],
+            options["format"],
+            compress=options["gzip"],
+            chunk_size=options["chunk_size"],
+            **filters,
+        )
+
+        written = 0
+        if options["output"] == "-":
+            for chunk in chunks:
+                sys.stdout.buffer.write(chunk)
+            sys.stdout.buffer.flush()
+            return
+        try:
+            with open(options["output"], "wb") as target:
+                for chunk in chunks:
+                    target.write(chunk)
+                    written += len(chunk)
+        except OSError as exc:
+            raise CommandError(f"Cannot write {options['output']}: {exc}") from exc
+        self.stderr.write(
+            self.style.SUCCESS(f"Wrote {written} bytes to {options['output']}")
+        )
+
+    def _day(self, value, option):
+        if not value:
+            return None
+        day = parse_date(value)
+        if day is None:
+            raise CommandError(f"{option} must be an ISO 8601 date.")
+        return timezone.make_aware(datetime.combine(day, datetime.min.time()))
@@ -0,0 +1,65 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from blog.imports import DEFAULT_CHUNK_SIZE, FORMATS, detect_format, import_reservations
+
+
+class Command(BaseCommand):
+    help = "Stream reservations from a CSV or JSON Lines file into the database."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="File to import, or - for stdin.")
+        parser.add_argument(
+            "--format",
+            choices=FORMATS,
+            help="Input format (default: guessed from the file extension).",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=DEFAULT_CHUNK_SIZE,
+            help="Rows validated and inserted per batch.",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Validate the input without writing anything.",
+        )
+        parser.add_argument(
+            "--max-errors",
+            type=int,
+            default=100,
+            help="Row errors to print (all are counted).",
+        )
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        fmt = options["format"] or detect_format(path)
+        try:
+            if path == "-":
+                result = self._import(sys.stdin, fmt, options)
+            else:
+                with open(path, newline="", encoding="utf-8") as stream:
+                    result = self._import(stream, fmt, options)
+        except OSError as exc:
+            raise CommandError(f"Cannot read {path}: {exc}") from exc
+
+        for line, message in result.errors[: options["max_errors"]]:
+            self.stderr.write(f"line {line}: {message}")
+        verb = "validated" if options["dry_run"] else "imported"
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{result.created} of {result.rows} rows {verb}, "
+                f"{len(result.errors)} errors in {result.elapsed:.2f}s "
+                f"({result.rows_per_second:.0f} rows/s)"
+            )
+        )
+
+    def _import(self, stream, fmt, options):
+        return import_reservations(
+            stream,
+            fmt,
+            chunk_size=options["chunk_size"],
+            dry_run=options["dry_run"],
+        )
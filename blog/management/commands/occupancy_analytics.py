@@ -0,0 +1,38 @@
+import json
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from blog.analytics import analytics_report
+
+
+class Command(BaseCommand):
+    help = (
+        "Print occupancy heatmaps (weekday x hour) and revenue rollups for a "
+        "date range as JSON."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("start", help="First day (ISO 8601 date).")
+        parser.add_argument(
+            "end", nargs="?", help="Day after the last one; defaults to tomorrow."
+        )
+        parser.add_argument("--lot", type=int, help="Only this lot (primary key).")
+        parser.add_argument("--indent", type=int, default=2)
+
+    def handle(self, *args, **options):
+        start = parse_date(options["start"])
+        end = (
+            parse_date(options["end"])
+            if options["end"]
+            else timezone.localdate() + timedelta(days=1)
+        )
+        if start is None or end is None:
+            raise CommandError("Dates must be ISO 8601 (YYYY-MM-DD).")
+        try:
+            report = analytics_report(start, end, lot=options["lot"])
+        except ValueError as exc:
+            raise CommandError(str(exc)) from None
+        self.stdout.write(json.dumps(report, indent=options["indent"] or None))
@@ -0,0 +1,27 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from blog.availability import rebuild_availability_index
+
+
+class Command(BaseCommand):
+    help = "Rebuild the per-slot availability bitmap index from active reservations."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Rows fetched and inserted per batch.",
+        )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        written = rebuild_availability_index(batch_size=options["batch_size"])
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Rebuilt availability index: {written} rows in {elapsed:.2f}s"
+            )
+        )
@@ -0,0 +1,53 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from blog.models import Reservation
+from blog.tariffs import recompute_costs
+
+
+class Command(BaseCommand):
+    help = (
+        "Re-price reservations with the current tariffs. By default only "
+        "pending and confirmed reservations are touched."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--include-history",
+            action="store_true",
+            help="Also re-price completed and cancelled reservations.",
+        )
+        parser.add_argument(
+            "--since",
+            help="Only reservations starting at or after this ISO 8601 datetime.",
+        )
+        parser.add_argument("--batch-size", type=int, default=2000)
+
+    def handle(self, *args, **options):
+        reservations = Reservation.objects.order_by()
+        if not options["include_history"]:
+            reservations = reservations.filter(
+                reservation_status__in=Reservation.ACTIVE_STATUSES
+            )
+        if options["since"]:
+            since = parse_datetime(options["since"])
+            if since is None:
+                raise CommandError("--since must be an ISO 8601 datetime.")
+            if timezone.is_naive(since):
+                since = timezone.make_aware(since)
+            reservations = reservations.filter(start_time__gte=since)
+
+        started = time.perf_counter()
+        scanned, updated = recompute_costs(
+            reservations, batch_size=options["batch_size"]
+        )
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Re-priced {scanned} reservations, {updated} changed "
+                f"in {elapsed:.2f}s"
+            )
+        )
@@ -0,0 +1,73 @@
+import logging
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from blog.services import reconcile_boundaries, refresh_parking_state
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = (
+        "Keep slot occupancy and lot status in sync on a schedule. Each tick "
+        "refreshes slots whose reservations crossed a start/end boundary since "
+        "the previous tick; a full reconcile runs on start-up and every "
+        "--full-every ticks."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=settings.OCCUPANCY_RECONCILE_INTERVAL,
+            help="Seconds between ticks.",
+        )
+        parser.add_argument(
+            "--full-every",
+            type=int,
+            default=settings.OCCUPANCY_FULL_RECONCILE_EVERY,
+            help="Run a full reconcile every N ticks (0 disables).",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Run a single full reconcile pass and exit.",
+        )
+
+    def handle(self, *args, **options):
+        interval = max(options["interval"], 0.1)
+        full_every = options["full_every"]
+
+        last_tick = timezone.now()
+        self._run_pass("full", refresh_parking_state)
+        if options["once"]:
+            return
+
+        tick = 0
+        try:
+            while True:
+                time.sleep(interval)
+                tick += 1
+                now = timezone.now()
+                if full_every and tick % full_every == 0:
+                    self._run_pass("full", refresh_parking_state)
+                else:
+                    self._run_pass("boundary", reconcile_boundaries, last_tick, now=now)
+                last_tick = now
+        except KeyboardInterrupt:
+            self.stdout.write("Reconciler stopped.")
+
+    def _run_pass(self, kind, run, *args, **kwargs):
+        started = time.perf_counter()
+        try:
+            changed = run(*args, **kwargs)
+        except Exception:
+            logger.exception("Occupancy %s pass failed", kind)
+            return
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        message = f"{kind} pass took {elapsed_ms:.1f} ms, changed {changed} rows"
+        logger.info(message)
+        self.stdout.write(message)
@@ -0,0 +1,24 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from blog.occupancy import rollup_occupancy
+
+
+class Command(BaseCommand):
+    help = (
+        "Roll occupancy snapshots up into hourly and daily aggregates and "
+        "drop rows past their retention window. Run hourly, e.g. from cron."
+    )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        stats = rollup_occupancy()
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Rolled up {stats['hours']} hours and {stats['days']} days; "
+                f"pruned {stats['pruned_snapshots']} snapshots and "
+                f"{stats['pruned_hours']} hourly rows in {elapsed:.2f}s"
+            )
+        )
@@ -0,0 +1,51 @@
+# Generated by Django 4.2.20 on 2026-10-17 03:49
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("blog", "0009_alter_parkinglot_parking_and_more"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SlotAvailability",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("day", models.DateField()),
+                ("bitmap", models.BinaryField()),
+                (
+                    "parking_slot",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="availability_days",
+                        to="blog.parkingspace",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Slot availability",
+                "verbose_name_plural": "Slot availability",
+                "indexes": [
+                    models.Index(fields=["day"], name="slot_availability_day_idx")
+                ],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="slotavailability",
+            constraint=models.UniqueConstraint(
+                fields=("parking_slot", "day"), name="unique_slot_availability_day"
+            ),
+        ),
+    ]
@@ -0,0 +1,55 @@
+# Generated by Django 4.2.20 on 2026-10-17 03:51
+
+from django.db import migrations, models
+from django.db.models import Max
+
+RESERVATION_NUMBER_BASE = 1000
+
+
+def seed_reservation_numbers(apps, schema_editor):
+    Reservation = apps.get_model("blog", "Reservation")
+    NumberSequence = apps.get_model("blog", "NumberSequence")
+    highest = Reservation.objects.aggregate(highest=Max("reservation_number"))
+    last = max(highest["highest"] or 0, RESERVATION_NUMBER_BASE)
+    NumberSequence.objects.update_or_create(
+        name="reservation_number", defaults={"value": last}
+    )
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute(
+            "CREATE SEQUENCE IF NOT EXISTS blog_reservation_number_seq"
+        )
+        schema_editor.execute(
+            "SELECT setval('blog_reservation_number_seq', %s)", [last]
+        )
+
+
+def drop_reservation_number_sequence(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute("DROP SEQUENCE IF EXISTS blog_reservation_number_seq")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("blog", "0010_slotavailability"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="NumberSequence",
+            fields=[
+                (
+                    "name",
+                    models.CharField(max_length=50, primary_key=True, serialize=False),
+                ),
+                ("value", models.BigIntegerField(default=0)),
+            ],
+            options={
+                "verbose_name": "Number sequence",
+                "verbose_name_plural": "Number sequences",
+            },
+        ),
+        migrations.RunPython(
+            seed_reservation_numbers, drop_reservation_number_sequence
+        ),
+    ]
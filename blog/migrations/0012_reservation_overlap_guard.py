@@ -0,0 +1,92 @@
+# Generated by Django 4.2.20 on 2026-10-17 03:52
+
+from django.db import migrations, models
+
+CONSTRAINT = "reservation_no_active_overlap"
+ACTIVE = "('PENDING', 'CONFIRMED')"
+
+POSTGRES_FORWARD = [
+    "CREATE EXTENSION IF NOT EXISTS btree_gist",
+    f"""
+    ALTER TABLE blog_reservation ADD CONSTRAINT {CONSTRAINT}
+    EXCLUDE USING gist (
+        parking_slot_id WITH =,
+        tstzrange(start_time, end_time, '[)') WITH &&
+    )
+    WHERE (reservation_status IN {ACTIVE})
+    """,
+]
+POSTGRES_REVERSE = [
+    f"ALTER TABLE blog_reservation DROP CONSTRAINT IF EXISTS {CONSTRAINT}",
+]
+
+SQLITE_OVERLAP_CHECK = f"""
+    WHEN NEW.reservation_status IN {ACTIVE}
+        AND NEW.parking_slot_id IS NOT NULL
+        AND NEW.start_time IS NOT NULL
+        AND NEW.end_time IS NOT NULL
+    BEGIN
+        SELECT RAISE(ABORT, '{CONSTRAINT}')
+        WHERE EXISTS (
+            SELECT 1 FROM blog_reservation
+            WHERE parking_slot_id = NEW.parking_slot_id
+              AND reservation_status IN {ACTIVE}
+              AND start_time < NEW.end_time
+              AND end_time > NEW.start_time
+              AND id IS NOT NEW.id
+        );
+    END
+"""
+SQLITE_FORWARD = [
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {CONSTRAINT}_insert
+    BEFORE INSERT ON blog_reservation
+    {SQLITE_OVERLAP_CHECK}
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {CONSTRAINT}_update
+    BEFORE UPDATE OF parking_slot_id, start_time, end_time, reservation_status
+    ON blog_reservation
+    {SQLITE_OVERLAP_CHECK}
+    """,
+]
+SQLITE_REVERSE = [
+    f"DROP TRIGGER IF EXISTS {CONSTRAINT}_insert",
+    f"DROP TRIGGER IF EXISTS {CONSTRAINT}_update",
+]
+
+
+def _run(statements_by_vendor):
+    def run(apps, schema_editor):
+        for statement in statements_by_vendor.get(schema_editor.connection.vendor, []):
+            schema_editor.execute(statement)
+
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("blog", "0011_numbersequence"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="reservation",
+            index=models.Index(
+                fields=["parking_slot", "start_time", "end_time"],
+                name="reservation_slot_window_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="reservation",
+            index=models.Index(
+                fields=["reservation_status", "end_time"],
+                name="reservation_status_end_idx",
+            ),
+        ),
+        migrations.RunPython(
+            _run({"postgresql": POSTGRES_FORWARD, "sqlite": SQLITE_FORWARD}),
+            _run({"postgresql": POSTGRES_REVERSE, "sqlite": SQLITE_REVERSE}),
+        ),
+    ]
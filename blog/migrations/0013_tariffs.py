@@ -0,0 +1,98 @@
+# Generated by Django 4.2.20 on 2026-10-17 03:58
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("blog", "0012_reservation_overlap_guard"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Tariff",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("name", models.CharField(max_length=80)),
+                (
+                    "space_type",
+                    models.CharField(
+                        blank=True,
+                        choices=[
+                            ("BOX", "Box parking"),
+                            ("Angular", "Angular parking"),
+                        ],
+                        max_length=20,
+                        null=True,
+                    ),
+                ),
+                ("hourly_rate", models.DecimalField(decimal_places=2, max_digits=6)),
+                (
+                    "daily_cap",
+                    models.DecimalField(
+                        blank=True,
+                        decimal_places=2,
+                        help_text="Maximum charged per calendar day of a booking.",
+                        max_digits=8,
+                        null=True,
+                    ),
+                ),
+                ("is_active", models.BooleanField(default=True)),
+                (
+                    "parking_lot",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="tariffs",
+                        to="blog.parkinglot",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Tariff",
+                "verbose_name_plural": "Tariffs",
+                "ordering": ["name"],
+            },
+        ),
+        migrations.CreateModel(
+            name="TariffBand",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("starts_at", models.TimeField()),
+                ("ends_at", models.TimeField()),
+                ("hourly_rate", models.DecimalField(decimal_places=2, max_digits=6)),
+                (
+                    "tariff",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="bands",
+                        to="blog.tariff",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Tariff band",
+                "verbose_name_plural": "Tariff bands",
+                "ordering": ["tariff", "starts_at"],
+            },
+        ),
+    ]
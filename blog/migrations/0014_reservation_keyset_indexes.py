@@ -0,0 +1,33 @@
+# Generated by Django 4.2.20 on 2026-10-17 04:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("blog", "0013_tariffs"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="reservation",
+            index=models.Index(
+                fields=["-start_time", "-id"], name="reservation_start_id_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="reservation",
+            index=models.Index(
+                fields=["reservation_status", "-start_time", "-id"],
+                name="reservation_status_start_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="reservation",
+            index=models.Index(
+                fields=["client", "-start_time", "-id"],
+                name="reservation_client_start_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 4.2.20 on 2026-10-17 04:04
+
+from django.db import migrations, models
+from django.db.models import Count, Q
+
+
+def backfill_lot_counters(apps, schema_editor):
+    ParkingLot = apps.get_model("blog", "ParkingLot")
+    lots = list(
+        ParkingLot.objects.annotate(
+            space_count=Count("spaces"),
+            occupied_count=Count("spaces", filter=Q(spaces__is_occupied=True)),
+        )
+    )
+    for lot in lots:
+        lot.total_spaces = lot.space_count
+        lot.occupied_spaces = lot.occupied_count
+    ParkingLot.objects.bulk_update(lots, ["total_spaces", "occupied_spaces"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("blog", "0014_reservation_keyset_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="parkinglot",
+            name="occupied_spaces",
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="parkinglot",
+            name="total_spaces",
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_lot_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,101 @@
+# Generated by Django 4.2.20 on 2026-10-17 04:06
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("blog", "0015_parkinglot_counters"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="OccupancyRollup",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "resolution",
+                    models.CharField(
+                        choices=[("hour", "Hour"), ("day", "Day")], max_length=4
+                    ),
+                ),
+                ("bucket_start", models.DateTimeField()),
+                ("occupied_avg", models.FloatField()),
+                ("occupied_min", models.PositiveIntegerField()),
+                ("occupied_max", models.PositiveIntegerField()),
+                ("occupied_close", models.PositiveIntegerField()),
+                ("total_close", models.PositiveIntegerField()),
+                (
+                    "parking_lot",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="occupancy_rollups",
+                        to="blog.parkinglot",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Occupancy rollup",
+                "verbose_name_plural": "Occupancy rollups",
+                "ordering": ["parking_lot", "resolution", "bucket_start"],
+            },
+        ),
+        migrations.CreateModel(
+            name="OccupancySnapshot",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("taken_at", models.DateTimeField()),
+                ("occupied", models.PositiveIntegerField()),
+                ("total", models.PositiveIntegerField()),
+                (
+                    "parking_lot",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="occupancy_snapshots",
+                        to="blog.parkinglot",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Occupancy snapshot",
+                "verbose_name_plural": "Occupancy snapshots",
+                "ordering": ["parking_lot", "taken_at"],
+                "indexes": [
+                    models.Index(
+                        fields=["taken_at"], name="occupancy_snapshot_taken_idx"
+                    )
+                ],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="occupancysnapshot",
+            constraint=models.UniqueConstraint(
+                fields=("parking_lot", "taken_at"), name="unique_lot_snapshot_minute"
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="occupancyrollup",
+            constraint=models.UniqueConstraint(
+                fields=("parking_lot", "resolution", "bucket_start"),
+                name="unique_lot_rollup_bucket",
+            ),
+        ),
+    ]
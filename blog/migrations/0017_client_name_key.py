@@ -0,0 +1,37 @@
+# Generated by Django 4.2.20 on 2026-10-17 04:24
+
+from django.db import migrations, models
+
+BATCH_SIZE = 1000
+
+
+def backfill_name_keys(apps, schema_editor):
+    Client = apps.get_model("blog", "Client")
+    rows = Client.objects.only("id", "full_name").order_by("pk")
+    batch = []
+    for client in rows.iterator(chunk_size=BATCH_SIZE):
+        client.name_key = " ".join((client.full_name or "").split()).casefold()
+        batch.append(client)
+        if len(batch) == BATCH_SIZE:
+            Client.objects.bulk_update(batch, ["name_key"])
+            batch = []
+    if batch:
+        Client.objects.bulk_update(batch, ["name_key"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("blog", "0016_occupancy_history"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="client",
+            name="name_key",
+            field=models.CharField(
+                db_index=True, default="", editable=False, max_length=360
+            ),
+        ),
+        migrations.RunPython(backfill_name_keys, migrations.RunPython.noop),
+    ]
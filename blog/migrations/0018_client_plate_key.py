@@ -0,0 +1,46 @@
+# Generated by Django 4.2.20 on 2026-10-17 04:27
+
+from django.db import migrations, models
+
+BATCH_SIZE = 1000
+
+
+def backfill_plate_keys(apps, schema_editor):
+    Client = apps.get_model("blog", "Client")
+    rows = Client.objects.only("id", "plate_number").order_by("pk")
+    batch = []
+    for client in rows.iterator(chunk_size=BATCH_SIZE):
+        client.plate_key = "".join(
+            char for char in (client.plate_number or "").casefold() if char.isalnum()
+        )
+        batch.append(client)
+        if len(batch) == BATCH_SIZE:
+            Client.objects.bulk_update(batch, ["plate_key"])
+            batch = []
+    if batch:
+        Client.objects.bulk_update(batch, ["plate_key"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("blog", "0017_client_name_key"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="client",
+            name="plate_key",
+            field=models.CharField(
+                db_index=True, default="", editable=False, max_length=30
+            ),
+        ),
+        migrations.AlterField(
+            model_name="client",
+            name="contact",
+            field=models.CharField(
+                db_index=True, max_length=13, verbose_name="Client contact"
+            ),
+        ),
+        migrations.RunPython(backfill_plate_keys, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 4.2.20 on 2026-10-17 04:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("blog", "0018_client_plate_key"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="reservation",
+            name="arrived_at",
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name="reservation",
+            name="departed_at",
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 4.2.20 on 2026-10-17 04:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("blog", "0019_reservation_gate_times"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="parkingspace",
+            name="sensor_occupied",
+            field=models.BooleanField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name="parkingspace",
+            name="sensor_reported_at",
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+    ]
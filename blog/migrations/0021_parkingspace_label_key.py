@@ -0,0 +1,37 @@
+# Generated by Django 4.2.20 on 2026-10-17 04:53
+
+from django.db import migrations, models
+
+BATCH_SIZE = 1000
+
+
+def backfill_label_keys(apps, schema_editor):
+    ParkingSpace = apps.get_model("blog", "ParkingSpace")
+    rows = ParkingSpace.objects.only("id", "label").order_by("pk")
+    batch = []
+    for space in rows.iterator(chunk_size=BATCH_SIZE):
+        space.label_key = (space.label or "").strip().casefold()
+        batch.append(space)
+        if len(batch) == BATCH_SIZE:
+            ParkingSpace.objects.bulk_update(batch, ["label_key"])
+            batch = []
+    if batch:
+        ParkingSpace.objects.bulk_update(batch, ["label_key"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("blog", "0020_parkingspace_sensor_state"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="parkingspace",
+            name="label_key",
+            field=models.CharField(
+                db_index=True, default="", editable=False, max_length=60
+            ),
+        ),
+        migrations.RunPython(backfill_label_keys, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,59 @@
+# Generated by Django 4.2.20 on 2026-10-17 05:20
+
+from collections import defaultdict
+
+from django.db import migrations
+
+from blog.availability import buckets_per_day, window_masks
+
+BATCH_SIZE = 1000
+ACTIVE_STATUSES = ("PENDING", "CONFIRMED")
+
+
+def build_availability_index(apps, schema_editor):
+    """Index every active reservation; availability lookups now trust the index."""
+    Reservation = apps.get_model("blog", "Reservation")
+    SlotAvailability = apps.get_model("blog", "SlotAvailability")
+    size = (buckets_per_day() + 7) // 8
+    bookings = (
+        Reservation.objects.filter(
+            reservation_status__in=ACTIVE_STATUSES, parking_slot__isnull=False
+        )
+        .order_by("parking_slot_id")
+        .values_list("parking_slot_id", "start_time", "end_time")
+    )
+    SlotAvailability.objects.all().delete()
+    rows = []
+    slot, bitmaps = None, defaultdict(int)
+
+    def collect():
+        rows.extend(
+            SlotAvailability(
+                parking_slot_id=slot, day=day, bitmap=bits.to_bytes(size, "little")
+            )
+            for day, bits in bitmaps.items()
+        )
+        if len(rows) >= BATCH_SIZE:
+            SlotAvailability.objects.bulk_create(rows)
+            rows.clear()
+
+    for slot_id, start, end in bookings.iterator(chunk_size=BATCH_SIZE):
+        if slot_id != slot:
+            collect()
+            slot, bitmaps = slot_id, defaultdict(int)
+        if start and end and start < end:
+            for day, mask in window_masks(start, end).items():
+                bitmaps[day] |= mask
+    collect()
+    SlotAvailability.objects.bulk_create(rows)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("blog", "0021_parkingspace_label_key"),
+    ]
+
+    operations = [
+        migrations.RunPython(build_availability_index, migrations.RunPython.noop),
+    ]
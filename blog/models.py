@@ -3,9 +3,12 @@ from __future__ import annotations
 from decimal import Decimal
 
 from django.core.exceptions import ValidationError
-from django.db import models
+from django.db import IntegrityError, connections, models, router
 from django.utils import timezone
 
+from blog.sequences import reservation_numbers
+from blog.tariffs import quote
+
 
 class Client(models.Model):
     """Vehicle owner information."""
@@ -17,7 +20,9 @@ class Client(models.Model):
     ]
 
     full_name = models.CharField(max_length=120, default="Unnamed Client")
-    contact = models.CharField(max_length=13, verbose_name="Client contact")
+    contact = models.CharField(
+        max_length=13, verbose_name="Client contact", db_index=True
+    )
     plate_number = models.CharField(max_length=10)
     dimension = models.PositiveIntegerField()
     car_type = models.CharField(
@@ -28,6 +33,17 @@ class Client(models.Model):
         choices=CAR_TYPE_OPTIONS,
     )
     created_at = models.DateTimeField(auto_now_add=True, null=True)
+    # Case-folded ``full_name`` for indexed prefix search (see
+    # ``blog.services.search_clients``). Case folding turns a character into
+    # at most three, so the keys get three times the source length.
+    name_key = models.CharField(
+        max_length=360, db_index=True, editable=False, default=""
+    )
+    # ``plate_number`` case-folded with separators stripped, for exact and
+    # prefix plate lookups (see ``blog.services.clients_by_plate``).
+    plate_key = models.CharField(
+        max_length=30, db_index=True, editable=False, default=""
+    )
 
     class Meta:
         ordering = ["-created_at"]
@@ -37,6 +53,27 @@ class Client(models.Model):
     def __str__(self) -> str:
         return f"{self.full_name} - {self.plate_number}"
 
+    @staticmethod
+    def normalize_name(value):
+        return " ".join((value or "").split()).casefold()
+
+    @staticmethod
+    def normalize_plate(value):
+        return "".join(char for char in (value or "").casefold() if char.isalnum())
+
+    def save(self, *args, **kwargs):
+        self.name_key = self.normalize_name(self.full_name)
+        self.plate_key = self.normalize_plate(self.plate_number)
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None:
+            update_fields = set(update_fields)
+            if "full_name" in update_fields:
+                update_fields.add("name_key")
+            if "plate_number" in update_fields:
+                update_fields.add("plate_key")
+            kwargs["update_fields"] = update_fields
+        super().save(*args, **kwargs)
+
 
 class Parking(models.Model):
     """Raw parking record (currently used as a reference for lots)."""
@@ -61,6 +98,10 @@ class ParkingLot(models.Model):
     )
     current_status = models.CharField(max_length=32, default="Open")
     lot_capacity = models.PositiveIntegerField(default=10)
+    # Denormalized slot counters, kept in step with F() updates by
+    # ``blog.services`` (see ``manage.py check_lot_counters``).
+    total_spaces = models.IntegerField(default=0, editable=False)
+    occupied_spaces = models.IntegerField(default=0, editable=False)
 
     class Meta:
         ordering = ["lot_id"]
@@ -70,6 +111,14 @@ class ParkingLot(models.Model):
     def __str__(self):
         return f"Lot {self.lot_id}"
 
+    @property
+    def capacity(self):
+        return self.lot_capacity or self.total_spaces
+
+    @property
+    def available_spaces(self):
+        return max(self.capacity - self.occupied_spaces, 0)
+
 
 class ParkingSpace(models.Model):
     SPACE_TYPE_OPTIONS = [
@@ -91,6 +140,14 @@ class ParkingSpace(models.Model):
     dimension_limit = models.PositiveIntegerField(default=500)
     is_active = models.BooleanField(default=True)
     is_occupied = models.BooleanField(default=False)
+    # Last state reported by the bay sensor, if any (see ``blog.sensors``).
+    sensor_occupied = models.BooleanField(null=True, blank=True, editable=False)
+    sensor_reported_at = models.DateTimeField(null=True, blank=True, editable=False)
+    # Case-folded ``label`` for indexed prefix search (see
+    # ``blog.services.search_slots``), sized like ``Client.name_key``.
+    label_key = models.CharField(
+        max_length=60, db_index=True, editable=False, default=""
+    )
 
     class Meta:
         ordering = ["floor_number", "label"]
@@ -100,6 +157,17 @@ class ParkingSpace(models.Model):
     def __str__(self):
         return f"{self.label} (Floor {self.floor_number})"
 
+    @staticmethod
+    def normalize_label(value):
+        return (value or "").strip().casefold()
+
+    def save(self, *args, **kwargs):
+        self.label_key = self.normalize_label(self.label)
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and "label" in update_fields:
+            kwargs["update_fields"] = {*update_fields, "label_key"}
+        super().save(*args, **kwargs)
+
     def is_available(self, start_time, end_time, exclude_reservation_id=None):
         """Return True when the slot has no overlapping active reservations."""
         overlapping = self.reservations.filter(
@@ -125,6 +193,12 @@ class ParkingSpace(models.Model):
         )
 
 
+# Name of the database-level guard against overlapping active reservations: a
+# Postgres exclusion constraint or SQLite triggers (migration 0012).
+RESERVATION_OVERLAP_CONSTRAINT = "reservation_no_active_overlap"
+OVERLAP_ENFORCING_VENDORS = ("postgresql", "sqlite")
+
+
 class Reservation(models.Model):
     RESERVATION_TYPE_OPTIONS = [
         ("BOX", "Box parking"),
@@ -163,11 +237,38 @@ class Reservation(models.Model):
         max_digits=8, decimal_places=2, default=Decimal("0")
     )
     created_at = models.DateTimeField(auto_now_add=True, null=True)
+    # When the vehicle actually passed the gate (see ``blog.gate``).
+    arrived_at = models.DateTimeField(null=True, blank=True, editable=False)
+    departed_at = models.DateTimeField(null=True, blank=True, editable=False)
+
+    OVERLAP_ERROR = "The selected slot is not available during the requested period."
 
     class Meta:
         ordering = ["-start_time"]
         verbose_name = "Reservation"
         verbose_name_plural = "Reservations"
+        indexes = [
+            models.Index(
+                fields=["parking_slot", "start_time", "end_time"],
+                name="reservation_slot_window_idx",
+            ),
+            models.Index(
+                fields=["reservation_status", "end_time"],
+                name="reservation_status_end_idx",
+            ),
+            # Keyset pagination of the reservation list and its filters.
+            models.Index(
+                fields=["-start_time", "-id"], name="reservation_start_id_idx"
+            ),
+            models.Index(
+                fields=["reservation_status", "-start_time", "-id"],
+                name="reservation_status_start_idx",
+            ),
+            models.Index(
+                fields=["client", "-start_time", "-id"],
+                name="reservation_client_start_idx",
+            ),
+        ]
 
     def __str__(self):
         return f"Reservation #{self.reservation_number}"
@@ -187,6 +288,11 @@ class Reservation(models.Model):
         if self.end_time <= self.start_time:
             raise ValidationError("Checkout time must be later than check in time.")
 
+        if self.reservation_status not in Reservation.ACTIVE_STATUSES:
+            return
+        if getattr(self, "_overlap_enforced_by_db", False):
+            return
+
         overlapping = Reservation.objects.filter(
             parking_slot=self.parking_slot,
             start_time__lt=self.end_time,
@@ -196,23 +302,23 @@ class Reservation(models.Model):
         if self.pk:
             overlapping = overlapping.exclude(pk=self.pk)
         if overlapping.exists():
-            raise ValidationError(
-                "The selected slot is not available during the requested period."
-            )
+            raise ValidationError(self.OVERLAP_ERROR)
 
     def save(self, *args, **kwargs):
         if not self.reservation_number:
-            last_reservation = Reservation.objects.order_by(
-                "-reservation_number"
-            ).first()
-            base_number = (
-                last_reservation.reservation_number if last_reservation else 1000
-            )
-            self.reservation_number = base_number + 1
+            self.reservation_number = reservation_numbers.next()
 
-        self.full_clean()
-        hourly_rate = Decimal("2.50")
-        self.total_cost = (self.duration_hours * hourly_rate).quantize(Decimal("0.01"))
+        # Where the database guards against overlaps, skip the extra overlap
+        # query here and translate a constraint violation instead.
+        using = kwargs.get("using") or router.db_for_write(Reservation, instance=self)
+        self._overlap_enforced_by_db = (
+            connections[using].vendor in OVERLAP_ENFORCING_VENDORS
+        )
+        try:
+            self.full_clean()
+        finally:
+            self._overlap_enforced_by_db = False
+        self.total_cost = quote(self.parking_slot, self.start_time, self.end_time)
 
         if (
             self.reservation_status == Reservation.ReservationStatus.CONFIRMED
@@ -221,4 +327,167 @@ class Reservation(models.Model):
         ):
             self.reservation_status = Reservation.ReservationStatus.COMPLETED
 
-        super().save(*args, **kwargs)
+        try:
+            super().save(*args, **kwargs)
+        except IntegrityError as exc:
+            if RESERVATION_OVERLAP_CONSTRAINT in str(exc):
+                raise ValidationError(self.OVERLAP_ERROR) from exc
+            raise
+
+
+class Tariff(models.Model):
+    """Hourly pricing for a lot and/or space type (see ``blog.tariffs``).
+
+    Leave ``parking_lot`` or ``space_type`` empty to match any; the most
+    specific active tariff wins.
+    """
+
+    name = models.CharField(max_length=80)
+    parking_lot = models.ForeignKey(
+        ParkingLot,
+        on_delete=models.CASCADE,
+        related_name="tariffs",
+        null=True,
+        blank=True,
+    )
+    space_type = models.CharField(
+        max_length=20,
+        null=True,
+        blank=True,
+        choices=ParkingSpace.SPACE_TYPE_OPTIONS,
+    )
+    hourly_rate = models.DecimalField(max_digits=6, decimal_places=2)
+    daily_cap = models.DecimalField(
+        max_digits=8,
+        decimal_places=2,
+        null=True,
+        blank=True,
+        help_text="Maximum charged per calendar day of a booking.",
+    )
+    is_active = models.BooleanField(default=True)
+
+    class Meta:
+        ordering = ["name"]
+        verbose_name = "Tariff"
+        verbose_name_plural = "Tariffs"
+
+    def __str__(self):
+        return self.name
+
+
+class TariffBand(models.Model):
+    """Time-of-day rate override; bands ending before they start wrap midnight."""
+
+    tariff = models.ForeignKey(Tariff, on_delete=models.CASCADE, related_name="bands")
+    starts_at = models.TimeField()
+    ends_at = models.TimeField()
+    hourly_rate = models.DecimalField(max_digits=6, decimal_places=2)
+
+    class Meta:
+        ordering = ["tariff", "starts_at"]
+        verbose_name = "Tariff band"
+        verbose_name_plural = "Tariff bands"
+
+    def __str__(self):
+        return f"{self.tariff} {self.starts_at:%H:%M}-{self.ends_at:%H:%M}"
+
+
+class NumberSequence(models.Model):
+    """Counter row backing ``blog.sequences.BlockAllocator`` on non-Postgres DBs."""
+
+    name = models.CharField(max_length=50, primary_key=True)
+    value = models.BigIntegerField(default=0)
+
+    class Meta:
+        verbose_name = "Number sequence"
+        verbose_name_plural = "Number sequences"
+
+    def __str__(self):
+        return f"{self.name} = {self.value}"
+
+
+class SlotAvailability(models.Model):
+    """Per-slot, per-day bitmap of booked time buckets (see ``blog.availability``)."""
+
+    parking_slot = models.ForeignKey(
+        ParkingSpace, on_delete=models.CASCADE, related_name="availability_days"
+    )
+    day = models.DateField()
+    bitmap = models.BinaryField()
+
+    class Meta:
+        verbose_name = "Slot availability"
+        verbose_name_plural = "Slot availability"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["parking_slot", "day"], name="unique_slot_availability_day"
+            )
+        ]
+        indexes = [models.Index(fields=["day"], name="slot_availability_day_idx")]
+
+    def __str__(self):
+        return f"{self.parking_slot_id} on {self.day}"
+
+
+class OccupancySnapshot(models.Model):
+    """A lot's slot counters at one minute, written when they change.
+
+    See ``blog.occupancy`` for the write path, rollups and range queries.
+    """
+
+    parking_lot = models.ForeignKey(
+        ParkingLot, on_delete=models.CASCADE, related_name="occupancy_snapshots"
+    )
+    taken_at = models.DateTimeField()
+    occupied = models.PositiveIntegerField()
+    total = models.PositiveIntegerField()
+
+    class Meta:
+        ordering = ["parking_lot", "taken_at"]
+        verbose_name = "Occupancy snapshot"
+        verbose_name_plural = "Occupancy snapshots"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["parking_lot", "taken_at"], name="unique_lot_snapshot_minute"
+            )
+        ]
+        indexes = [
+            models.Index(fields=["taken_at"], name="occupancy_snapshot_taken_idx")
+        ]
+
+    def __str__(self):
+        return f"{self.parking_lot_id} at {self.taken_at}: {self.occupied}"
+
+
+class OccupancyRollup(models.Model):
+    """Time-weighted occupancy of a lot over one hour or one day."""
+
+    class Resolution(models.TextChoices):
+        HOUR = "hour", "Hour"
+        DAY = "day", "Day"
+
+    parking_lot = models.ForeignKey(
+        ParkingLot, on_delete=models.CASCADE, related_name="occupancy_rollups"
+    )
+    resolution = models.CharField(max_length=4, choices=Resolution.choices)
+    bucket_start = models.DateTimeField()
+    occupied_avg = models.FloatField()
+    occupied_min = models.PositiveIntegerField()
+    occupied_max = models.PositiveIntegerField()
+    # Counters at the end of the bucket, carried into the next one.
+    occupied_close = models.PositiveIntegerField()
+    total_close = models.PositiveIntegerField()
+
+    class Meta:
+        ordering = ["parking_lot", "resolution", "bucket_start"]
+        verbose_name = "Occupancy rollup"
+        verbose_name_plural = "Occupancy rollups"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["parking_lot", "resolution", "bucket_start"],
+                name="unique_lot_rollup_bucket",
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.parking_lot_id} {self.resolution} {self.bucket_start}"
@@ -0,0 +1,326 @@
+"""Per-lot occupancy history.
+
+Whenever a lot's slot counters change, ``record_lot_occupancy`` upserts an
+``OccupancySnapshot`` for the current minute (the last change in a minute
+wins). ``rollup_occupancy`` folds complete UTC hours of snapshots into
+time-weighted hourly ``OccupancyRollup`` rows, complete days of hours into
+daily rows, and then drops raw snapshots and hourly rows older than their
+retention windows. ``occupancy_series`` answers range queries from the
+coarsest table that still resolves the range, so a year is a few hundred
+indexed rows per lot.
+"""
+
+from __future__ import annotations
+
+import datetime as dt
+from collections import defaultdict
+
+from django.conf import settings
+from django.utils import timezone
+
+UTC = dt.timezone.utc
+MINUTE = dt.timedelta(minutes=1)
+HOUR = dt.timedelta(hours=1)
+DAY = dt.timedelta(days=1)
+
+
+def _floor(value, step):
+    value = value.astimezone(UTC).replace(second=0, microsecond=0)
+    if step >= HOUR:
+        value = value.replace(minute=0)
+    if step >= DAY:
+        value = value.replace(hour=0)
+    return value
+
+
+def record_lot_occupancy(lot_ids, at=None):
+    """Snapshot the current counters of ``lot_ids``. Return the rows written."""
+    from blog.models import OccupancySnapshot, ParkingLot
+
+    lot_ids = {pk for pk in lot_ids if pk is not None}
+    if not lot_ids:
+        return 0
+    taken_at = _floor(at or timezone.now(), MINUTE)
+    snapshots = [
+        OccupancySnapshot(
+            parking_lot_id=pk,
+            taken_at=taken_at,
+            occupied=max(occupied, 0),
+            total=max(total, 0),
+        )
+        for pk, occupied, total in ParkingLot.objects.filter(
+            pk__in=lot_ids
+        ).values_list("pk", "occupied_spaces", "total_spaces")
+    ]
+    OccupancySnapshot.objects.bulk_create(
+        snapshots,
+        update_conflicts=True,
+        unique_fields=["parking_lot", "taken_at"],
+        update_fields=["occupied", "total"],
+    )
+    return len(snapshots)
+
+
+def summarize_steps(points, start, end, opening=None):
+    """Summarize a step series over ``[start, end)``.
+
+    ``points`` are sorted ``(taken_at, occupied, total)`` changes inside the
+    window and ``opening`` the ``(occupied, total)`` in force at ``start``, if
+    any. Return ``(avg, min, max, occupied_close, total_close)`` weighted by
+    how long each value was in force, or None when no value covers the window.
+    """
+    current = opening
+    cursor = start
+    area = covered = 0.0
+    low = high = None
+    for taken_at, occupied, total in [*points, (end, None, None)]:
+        if current is not None and taken_at > cursor:
+            seconds = (taken_at - cursor).total_seconds()
+            area += current[0] * seconds
+            covered += seconds
+            low = current[0] if low is None else min(low, current[0])
+            high = current[0] if high is None else max(high, current[0])
+        cursor = taken_at
+        if occupied is not None:
+            current = (occupied, total)
+    if current is None or not covered:
+        return None
+    return area / covered, low, high, current[0], current[1]
+
+
+def _rollup_hours(lot_id, until):
+    from blog.models import OccupancyRollup, OccupancySnapshot
+
+    last = (
+        OccupancyRollup.objects.filter(
+            parking_lot_id=lot_id, resolution=OccupancyRollup.Resolution.HOUR
+        )
+        .order_by("-bucket_start")
+        .first()
+    )
+    snapshots = OccupancySnapshot.objects.filter(parking_lot_id=lot_id)
+    if last is not None:
+        start = last.bucket_start + HOUR
+        opening = (last.occupied_close, last.total_close)
+    else:
+        first = snapshots.order_by("taken_at").values_list("taken_at", flat=True)
+        first = first.first()
+        if first is None:
+            return []
+        start, opening = _floor(first, HOUR), None
+    if start >= until:
+        return []
+
+    by_hour = defaultdict(list)
+    for point in (
+        snapshots.filter(taken_at__gte=start, taken_at__lt=until)
+        .order_by("taken_at")
+        .values_list("taken_at", "occupied", "total")
+    ):
+        by_hour[_floor(point[0], HOUR)].append(point)
+
+    rollups = []
+    bucket = start
+    while bucket < until:
+        summary = summarize_steps(
+            by_hour.get(bucket, []), bucket, bucket + HOUR, opening
+        )
+        if summary is not None:
+            avg, low, high, occupied_close, total_close = summary
+            rollups.append(
+                OccupancyRollup(
+                    parking_lot_id=lot_id,
+                    resolution=OccupancyRollup.Resolution.HOUR,
+                    bucket_start=bucket,
+                    occupied_avg=avg,
+                    occupied_min=low,
+                    occupied_max=high,
+                    occupied_close=occupied_close,
+                    total_close=total_close,
+                )
+            )
+            opening = (occupied_close, total_close)
+        bucket += HOUR
+    return rollups
+
+
+def _rollup_days(lot_id, until):
+    from blog.models import OccupancyRollup
+
+    hours = OccupancyRollup.objects.filter(
+        parking_lot_id=lot_id, resolution=OccupancyRollup.Resolution.HOUR
+    )
+    last = (
+        OccupancyRollup.objects.filter(
+            parking_lot_id=lot_id, resolution=OccupancyRollup.Resolution.DAY
+        )
+        .order_by("-bucket_start")
+        .values_list("bucket_start", flat=True)
+        .first()
+    )
+    if last is not None:
+        start = last + DAY
+    else:
+        first = hours.order_by("bucket_start").values_list("bucket_start", flat=True)
+        first = first.first()
+        if first is None:
+            return []
+        start = _floor(first, DAY)
+    if start >= until:
+        return []
+
+    by_day = defaultdict(list)
+    for row in hours.filter(bucket_start__gte=start, bucket_start__lt=until).order_by(
+        "bucket_start"
+    ):
+        by_day[_floor(row.bucket_start, DAY)].append(row)
+
+    rollups = []
+    for day, rows in sorted(by_day.items()):
+        rollups.append(
+            OccupancyRollup(
+                parking_lot_id=lot_id,
+                resolution=OccupancyRollup.Resolution.DAY,
+                bucket_start=day,
+                occupied_avg=sum(row.occupied_avg for row in rows) / len(rows),
+                occupied_min=min(row.occupied_min for row in rows),
+                occupied_max=max(row.occupied_max for row in rows),
+                occupied_close=rows[-1].occupied_close,
+                total_close=rows[-1].total_close,
+            )
+        )
+    return rollups
+
+
+def _save_rollups(rollups):
+    from blog.models import OccupancyRollup
+
+    OccupancyRollup.objects.bulk_create(
+        rollups,
+        batch_size=1000,
+        update_conflicts=True,
+        unique_fields=["parking_lot", "resolution", "bucket_start"],
+        update_fields=[
+            "occupied_avg",
+            "occupied_min",
+            "occupied_max",
+            "occupied_close",
+            "total_close",
+        ],
+    )
+    return len(rollups)
+
+
+def rollup_occupancy(now=None):
+    """Roll complete hours and days up and prune expired rows.
+
+    Return a dict with the number of rows written and deleted.
+    """
+    from blog.models import OccupancyRollup, OccupancySnapshot, ParkingLot
+
+    now = now or timezone.now()
+    hour_cutoff = _floor(now, HOUR)
+    day_cutoff = _floor(now, DAY)
+    lot_ids = list(ParkingLot.objects.values_list("pk", flat=True))
+
+    stats = {"hours": 0, "days": 0}
+    for lot_id in lot_ids:
+        stats["hours"] += _save_rollups(_rollup_hours(lot_id, hour_cutoff))
+    for lot_id in lot_ids:
+        stats["days"] += _save_rollups(_rollup_days(lot_id, day_cutoff))
+
+    # Everything before the cut-offs has been rolled up above, so the
+    # retention windows only need to stay at least that long.
+    raw_cutoff = min(
+        hour_cutoff, now - dt.timedelta(days=settings.OCCUPANCY_SNAPSHOT_RETENTION_DAYS)
+    )
+    hourly_cutoff = min(
+        day_cutoff, now - dt.timedelta(days=settings.OCCUPANCY_HOURLY_RETENTION_DAYS)
+    )
+    stats["pruned_snapshots"], _ = OccupancySnapshot.objects.filter(
+        taken_at__lt=raw_cutoff
+    ).delete()
+    stats["pruned_hours"], _ = OccupancyRollup.objects.filter(
+        resolution=OccupancyRollup.Resolution.HOUR, bucket_start__lt=hourly_cutoff
+    ).delete()
+    return stats
+
+
+def pick_resolution(start, end):
+    """Return the finest resolution that keeps ``[start, end)`` small and kept."""
+    now = timezone.now()
+    span = end - start
+    raw_from = now - dt.timedelta(days=settings.OCCUPANCY_SNAPSHOT_RETENTION_DAYS)
+    hourly_from = now - dt.timedelta(days=settings.OCCUPANCY_HOURLY_RETENTION_DAYS)
+    if span <= 2 * DAY and start >= raw_from:
+        return "minute"
+    if span <= 62 * DAY and start >= hourly_from:
+        return "hour"
+    return "day"
+
+
+def _series_queries(lot_id, start, end, resolution):
+    """Return ``(opening, points)`` querysets for ``occupancy_series``.
+
+    ``opening`` is None for rollup resolutions.
+    """
+    from blog.models import OccupancyRollup, OccupancySnapshot
+
+    if resolution == "minute":
+        snapshots = OccupancySnapshot.objects.filter(parking_lot_id=lot_id)
+        opening = (
+            snapshots.filter(taken_at__lt=start)
+            .order_by("-taken_at")
+            .values_list("occupied", "total")
+        )
+        points = snapshots.filter(taken_at__gte=start, taken_at__lt=end).values_list(
+            "taken_at", "occupied", "occupied", "occupied", "total"
+        )
+        return opening, points
+
+    if resolution not in OccupancyRollup.Resolution.values:
+        raise ValueError(f"Unknown resolution: {resolution}")
+    points = OccupancyRollup.objects.filter(
+        parking_lot_id=lot_id,
+        resolution=resolution,
+        bucket_start__gte=_floor(start, HOUR if resolution == "hour" else DAY),
+        bucket_start__lt=end,
+    ).values_list(
+        "bucket_start", "occupied_avg", "occupied_min", "occupied_max", "total_close"
+    )
+    return None, points
+
+
+def _series(start, opening, points):
+    if opening:
+        occupied, total = opening
+        points = [(start, occupied, occupied, occupied, total), *points]
+    return [
+        {"at": at, "occupied": value, "min": low, "max": high, "total": total}
+        for at, value, low, high, total in points
+    ]
+
+
+def occupancy_series(lot_id, start, end, resolution=None):
+    """Return the occupancy of one lot over ``[start, end)``.
+
+    ``resolution`` is ``"minute"`` (raw change points, starting with the value
+    in force at ``start``), ``"hour"`` or ``"day"``; by default it is chosen
+    from the span. Each point is a dict with ``at``, ``occupied`` (the mean
+    for rollups), ``min``, ``max`` and ``total``. Rollups cover complete
+    buckets only, up to the last ``rollup_occupancy`` run.
+    """
+    resolution = resolution or pick_resolution(start, end)
+    opening, points = _series_queries(lot_id, start, end, resolution)
+    if opening is not None:
+        opening = opening.first()
+    return _series(start, opening, list(points))
+
+
+async def aoccupancy_series(lot_id, start, end, resolution=None):
+    """Async ``occupancy_series``."""
+    resolution = resolution or pick_resolution(start, end)
+    opening, points = _series_queries(lot_id, start, end, resolution)
+    if opening is not None:
+        opening = await opening.afirst()
+    return _series(start, opening, [point async for point in points])
@@ -0,0 +1,342 @@
+"""Write-behind ingestion of bay sensor reports.
+
+Sensors report far more often than a bay changes state, and saving a
+``ParkingSpace`` per report would run the full save path and its signal
+receivers every time. ``SensorBuffer`` instead keeps only the latest report
+per slot in memory, and a background thread flushes the pending reports
+every ``SENSOR_FLUSH_SECONDS`` in one transaction: rows whose state changed
+are written with ``bulk_update`` and each lot's counters are shifted once.
+
+A slot counts as occupied while it has an active booking or its sensor
+last reported a vehicle (see ``blog.services``). Every worker process has
+its own buffer; reports still pending when a process dies are lost, and the
+bay's next report makes up for them.
+"""
+
+from __future__ import annotations
+
+import atexit
+import json
+import logging
+import threading
+import time
+from collections import Counter, deque
+
+from django.conf import settings
+from django.db import (
+    InterfaceError,
+    OperationalError,
+    close_old_connections,
+    connections,
+    transaction,
+)
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+logger = logging.getLogger(__name__)
+
+# Span over which ``events_per_second`` is averaged.
+RATE_WINDOW_SECONDS = 10
+# Flush durations kept for the latency percentiles.
+LATENCY_SAMPLES = 256
+# Largest primary key a bigint column holds.
+MAX_SLOT_ID = 2**63 - 1
+# Errors after which a flush is worth retrying as is (lost connection,
+# locked database). Any other error is taken to be caused by a report.
+TRANSIENT_ERRORS = (OperationalError, InterfaceError)
+
+
+class BufferFull(Exception):
+    """The buffer already holds ``SENSOR_MAX_PENDING`` slots."""
+
+
+def parse_reports(body, now=None):
+    """Parse a JSON batch into ``[(slot_id, occupied, reported_at)]``.
+
+    The body is ``{"events": [{"slot": <pk>, "occupied": <bool>, "at": <iso>}]}``;
+    ``at`` defaults to ``now``. Raise ValueError when the batch is malformed
+    or longer than ``SENSOR_BATCH_MAX``.
+    """
+    now = now or timezone.now()
+    try:
+        events = json.loads(body)["events"]
+    except (ValueError, TypeError, KeyError):
+        raise ValueError("Body must be a JSON object with an 'events' list.") from None
+    if not isinstance(events, list):
+        raise ValueError("'events' must be a list.")
+    if len(events) > settings.SENSOR_BATCH_MAX:
+        raise ValueError(f"At most {settings.SENSOR_BATCH_MAX} events per batch.")
+    reports = []
+    for index, event in enumerate(events):
+        if not isinstance(event, dict):
+            raise ValueError(f"Event {index} must be an object.")
+        slot, occupied, at = event.get("slot"), event.get("occupied"), event.get("at")
+        if not isinstance(slot, int) or isinstance(slot, bool):
+            raise ValueError(f"Event {index}: 'slot' must be an integer.")
+        if not 1 <= slot <= MAX_SLOT_ID:
+            raise ValueError(f"Event {index}: 'slot' is not a valid slot id.")
+        if not isinstance(occupied, bool):
+            raise ValueError(f"Event {index}: 'occupied' must be true or false.")
+        reported_at = now
+        if at is not None:
+            reported_at = parse_datetime(at) if isinstance(at, str) else None
+            if reported_at is None:
+                raise ValueError(f"Event {index}: 'at' must be an ISO 8601 datetime.")
+            if timezone.is_naive(reported_at):
+                reported_at = timezone.make_aware(reported_at)
+        reports.append((slot, occupied, reported_at))
+    return reports
+
+
+def apply_sensor_reports(reports, now=None):
+    """Store ``{slot_id: (occupied, reported_at)}`` and resync those slots.
+
+    Reports older than the state already stored for a slot, and reports
+    for unknown slots, are skipped. Return the number of slot rows updated.
+    """
+    from blog.models import ParkingSpace, Reservation
+    from blog.services import (
+        bump_occupancy_version,
+        invalidate_dashboard_stats,
+        invalidate_slot_detail,
+        shift_lot_counters,
+        sync_lot_status,
+    )
+
+    now = now or timezone.now()
+    changed = []
+    shifts = Counter()
+    with transaction.atomic():
+        spaces = (
+            ParkingSpace.objects.select_for_update()
+            .filter(pk__in=list(reports))
+            .only(
+                "id",
+                "parking_lot_id",
+                "is_occupied",
+                "sensor_occupied",
+                "sensor_reported_at",
+            )
+        )
+        booked = set(
+            Reservation.objects.filter(
+                parking_slot_id__in=list(reports),
+                reservation_status__in=Reservation.ACTIVE_STATUSES,
+                end_time__gt=now,
+            ).values_list("parking_slot_id", flat=True)
+        )
+        for space in spaces:
+            occupied, reported_at = reports[space.pk]
+            if space.sensor_reported_at and space.sensor_reported_at > reported_at:
+                continue
+            is_occupied = occupied or space.pk in booked
+            if (space.sensor_occupied, space.is_occupied) == (occupied, is_occupied):
+                continue
+            if space.is_occupied != is_occupied and space.parking_lot_id is not None:
+                shifts[space.parking_lot_id] += 1 if is_occupied else -1
+            space.sensor_occupied = occupied
+            space.sensor_reported_at = reported_at
+            space.is_occupied = is_occupied
+            changed.append(space)
+        if changed:
+            ParkingSpace.objects.bulk_update(
+                changed, ["sensor_occupied", "sensor_reported_at", "is_occupied"]
+            )
+        for lot_id, delta in shifts.items():
+            if delta:
+                shift_lot_counters(lot_id, occupied=delta)
+
+    for lot_id in shifts:
+        sync_lot_status(lot_id)
+    if changed:
+        invalidate_slot_detail(*(space.pk for space in changed))
+        invalidate_dashboard_stats()
+        bump_occupancy_version()
+    return len(changed)
+
+
+class SensorBuffer:
+    """Coalesce sensor reports per slot and flush them from a background thread."""
+
+    def __init__(self, autostart=True):
+        self.autostart = autostart
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._stopping = threading.Event()
+        self._thread = None
+        self._exit_hook = False
+        self._received = deque()
+        self._latencies = deque(maxlen=LATENCY_SAMPLES)
+        self._totals = Counter()
+
+    @property
+    def pending_count(self):
+        return len(self._pending)
+
+    def offer(self, reports):
+        """Queue ``(slot_id, occupied, reported_at)`` reports; return how many.
+
+        Only the latest report per slot is kept. Raise ``BufferFull``, queueing
+        nothing, when the batch would take the buffer past
+        ``SENSOR_MAX_PENDING`` slots; the caller should retry after a flush.
+        """
+        reports = list(reports)
+        with self._lock:
+            new_slots = {slot for slot, _, _ in reports} - self._pending.keys()
+            if len(self._pending) + len(new_slots) > settings.SENSOR_MAX_PENDING:
+                self._totals["rejected"] += len(reports)
+                raise BufferFull("Sensor buffer is full; retry shortly.")
+            for slot, occupied, reported_at in reports:
+                queued = self._pending.get(slot)
+                if queued is not None:
+                    self._totals["coalesced"] += 1
+                    if queued[1] > reported_at:
+                        continue
+                self._pending[slot] = (occupied, reported_at)
+            self._totals["received"] += len(reports)
+            self._received.append((time.monotonic(), len(reports)))
+            self._trim_received()
+        if self.autostart:
+            self.start()
+        return len(reports)
+
+    def flush(self):
+        """Write the pending reports now. Return the number of rows updated.
+
+        On a transient database error the reports go back into the buffer,
+        behind any newer ones that arrived meanwhile, and the error
+        propagates. On any other error the reports are written one by one,
+        so that a report the database can never store is dropped instead of
+        failing every later flush.
+        """
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return 0
+        began = time.perf_counter()
+        try:
+            written = apply_sensor_reports(pending)
+        except TRANSIENT_ERRORS:
+            with self._lock:
+                self._requeue(pending)
+                self._totals["failed_flushes"] += 1
+            raise
+        except Exception:
+            logger.exception("Sensor batch failed; writing its reports one by one")
+            written = self._flush_each(pending)
+        with self._lock:
+            self._latencies.append(time.perf_counter() - began)
+            self._totals["flushes"] += 1
+            self._totals["flushed"] += len(pending)
+            self._totals["written"] += written
+        return written
+
+    def _flush_each(self, pending):
+        written = 0
+        for number, (slot, report) in enumerate(pending.items()):
+            try:
+                written += apply_sensor_reports({slot: report})
+            except TRANSIENT_ERRORS:
+                with self._lock:
+                    self._requeue(dict(list(pending.items())[number:]))
+                    self._totals["failed_flushes"] += 1
+                raise
+            except Exception:
+                logger.exception("Dropping the sensor report for slot %r", slot)
+                with self._lock:
+                    self._totals["dropped"] += 1
+        return written
+
+    def _requeue(self, reports):
+        for slot, report in reports.items():
+            queued = self._pending.get(slot)
+            if queued is None or queued[1] < report[1]:
+                self._pending[slot] = report
+
+    def metrics(self):
+        """Return ingestion rate, flush latency and running totals."""
+        with self._lock:
+            self._trim_received()
+            recent = sum(count for _, count in self._received)
+            last = self._latencies[-1] if self._latencies else None
+            latencies = sorted(self._latencies)
+            metrics = {
+                "events_per_second": round(recent / RATE_WINDOW_SECONDS, 1),
+                "pending_slots": len(self._pending),
+                "flushing": self._thread is not None and self._thread.is_alive(),
+            }
+            metrics.update(
+                (name, self._totals[name])
+                for name in (
+                    "received",
+                    "coalesced",
+                    "rejected",
+                    "flushes",
+                    "failed_flushes",
+                    "dropped",
+                    "flushed",
+                    "written",
+                )
+            )
+        metrics["flush_ms"] = {"last": None, "p50": None, "p95": None, "max": None}
+        if latencies:
+            metrics["flush_ms"] = {
+                "last": _ms(last),
+                "p50": _ms(latencies[len(latencies) // 2]),
+                "p95": _ms(latencies[max(int(len(latencies) * 0.95) - 1, 0)]),
+                "max": _ms(latencies[-1]),
+            }
+        return metrics
+
+    def start(self):
+        """Start the flush thread unless it is running."""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stopping.clear()
+            self._thread = threading.Thread(
+                target=self._run, name="sensor-flush", daemon=True
+            )
+            self._thread.start()
+            if not self._exit_hook:
+                atexit.register(self.stop)
+                self._exit_hook = True
+
+    def stop(self, timeout=5):
+        """Stop the flush thread after a last flush."""
+        self._stopping.set()
+        thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+        self._thread = None
+
+    def _run(self):
+        try:
+            while not self._stopping.wait(settings.SENSOR_FLUSH_SECONDS):
+                self._flush_logged()
+            self._flush_logged()
+        finally:
+            connections.close_all()
+
+    def _flush_logged(self):
+        # The thread outlives any request, so drop connections the database
+        # closed or that passed CONN_MAX_AGE, as the request cycle would.
+        close_old_connections()
+        try:
+            self.flush()
+        except Exception:
+            logger.exception("Sensor flush failed; reports kept for the next one")
+        finally:
+            close_old_connections()
+
+    def _trim_received(self):
+        horizon = time.monotonic() - RATE_WINDOW_SECONDS
+        while self._received and self._received[0][0] < horizon:
+            self._received.popleft()
+
+
+def _ms(seconds):
+    return round(seconds * 1000, 3)
+
+
+sensor_buffer = SensorBuffer()
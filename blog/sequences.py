@@ -0,0 +1,136 @@
+"""Contention-free allocation of sequential numbers such as ``reservation_number``.
+
+Numbers are handed out from a per-process pool that is refilled in blocks, so
+inserts normally need no extra query and concurrent workers never read the
+same "current maximum".
+
+On PostgreSQL each refill pulls ``block_size`` values from a database sequence
+in one round-trip; ``nextval`` is never rolled back, so pooled numbers are safe
+to reuse across transactions. Other backends use a ``NumberSequence`` counter
+row that is bumped with a locking ``UPDATE``. Because that bump is undone if the
+surrounding transaction rolls back, pooling is only used in autocommit mode;
+inside an atomic block exactly one number is allocated per call.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F, Max
+
+RESERVATION_NUMBER_SEQUENCE = "reservation_number"
+RESERVATION_NUMBER_BASE = 1000
+
+
+def postgres_sequence_name(name):
+    return f"blog_{name}_seq"
+
+
+class BlockAllocator:
+    """Hand out unique, increasing numbers for one named sequence."""
+
+    def __init__(self, name, seed, block_size=None):
+        self.name = name
+        self.seed = seed
+        self._block_size = block_size
+        self._lock = threading.Lock()
+        self._pool = []
+        self._pid = os.getpid()
+
+    @property
+    def block_size(self):
+        return self._block_size or settings.RESERVATION_NUMBER_BLOCK_SIZE
+
+    def next(self):
+        """Return the next number in the sequence."""
+        return self.allocate(1)[0]
+
+    def allocate(self, count):
+        """Return ``count`` unique numbers, in increasing order."""
+        with self._lock:
+            if self._pid != os.getpid():
+                # Forked worker: the parent's pool is shared with siblings.
+                self._pool = []
+                self._pid = os.getpid()
+            pooling = self._can_pool()
+            if not pooling:
+                self._pool = []
+            if len(self._pool) < count:
+                needed = count - len(self._pool)
+                size = max(needed, self.block_size) if pooling else needed
+                self._pool.extend(self._fetch(size))
+            numbers, self._pool = self._pool[:count], self._pool[count:]
+            return numbers
+
+    def advance_past(self, number):
+        """Make sure future allocations are greater than ``number``.
+
+        Call this after inserting rows that carry explicit numbers.
+        """
+        with self._lock:
+            self._pool = [value for value in self._pool if value > number]
+            if connection.vendor == "postgresql":
+                sequence = postgres_sequence_name(self.name)
+                with connection.cursor() as cursor:
+                    cursor.execute(
+                        "SELECT setval(%s, GREATEST(%s, last_value)) FROM "
+                        + connection.ops.quote_name(sequence),
+                        [sequence, number],
+                    )
+                return
+            from blog.models import NumberSequence
+
+            with transaction.atomic():
+                NumberSequence.objects.get_or_create(
+                    name=self.name, defaults={"value": self.seed()}
+                )
+                NumberSequence.objects.filter(name=self.name, value__lt=number).update(
+                    value=number
+                )
+
+    def reset(self):
+        """Drop any pooled numbers (they are simply skipped)."""
+        with self._lock:
+            self._pool = []
+
+    def _can_pool(self):
+        return connection.vendor == "postgresql" or not connection.in_atomic_block
+
+    def _fetch(self, size):
+        if connection.vendor == "postgresql":
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    "SELECT nextval(%s) FROM generate_series(1, %s)",
+                    [postgres_sequence_name(self.name), size],
+                )
+                return sorted(row[0] for row in cursor.fetchall())
+        return self._fetch_from_counter(size)
+
+    def _fetch_from_counter(self, size):
+        from blog.models import NumberSequence
+
+        counters = NumberSequence.objects.filter(name=self.name)
+        with transaction.atomic():
+            if not counters.update(value=F("value") + size):
+                NumberSequence.objects.get_or_create(
+                    name=self.name, defaults={"value": self.seed()}
+                )
+                counters.update(value=F("value") + size)
+            last = counters.values_list("value", flat=True).get()
+        return list(range(last - size + 1, last + 1))
+
+
+def last_reservation_number():
+    """Return the highest reservation number in use, or the numbering base."""
+    from blog.models import Reservation
+
+    highest = Reservation.objects.aggregate(highest=Max("reservation_number"))
+    return max(highest["highest"] or 0, RESERVATION_NUMBER_BASE)
+
+
+reservation_numbers = BlockAllocator(
+    RESERVATION_NUMBER_SEQUENCE, seed=last_reservation_number
+)
@@ -1,13 +1,166 @@
 from __future__ import annotations
 
-from collections import defaultdict
+import time
+from collections import Counter, defaultdict
 
-from django.db.models import Count, Q
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.db.models import Count, Exists, F, Func, OuterRef, Q, Subquery, Window
+from django.db.models.functions import RowNumber
 from django.utils import timezone
 
+from blog.caching import aget_or_compute, get_or_compute
+from blog.occupancy import record_lot_occupancy
+
+LOT_STATUS_OPEN = "Open"
+LOT_STATUS_FULL = "Full"
+DASHBOARD_STATS_KEY = "dashboard:stats"
+SLOT_DETAIL_KEY = "slot-detail:{}"
+OCCUPANCY_VERSION_KEY = "occupancy:version"
+AUTOCOMPLETE_LIMIT = 20
+
+
+def lot_status_for(lot_capacity, total_spaces, occupied_spaces):
+    """Return the display status for a lot given its capacity and occupancy."""
+    capacity = lot_capacity or total_spaces or 0
+    available = max(capacity - occupied_spaces, 0)
+    return LOT_STATUS_FULL if available <= 0 and capacity > 0 else LOT_STATUS_OPEN
+
+
+def shift_lot_counters(lot_id, total=0, occupied=0):
+    """Atomically add ``total`` / ``occupied`` to a lot's stored slot counters."""
+    from blog.models import ParkingLot
+
+    if lot_id is None or not (total or occupied):
+        return
+    ParkingLot.objects.filter(pk=lot_id).update(
+        total_spaces=F("total_spaces") + total,
+        occupied_spaces=F("occupied_spaces") + occupied,
+    )
+    record_lot_occupancy([lot_id])
+
+
+def _apply_space_occupancy(space_id, now=None):
+    """Sync one slot's ``is_occupied``. Return ``(changed, lot_id)``.
+
+    A slot is occupied while it has an active booking or its sensor last
+    reported a vehicle.
+    """
+    from blog.models import ParkingSpace, Reservation
+
+    now = now or timezone.now()
+    booked = Reservation.objects.filter(
+        parking_slot_id=OuterRef("pk"),
+        reservation_status__in=Reservation.ACTIVE_STATUSES,
+        end_time__gt=now,
+    )
+    should_be_occupied = (
+        ParkingSpace.objects.filter(pk=space_id)
+        .filter(Q(sensor_occupied=True) | Exists(booked))
+        .exists()
+    )
+    with transaction.atomic():
+        changed = (
+            ParkingSpace.objects.filter(pk=space_id)
+            .exclude(is_occupied=should_be_occupied)
+            .update(is_occupied=should_be_occupied)
+        )
+        if not changed:
+            return False, None
+        lot_id = (
+            ParkingSpace.objects.filter(pk=space_id)
+            .values_list("parking_lot_id", flat=True)
+            .first()
+        )
+        shift_lot_counters(lot_id, occupied=1 if should_be_occupied else -1)
+    return True, lot_id
+
+
+def sync_space_occupancy(space_id, now=None):
+    """Recompute ``is_occupied`` for a single slot. Return True when it changed."""
+    if space_id is None:
+        return False
+    changed, _ = _apply_space_occupancy(space_id, now=now)
+    return changed
+
+
+def sync_lot_status(lot_id):
+    """Recompute ``current_status`` for a single lot. Return True when it changed."""
+    from blog.models import ParkingLot
+
+    if lot_id is None:
+        return False
+    lot = (
+        ParkingLot.objects.filter(pk=lot_id)
+        .values("lot_capacity", "total_spaces", "occupied_spaces", "current_status")
+        .first()
+    )
+    if lot is None:
+        return False
+    status = lot_status_for(
+        lot["lot_capacity"], lot["total_spaces"], lot["occupied_spaces"]
+    )
+    if lot["current_status"] == status:
+        return False
+    ParkingLot.objects.filter(pk=lot_id).update(current_status=status)
+    return True
+
+
+def sync_space_and_lot(space_id, now=None):
+    """Incrementally refresh one slot and, when it changed, the lot it belongs to.
+
+    Return the number of rows that were updated.
+    """
+    if space_id is None:
+        return 0
+    changed, lot_id = _apply_space_occupancy(space_id, now=now)
+    if not changed:
+        return 0
+    return 1 + int(sync_lot_status(lot_id))
+
+
+def reconcile_boundaries(since, now=None):
+    """Refresh slots whose active reservations started or ended in ``(since, now]``.
+
+    Used by the background reconciler so that bookings crossing a time
+    boundary between two ticks are picked up without a full table pass.
+    Return the number of rows that were updated.
+    """
+    from blog.models import Reservation
+
+    now = now or timezone.now()
+    slot_ids = (
+        Reservation.objects.filter(
+            reservation_status__in=Reservation.ACTIVE_STATUSES,
+            parking_slot__isnull=False,
+        )
+        .filter(
+            Q(end_time__gt=since, end_time__lte=now)
+            | Q(start_time__gt=since, start_time__lte=now)
+        )
+        .values_list("parking_slot_id", flat=True)
+        .distinct()
+    )
+    slot_ids = list(slot_ids)
+    changed = sum(sync_space_and_lot(slot_id, now=now) for slot_id in slot_ids)
+    # A booking ending changes the slot's "current booking" even when another
+    # one keeps it occupied.
+    invalidate_slot_detail(*slot_ids)
+    if changed:
+        invalidate_dashboard_stats()
+        bump_occupancy_version()
+    return changed
+
 
 def refresh_parking_state():
-    """Sync parking slot occupancy and lot status based on active reservations."""
+    """Sync slot occupancy, lot counters and lot status with reservations and sensors.
+
+    This is the full reconcile pass and returns the number of rows updated.
+    Day-to-day writes are kept in sync incrementally by the receivers in
+    ``blog.signals``; the ``reconcile_occupancy`` command runs this to recover
+    from drift and to pick up reservations whose end time has passed.
+    """
     from blog.models import ParkingLot, ParkingSpace, Reservation
 
     now = timezone.now()
@@ -24,29 +177,412 @@ def refresh_parking_state():
     for booking in active_reservations:
         slot_to_reservation[booking.parking_slot_id].append(booking)
 
-    spaces = ParkingSpace.objects.select_related("parking_lot").all()
+    # The pass reads every slot anyway, so it recounts the lot counters from
+    # the same rows and corrects any drift.
+    spaces = ParkingSpace.objects.only(
+        "id", "parking_lot_id", "is_occupied", "sensor_occupied"
+    )
     to_update = []
+    totals = Counter()
+    occupied = Counter()
     for space in spaces:
-        should_be_occupied = space.id in slot_to_reservation
+        should_be_occupied = (
+            space.id in slot_to_reservation or space.sensor_occupied is True
+        )
         if space.is_occupied != should_be_occupied:
             space.is_occupied = should_be_occupied
             to_update.append(space)
+        if space.parking_lot_id is not None:
+            totals[space.parking_lot_id] += 1
+            occupied[space.parking_lot_id] += should_be_occupied
 
     if to_update:
         ParkingSpace.objects.bulk_update(to_update, ["is_occupied"])
 
     lot_updates = []
-    lot_stats = ParkingLot.objects.annotate(
-        total_spaces=Count("spaces"),
-        occupied_spaces=Count("spaces", filter=Q(spaces__is_occupied=True)),
-    )
-    for lot in lot_stats:
-        capacity = lot.lot_capacity or lot.total_spaces or 0
-        available = max(capacity - lot.occupied_spaces, 0)
-        status = "Full" if available <= 0 and capacity > 0 else "Open"
-        if lot.current_status != status:
-            lot.current_status = status
+    lots = ParkingLot.objects.only(
+        "id", "lot_capacity", "current_status", "total_spaces", "occupied_spaces"
+    )
+    for lot in lots:
+        total, occupied_count = totals[lot.pk], occupied[lot.pk]
+        expected = (
+            total,
+            occupied_count,
+            lot_status_for(lot.lot_capacity, total, occupied_count),
+        )
+        if (lot.total_spaces, lot.occupied_spaces, lot.current_status) != expected:
+            lot.total_spaces, lot.occupied_spaces, lot.current_status = expected
             lot_updates.append(lot)
 
     if lot_updates:
-        ParkingLot.objects.bulk_update(lot_updates, ["current_status"])
+        ParkingLot.objects.bulk_update(
+            lot_updates, ["total_spaces", "occupied_spaces", "current_status"]
+        )
+        record_lot_occupancy(lot.pk for lot in lot_updates)
+
+    if to_update:
+        invalidate_slot_detail(*(space.pk for space in to_update))
+    if to_update or lot_updates:
+        invalidate_dashboard_stats()
+        bump_occupancy_version()
+    return len(to_update) + len(lot_updates)
+
+
+def lot_counter_drift():
+    """Return ``[(lot, total, occupied)]`` for lots whose stored counters are off.
+
+    ``total`` and ``occupied`` are the values counted from the slots table.
+    """
+    from blog.models import ParkingLot, ParkingSpace
+
+    counted = {
+        row["parking_lot"]: (row["total"], row["occupied"])
+        for row in ParkingSpace.objects.filter(parking_lot__isnull=False)
+        .order_by()
+        .values("parking_lot")
+        .annotate(total=Count("id"), occupied=Count("id", filter=Q(is_occupied=True)))
+    }
+    drift = []
+    for lot in ParkingLot.objects.order_by("lot_id", "pk"):
+        total, occupied = counted.get(lot.pk, (0, 0))
+        if (lot.total_spaces, lot.occupied_spaces) != (total, occupied):
+            drift.append((lot, total, occupied))
+    return drift
+
+
+def repair_lot_counters(drift=None):
+    """Overwrite drifted lot counters with counted values. Return the lots fixed."""
+    from blog.models import ParkingLot
+
+    if drift is None:
+        drift = lot_counter_drift()
+    for lot, total, occupied in drift:
+        ParkingLot.objects.filter(pk=lot.pk).update(
+            total_spaces=total, occupied_spaces=occupied
+        )
+        sync_lot_status(lot.pk)
+    record_lot_occupancy(lot.pk for lot, _, _ in drift)
+    if drift:
+        bump_occupancy_version()
+    return len(drift)
+
+
+def available_spaces(
+    start_time,
+    end_time,
+    lot=None,
+    floor=None,
+    space_type=None,
+    min_dimension=None,
+):
+    """Return active slots that are free for the whole window.
+
+    Equivalent to calling ``ParkingSpace.is_available`` on every slot, but the
+    busy slots are read from the availability index (``blog.availability``)
+    instead of scanning reservations.
+    """
+    from blog.availability import busy_slot_ids
+
+    return _free_spaces(
+        busy_slot_ids(start_time, end_time), lot, floor, space_type, min_dimension
+    )
+
+
+async def aavailable_spaces(
+    start_time,
+    end_time,
+    lot=None,
+    floor=None,
+    space_type=None,
+    min_dimension=None,
+):
+    """Async ``available_spaces``; the returned queryset is not evaluated yet."""
+    from blog.availability import abusy_slot_ids
+
+    return _free_spaces(
+        await abusy_slot_ids(start_time, end_time),
+        lot,
+        floor,
+        space_type,
+        min_dimension,
+    )
+
+
+def _free_spaces(busy, lot, floor, space_type, min_dimension):
+    from blog.models import ParkingSpace
+
+    spaces = ParkingSpace.objects.filter(is_active=True).exclude(pk__in=busy)
+    if lot is not None:
+        spaces = spaces.filter(parking_lot_id=lot)
+    if floor is not None:
+        spaces = spaces.filter(floor_number=floor)
+    if space_type:
+        spaces = spaces.filter(space_type=space_type)
+    if min_dimension is not None:
+        spaces = spaces.filter(dimension_limit__gte=min_dimension)
+    return spaces.order_by("floor_number", "label")
+
+
+def filter_clients(clients, term):
+    """Narrow ``clients`` to those whose name, plate or contact starts with ``term``.
+
+    Each branch is a ``LIKE 'term%'`` on an indexed column (the case-folded
+    ``name_key`` and ``plate_key``, and ``contact``), so the search is a
+    union of index range scans on PostgreSQL, which adds pattern-ops indexes
+    for them.
+    """
+    from blog.models import Client
+
+    name = Client.normalize_name(term)
+    if not name:
+        return clients
+    condition = Q(name_key__startswith=name) | Q(contact__startswith=term.strip())
+    plate = Client.normalize_plate(term)
+    if plate:
+        condition |= Q(plate_key__startswith=plate)
+    return clients.filter(condition)
+
+
+def search_clients(term, limit=AUTOCOMPLETE_LIMIT):
+    """Return up to ``limit`` clients matching ``term`` (see ``filter_clients``)."""
+    from blog.models import Client
+
+    return filter_clients(Client.objects.order_by("name_key", "pk"), term)[:limit]
+
+
+def clients_by_plate(plate):
+    """Return the clients registered with ``plate``, ignoring case and separators.
+
+    An equality lookup on the indexed ``plate_key``.
+    """
+    from blog.models import Client
+
+    key = Client.normalize_plate(plate)
+    if not key:
+        return Client.objects.none()
+    return Client.objects.filter(plate_key=key)
+
+
+def search_slots(term, dimension=None, limit=AUTOCOMPLETE_LIMIT):
+    """Return up to ``limit`` active slots labelled ``term...``.
+
+    The label is matched case-insensitively, as a prefix of the indexed
+    ``label_key``. With ``dimension``, only slots whose ``dimension_limit``
+    fits it.
+    """
+    from blog.models import ParkingSpace
+
+    spaces = ParkingSpace.objects.filter(is_active=True)
+    key = ParkingSpace.normalize_label(term)
+    if key:
+        spaces = spaces.filter(label_key__startswith=key)
+    if dimension is not None:
+        spaces = spaces.filter(dimension_limit__gte=dimension)
+    return spaces.order_by("label")[:limit]
+
+
+def recent_reservations_by_slot(slot_ids, limit=5, reservations=None):
+    """Return ``{slot_id: [reservation, ...]}`` with the ``limit`` newest per slot.
+
+    All slots are loaded in one query: a ``ROW_NUMBER()`` window partitioned by
+    slot where the database supports it, otherwise a single ordered scan that
+    keeps the first ``limit`` rows of each slot.
+    """
+    from blog.models import Reservation
+
+    slot_ids = list(slot_ids)
+    grouped = defaultdict(list)
+    if not slot_ids or limit <= 0:
+        return grouped
+    if reservations is None:
+        reservations = Reservation.objects.select_related("client")
+    reservations = reservations.filter(parking_slot_id__in=slot_ids)
+    newest_first = (F("start_time").desc(), F("id").desc())
+
+    if connection.features.supports_over_clause:
+        ranked = reservations.annotate(
+            slot_rank=Window(
+                RowNumber(), partition_by=F("parking_slot_id"), order_by=newest_first
+            )
+        ).filter(slot_rank__lte=limit)
+        for reservation in ranked.order_by("parking_slot_id", *newest_first):
+            grouped[reservation.parking_slot_id].append(reservation)
+        return grouped
+
+    ordered = reservations.order_by("parking_slot_id", *newest_first)
+    for reservation in ordered.iterator(chunk_size=2000):
+        bucket = grouped[reservation.parking_slot_id]
+        if len(bucket) < limit:
+            bucket.append(reservation)
+    return grouped
+
+
+class _CountSubquery(Subquery):
+    """``SELECT COUNT(*)`` over a queryset, usable next to aggregates.
+
+    ``aggregate()`` only takes aggregate expressions; the subquery is
+    uncorrelated, so it yields one value whatever the outer rows are.
+    """
+
+    contains_aggregate = True
+
+    def __init__(self, queryset):
+        super().__init__(
+            queryset.order_by()
+            .annotate(count=Func(F("pk"), function="COUNT"))
+            .values("count")
+        )
+
+
+def _dashboard_counters(now):
+    """Return the four dashboard counters as ``aggregate()`` keyword arguments.
+
+    Aggregated over the slots, with clients and reservations counted in
+    subqueries, so that all four come back in one query.
+    """
+    from blog.models import Client, Reservation
+
+    return {
+        "total_clients": _CountSubquery(Client.objects.all()),
+        "total_slots": Count("pk"),
+        "available_slots": Count("pk", filter=Q(is_active=True, is_occupied=False)),
+        "active_reservations": _CountSubquery(
+            Reservation.objects.filter(
+                reservation_status__in=Reservation.ACTIVE_STATUSES,
+                start_time__lte=now,
+                end_time__gte=now,
+            )
+        ),
+    }
+
+
+def _upcoming_reservations(now):
+    from blog.models import Reservation
+
+    return (
+        Reservation.objects.select_related("client", "parking_slot")
+        .filter(start_time__gte=now)
+        .order_by("start_time")[:5]
+    )
+
+
+def _compute_dashboard_stats():
+    now = timezone.now()
+    from blog.models import ParkingSpace
+
+    stats = ParkingSpace.objects.aggregate(**_dashboard_counters(now))
+    stats["upcoming_reservations"] = list(_upcoming_reservations(now))
+    return stats
+
+
+async def _acompute_dashboard_stats():
+    now = timezone.now()
+    from blog.models import ParkingSpace
+
+    stats = await ParkingSpace.objects.aaggregate(**_dashboard_counters(now))
+    stats["upcoming_reservations"] = [
+        reservation async for reservation in _upcoming_reservations(now)
+    ]
+    return stats
+
+
+def dashboard_stats():
+    """Return the dashboard counters and upcoming bookings, cached.
+
+    Client, slot and reservation writes invalidate the entry (see
+    ``blog.signals``); ``DASHBOARD_CACHE_SECONDS`` bounds how long time-based
+    changes such as a booking starting can go unnoticed.
+    """
+    return get_or_compute(
+        DASHBOARD_STATS_KEY,
+        _compute_dashboard_stats,
+        settings.DASHBOARD_CACHE_SECONDS,
+    )
+
+
+async def adashboard_stats():
+    """Async ``dashboard_stats``, sharing its cache entry."""
+    return await aget_or_compute(
+        DASHBOARD_STATS_KEY,
+        _acompute_dashboard_stats,
+        settings.DASHBOARD_CACHE_SECONDS,
+    )
+
+
+def invalidate_dashboard_stats():
+    cache.delete(DASHBOARD_STATS_KEY)
+
+
+def _compute_slot_detail(space_id):
+    from blog.models import ParkingSpace, Reservation
+
+    space = (
+        ParkingSpace.objects.select_related("parking_lot").filter(pk=space_id).first()
+    )
+    if space is None:
+        return None
+    current_booking = (
+        Reservation.objects.select_related("client")
+        .filter(
+            parking_slot_id=space_id,
+            reservation_status__in=Reservation.ACTIVE_STATUSES,
+            end_time__gt=timezone.now(),
+        )
+        .order_by("start_time")
+        .first()
+    )
+    recent = recent_reservations_by_slot([space_id], limit=5)
+    return {
+        "slot": space,
+        "current_booking": current_booking,
+        "recent_reservations": recent.get(space_id, []),
+    }
+
+
+def slot_detail(space_id):
+    """Return one slot with its current booking and recent reservations, cached.
+
+    Return None when the slot does not exist. Reservation and slot writes
+    invalidate the entry (see ``blog.signals``).
+    """
+    detail = get_or_compute(
+        SLOT_DETAIL_KEY.format(space_id),
+        lambda: _compute_slot_detail(space_id) or {},
+        settings.SLOT_DETAIL_CACHE_SECONDS,
+    )
+    return detail or None
+
+
+def invalidate_slot_detail(*space_ids):
+    cache.delete_many(
+        [SLOT_DETAIL_KEY.format(pk) for pk in space_ids if pk is not None]
+    )
+
+
+def occupancy_version():
+    """Return the global occupancy version used as the API ETag.
+
+    It is seeded from the clock so that a flushed cache never hands out a
+    version a client may already hold.
+    """
+    version = cache.get(OCCUPANCY_VERSION_KEY)
+    if version is None:
+        cache.add(OCCUPANCY_VERSION_KEY, time.time_ns(), None)
+        version = cache.get(OCCUPANCY_VERSION_KEY)
+    return version
+
+
+async def aoccupancy_version():
+    """Async ``occupancy_version``."""
+    version = await cache.aget(OCCUPANCY_VERSION_KEY)
+    if version is None:
+        await cache.aadd(OCCUPANCY_VERSION_KEY, time.time_ns(), None)
+        version = await cache.aget(OCCUPANCY_VERSION_KEY)
+    return version
+
+
+def bump_occupancy_version():
+    try:
+        cache.incr(OCCUPANCY_VERSION_KEY)
+    except ValueError:
+        cache.add(OCCUPANCY_VERSION_KEY, time.time_ns(), None)
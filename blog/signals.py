@@ -0,0 +1,201 @@
+"""Model signal receivers that keep occupancy and the availability index in sync."""
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from blog.allocation import bump_slot_index_version
+from blog.availability import reindex_reservation
+from blog.gate import invalidate_client_plates, invalidate_plates
+from blog.models import (
+    Client,
+    ParkingLot,
+    ParkingSpace,
+    Reservation,
+    Tariff,
+    TariffBand,
+)
+from blog.services import (
+    bump_occupancy_version,
+    invalidate_dashboard_stats,
+    invalidate_slot_detail,
+    shift_lot_counters,
+    sync_lot_status,
+    sync_space_and_lot,
+)
+from blog.tariffs import bump_tariff_version
+
+
+@receiver(pre_save, sender=Reservation)
+def remember_previous_booking(sender, instance, raw=False, **kwargs):
+    """Record the slot and window a reservation had before this save."""
+    instance._previous_booking = None
+    instance._previous_client_id = None
+    if raw or instance._state.adding or not instance.pk:
+        return
+    previous = (
+        Reservation.objects.filter(pk=instance.pk)
+        .values_list("parking_slot_id", "start_time", "end_time", "client_id")
+        .first()
+    )
+    if previous:
+        instance._previous_booking = previous[:3]
+        instance._previous_client_id = previous[3]
+
+
+@receiver(post_save, sender=Reservation)
+def reservation_saved(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    previous = getattr(instance, "_previous_booking", None)
+    current = (instance.parking_slot_id, instance.start_time, instance.end_time)
+    if previous and previous != current:
+        previous_slot_id, previous_start, previous_end = previous
+        if previous_slot_id != instance.parking_slot_id:
+            sync_space_and_lot(previous_slot_id)
+        reindex_reservation(previous_slot_id, previous_start, previous_end)
+        invalidate_slot_detail(previous_slot_id)
+    sync_space_and_lot(instance.parking_slot_id)
+    reindex_reservation(*current)
+    invalidate_slot_detail(instance.parking_slot_id)
+
+
+@receiver(post_delete, sender=Reservation)
+def reservation_deleted(sender, instance, **kwargs):
+    sync_space_and_lot(instance.parking_slot_id)
+    reindex_reservation(
+        instance.parking_slot_id, instance.start_time, instance.end_time
+    )
+    invalidate_slot_detail(instance.parking_slot_id)
+
+
+@receiver(pre_save, sender=ParkingSpace)
+def remember_previous_placement(sender, instance, raw=False, **kwargs):
+    """Record the lot and occupancy a slot had before this save."""
+    instance._previous_placement = None
+    if raw or instance._state.adding or not instance.pk:
+        return
+    instance._previous_placement = (
+        ParkingSpace.objects.filter(pk=instance.pk)
+        .values_list("parking_lot_id", "is_occupied")
+        .first()
+    )
+
+
+@receiver(post_save, sender=ParkingSpace)
+def space_saved(sender, instance, created=False, raw=False, **kwargs):
+    if raw:
+        return
+    previous = getattr(instance, "_previous_placement", None)
+    current = (instance.parking_lot_id, instance.is_occupied)
+    if created:
+        shift_lot_counters(current[0], total=1, occupied=int(current[1]))
+    elif previous and previous != current:
+        previous_lot_id, was_occupied = previous
+        shift_lot_counters(previous_lot_id, total=-1, occupied=-int(was_occupied))
+        shift_lot_counters(current[0], total=1, occupied=int(current[1]))
+        if previous_lot_id != current[0]:
+            sync_lot_status(previous_lot_id)
+    sync_lot_status(instance.parking_lot_id)
+    invalidate_slot_detail(instance.pk)
+
+
+@receiver(pre_delete, sender=ParkingSpace)
+def remember_stored_placement(sender, instance, **kwargs):
+    """Record the stored lot and occupancy; the instance may be stale."""
+    instance._previous_placement = (
+        ParkingSpace.objects.filter(pk=instance.pk)
+        .values_list("parking_lot_id", "is_occupied")
+        .first()
+    )
+
+
+@receiver(post_delete, sender=ParkingSpace)
+def space_deleted(sender, instance, **kwargs):
+    lot_id, was_occupied = getattr(instance, "_previous_placement", None) or (
+        instance.parking_lot_id,
+        instance.is_occupied,
+    )
+    shift_lot_counters(lot_id, total=-1, occupied=-int(was_occupied))
+    sync_lot_status(lot_id)
+    invalidate_slot_detail(instance.pk)
+
+
+@receiver(post_save, sender=ParkingLot)
+def lot_saved(sender, instance, created=False, raw=False, update_fields=None, **kwargs):
+    if raw:
+        return
+    if created or update_fields is None or "lot_capacity" in update_fields:
+        sync_lot_status(instance.pk)
+
+
+@receiver(post_save, sender=Tariff)
+@receiver(post_delete, sender=Tariff)
+@receiver(post_save, sender=TariffBand)
+@receiver(post_delete, sender=TariffBand)
+def tariff_changed(sender, **kwargs):
+    bump_tariff_version()
+
+
+@receiver(post_save, sender=ParkingSpace)
+@receiver(post_delete, sender=ParkingSpace)
+def slot_layout_changed(sender, **kwargs):
+    bump_slot_index_version()
+
+
+@receiver(post_save, sender=Client)
+@receiver(post_delete, sender=Client)
+@receiver(post_save, sender=ParkingSpace)
+@receiver(post_delete, sender=ParkingSpace)
+@receiver(post_save, sender=Reservation)
+@receiver(post_delete, sender=Reservation)
+def dashboard_data_changed(sender, **kwargs):
+    invalidate_dashboard_stats()
+
+
+@receiver(post_save, sender=ParkingLot)
+@receiver(post_delete, sender=ParkingLot)
+@receiver(post_save, sender=ParkingSpace)
+@receiver(post_delete, sender=ParkingSpace)
+@receiver(post_save, sender=Reservation)
+@receiver(post_delete, sender=Reservation)
+def occupancy_data_changed(sender, **kwargs):
+    bump_occupancy_version()
+    # Bump again after commit: a reader that picked up the new version before
+    # the rows were visible (the live feed, ETag clients) re-reads them then.
+    transaction.on_commit(bump_occupancy_version)
+
+
+@receiver(post_save, sender=Reservation)
+@receiver(post_delete, sender=Reservation)
+def gate_booking_changed(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    client_ids = (instance.client_id, getattr(instance, "_previous_client_id", None))
+    invalidate_client_plates(*client_ids)
+    # Again after commit, in case a gate read refilled the entry from the
+    # rows as they were before this transaction.
+    transaction.on_commit(lambda: invalidate_client_plates(*client_ids))
+
+
+@receiver(pre_save, sender=Client)
+def remember_previous_plate(sender, instance, raw=False, **kwargs):
+    """Record the plate key a client had before this save."""
+    instance._previous_plate_key = None
+    if raw or instance._state.adding or not instance.pk:
+        return
+    instance._previous_plate_key = (
+        Client.objects.filter(pk=instance.pk)
+        .values_list("plate_key", flat=True)
+        .first()
+    )
+
+
+@receiver(post_save, sender=Client)
+@receiver(post_delete, sender=Client)
+def gate_plate_changed(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    invalidate_plates(
+        instance.plate_key, getattr(instance, "_previous_plate_key", None)
+    )
@@ -0,0 +1,175 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from blog.allocation import NoSlotAvailable, SlotIndex, best_slot, book_best_slot
+from blog.forms import ReservationForm
+from blog.models import Client, ParkingLot, ParkingSpace, Reservation
+
+
+class SlotIndexTests(SimpleTestCase):
+    def setUp(self):
+        self.index = SlotIndex(
+            [
+                (1, 10, 1, 500, "A1"),
+                (2, 10, 1, 300, "A2"),
+                (3, 10, 2, 400, "B1"),
+                (4, 20, 1, 350, "C1"),
+                (5, 20, 1, 200, "C2"),
+            ]
+        )
+
+    def test_candidates_fit_and_come_smallest_first(self):
+        self.assertEqual(list(self.index.candidates(300)), [2, 4, 3, 1])
+        self.assertEqual(list(self.index.candidates(600)), [])
+        self.assertEqual(len(self.index), 5)
+
+    def test_candidates_narrowed_by_lot_and_floor(self):
+        self.assertEqual(list(self.index.candidates(100, lot=20)), [5, 4])
+        self.assertEqual(list(self.index.candidates(100, lot=10, floor=2)), [3])
+
+
+class AllocationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.customer = Client.objects.create(
+            full_name="Fit Driver",
+            contact="1234567890",
+            plate_number="FIT01",
+            dimension=300,
+        )
+        self.lot = ParkingLot.objects.create(lot_id=81, lot_capacity=3)
+        self.large = ParkingSpace.objects.create(
+            label="L1", parking_lot=self.lot, dimension_limit=600
+        )
+        self.snug = ParkingSpace.objects.create(
+            label="L2", parking_lot=self.lot, dimension_limit=320
+        )
+        ParkingSpace.objects.create(
+            label="L3", parking_lot=self.lot, dimension_limit=250
+        )
+        self.start = timezone.now() + timedelta(hours=1)
+        self.end = self.start + timedelta(hours=2)
+
+    def _book(self, slot, start=None, end=None):
+        return Reservation.objects.create(
+            client=self.customer,
+            parking_slot=slot,
+            start_time=start or self.start,
+            end_time=end or self.end,
+            reservation_status=Reservation.ReservationStatus.CONFIRMED,
+        )
+
+    def test_best_slot_is_smallest_free_fit(self):
+        self.assertEqual(best_slot(300, self.start, self.end), self.snug.pk)
+
+        self._book(self.snug)
+
+        self.assertEqual(best_slot(300, self.start, self.end), self.large.pk)
+        self.assertEqual(
+            best_slot(300, self.end, self.end + timedelta(hours=1)), self.snug.pk
+        )
+        self.assertIsNone(best_slot(700, self.start, self.end))
+
+    def test_slot_a_sensor_reports_taken_is_skipped_for_current_windows(self):
+        ParkingSpace.objects.filter(pk=self.snug.pk).update(sensor_occupied=True)
+        now = timezone.now()
+
+        self.assertEqual(best_slot(300, now, now + timedelta(hours=1)), self.large.pk)
+        self.assertEqual(best_slot(300, self.start, self.end), self.snug.pk)
+
+    def test_index_follows_slot_writes(self):
+        self.assertEqual(best_slot(300, self.start, self.end), self.snug.pk)
+
+        tighter = ParkingSpace.objects.create(
+            label="L4", parking_lot=self.lot, dimension_limit=300
+        )
+        self.assertEqual(best_slot(300, self.start, self.end), tighter.pk)
+        tighter.is_active = False
+        tighter.save()
+        self.assertEqual(best_slot(300, self.start, self.end), self.snug.pk)
+
+    def test_book_best_slot_fills_then_refuses(self):
+        first = book_best_slot(self.customer, self.start, self.end)
+        second = book_best_slot(self.customer, self.start, self.end)
+
+        self.assertEqual(first.parking_slot, self.snug)
+        self.assertEqual(second.parking_slot, self.large)
+        with self.assertRaises(NoSlotAvailable):
+            book_best_slot(self.customer, self.start, self.end)
+
+    def test_book_best_slot_moves_on_when_a_slot_is_taken_meanwhile(self):
+        self._book(self.snug)
+        stale = [self.snug.pk, self.large.pk]
+
+        with mock.patch(
+            "blog.allocation.best_slot", side_effect=lambda *a, **kw: stale.pop(0)
+        ):
+            booking = book_best_slot(
+                self.customer,
+                self.start,
+                self.end,
+                reservation_status=Reservation.ReservationStatus.CONFIRMED,
+            )
+
+        self.assertEqual(booking.parking_slot, self.large)
+        self.assertEqual(Reservation.objects.filter(parking_slot=self.snug).count(), 1)
+
+    def test_form_without_slot_books_best_fit(self):
+        form = ReservationForm(
+            data={
+                "client": self.customer.pk,
+                "start_time": self.start.strftime("%Y-%m-%dT%H:%M"),
+                "end_time": self.end.strftime("%Y-%m-%dT%H:%M"),
+                "reservation_status": Reservation.ReservationStatus.CONFIRMED,
+            }
+        )
+
+        self.assertTrue(form.is_valid(), form.errors)
+        self.assertEqual(form.save().parking_slot, self.snug)
+
+    def test_view_rejects_inverted_window_without_slot(self):
+        user = User.objects.create_user(username="fit", password="strong-pass")
+        self.client.force_login(user)
+
+        response = self.client.post(
+            reverse("reservation_page"),
+            {
+                "client": self.customer.pk,
+                "start_time": self.end.strftime("%Y-%m-%dT%H:%M"),
+                "end_time": self.start.strftime("%Y-%m-%dT%H:%M"),
+                "reservation_status": Reservation.ReservationStatus.CONFIRMED,
+            },
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.context["show_reservation_modal"])
+        self.assertIn(
+            "Checkout time must be later than check in time.",
+            response.context["form"].non_field_errors(),
+        )
+        self.assertFalse(Reservation.objects.exists())
+
+    def test_best_slot_api(self):
+        user = User.objects.create_user(username="fit", password="strong-pass")
+        self.client.force_login(user)
+        params = {
+            "client": self.customer.pk,
+            "start": self.start.isoformat(),
+            "end": self.end.isoformat(),
+        }
+
+        found = self.client.get(reverse("best_slot_api"), params).json()
+        elsewhere = self.client.get(
+            reverse("best_slot_api"), {**params, "lot": self.lot.pk + 1}
+        ).json()
+        missing = self.client.get(reverse("best_slot_api"), {**params, "client": ""})
+
+        self.assertEqual(found["slot"]["label"], "L2")
+        self.assertIsNone(elsewhere["slot"])
+        self.assertEqual(missing.status_code, 400)
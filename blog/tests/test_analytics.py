@@ -0,0 +1,101 @@
+import datetime as dt
+import json
+from io import StringIO
+
+import numpy as np
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from blog.analytics import analytics_report, spread_over_hours
+from blog.models import Client, ParkingLot, ParkingSpace, Reservation
+
+
+class SpreadOverHoursTests(TestCase):
+    def test_whole_and_partial_hours(self):
+        timeline = spread_over_hours(
+            np.array([0, 1, 0]),
+            np.array([0.5, 2.0, 3.25]),
+            np.array([2.5, 2.5, 3.75]),
+            n_rows=2,
+            hours=4,
+        )
+
+        np.testing.assert_allclose(timeline[0], [0.5, 1.0, 0.5, 0.5])
+        np.testing.assert_allclose(timeline[1], [0.0, 0.0, 0.5, 0.0])
+
+    def test_clips_to_the_timeline(self):
+        timeline = spread_over_hours(
+            np.array([0]), np.array([-5.0]), np.array([1.5]), n_rows=1, hours=2
+        )
+
+        np.testing.assert_allclose(timeline[0], [1.0, 0.5])
+
+
+class AnalyticsReportTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.lot = ParkingLot.objects.create(lot_id=61, lot_capacity=2)
+        space = ParkingSpace.objects.create(
+            label="AN1", parking_lot=self.lot, dimension_limit=500
+        )
+        customer = Client.objects.create(
+            full_name="Analytics Driver",
+            contact="1234567890",
+            plate_number="ANL01",
+            dimension=400,
+        )
+        self.monday = dt.date(2026, 3, 2)
+        start = timezone.make_aware(dt.datetime(2026, 3, 2, 10))
+        self.booking = Reservation.objects.create(
+            client=customer,
+            parking_slot=space,
+            start_time=start,
+            end_time=start + dt.timedelta(hours=2, minutes=30),
+        )
+        Reservation.objects.create(
+            client=customer,
+            parking_slot=space,
+            start_time=start + dt.timedelta(hours=5),
+            end_time=start + dt.timedelta(hours=6),
+            reservation_status=Reservation.ReservationStatus.CANCELLED,
+        )
+
+    def test_heatmap_and_revenue(self):
+        report = analytics_report(self.monday, self.monday + dt.timedelta(days=1))
+
+        (lot,) = report["lots"]
+        self.assertEqual(lot["lot_number"], 61)
+        self.assertEqual(lot["occupancy"][0][10:13], [1.0, 1.0, 0.5])
+        self.assertEqual(lot["utilization"][0][12], 0.25)
+        self.assertEqual(lot["occupancy"][0][15], 0.0)
+        self.assertEqual(lot["reservations"], 1)
+        self.assertEqual(lot["revenue"], float(self.booking.total_cost))
+        self.assertEqual(
+            report["revenue_by_day"],
+            [{"day": "2026-03-02", "revenue": float(self.booking.total_cost)}],
+        )
+
+    def test_rejects_bad_ranges(self):
+        with self.assertRaises(ValueError):
+            analytics_report(self.monday, self.monday)
+        with self.assertRaises(ValueError):
+            analytics_report(self.monday, self.monday + dt.timedelta(days=400))
+
+    def test_api_and_command(self):
+        self.client.force_login(User.objects.create_user("boss", password="pw"))
+        response = self.client.get(
+            reverse("analytics_api"), {"start": "2026-03-02", "end": "2026-03-09"}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["lots"][0]["reservations"], 1)
+
+        bad = self.client.get(reverse("analytics_api"), {"start": "yesterday"})
+        self.assertEqual(bad.status_code, 400)
+
+        out = StringIO()
+        call_command("occupancy_analytics", "2026-03-02", "2026-03-09", stdout=out)
+        self.assertEqual(json.loads(out.getvalue()), response.json())
@@ -0,0 +1,149 @@
+import datetime as dt
+from datetime import timedelta
+
+from asgiref.sync import sync_to_async
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from blog.allocation import best_slot
+from blog.availability import (
+    afree_slot_ids,
+    busy_slot_ids,
+    day_mask,
+    free_slot_ids,
+    rebuild_availability_index,
+)
+from blog.models import Client, ParkingLot, ParkingSpace, Reservation, SlotAvailability
+from blog.services import available_spaces
+
+
+@override_settings(AVAILABILITY_BUCKET_MINUTES=15)
+class AvailabilityIndexTests(TestCase):
+    def setUp(self):
+        self.customer = Client.objects.create(
+            full_name="Index Driver",
+            contact="1234567890",
+            plate_number="IDX01",
+            dimension=400,
+        )
+        self.lot = ParkingLot.objects.create(lot_id=40, lot_capacity=3)
+        self.spaces = [
+            ParkingSpace.objects.create(
+                label=f"X{index}", parking_lot=self.lot, dimension_limit=500
+            )
+            for index in range(3)
+        ]
+        tomorrow = timezone.now().astimezone(dt.timezone.utc).date() + timedelta(days=1)
+        self.base = dt.datetime.combine(tomorrow, dt.time(9), tzinfo=dt.timezone.utc)
+
+    def _book(self, space, start, end, **extra):
+        return Reservation.objects.create(
+            client=self.customer,
+            parking_slot=space,
+            start_time=start,
+            end_time=end,
+            reservation_status=Reservation.ReservationStatus.CONFIRMED,
+            **extra,
+        )
+
+    def test_day_mask_covers_touched_buckets(self):
+        day = self.base.date()
+
+        mask = day_mask(self.base, self.base + timedelta(minutes=31), day)
+
+        first_bucket = 9 * 4
+        self.assertEqual(mask, 0b111 << first_bucket)
+
+    def test_writes_update_index_and_match_is_available(self):
+        self._book(self.spaces[0], self.base, self.base + timedelta(hours=1))
+        overnight = self._book(
+            self.spaces[1],
+            self.base + timedelta(hours=14),
+            self.base + timedelta(hours=17),
+        )
+
+        windows = [
+            (self.base, self.base + timedelta(minutes=30)),
+            (self.base + timedelta(hours=1), self.base + timedelta(hours=2)),
+            (self.base + timedelta(hours=15), self.base + timedelta(hours=16)),
+        ]
+        for start, end in windows:
+            expected = {
+                space.id for space in self.spaces if space.is_available(start, end)
+            }
+            self.assertEqual(free_slot_ids(start, end), expected)
+
+        overnight.reservation_status = Reservation.ReservationStatus.CANCELLED
+        overnight.save()
+        self.assertFalse(
+            SlotAvailability.objects.filter(parking_slot=self.spaces[1]).exists()
+        )
+
+    async def test_async_lookup_matches_sync(self):
+        await sync_to_async(self._book)(
+            self.spaces[0], self.base, self.base + timedelta(hours=1)
+        )
+        start, end = self.base, self.base + timedelta(minutes=30)
+
+        free = await afree_slot_ids(start, end)
+
+        self.assertEqual(free, {self.spaces[1].id, self.spaces[2].id})
+
+    def _reservation_reads(self, queries):
+        table = Reservation._meta.db_table
+        return [query["sql"] for query in queries if table in query["sql"]]
+
+    def test_aligned_lookups_do_not_read_reservations(self):
+        self._book(self.spaces[0], self.base, self.base + timedelta(hours=1))
+        start, end = self.base, self.base + timedelta(minutes=30)
+
+        with CaptureQueriesContext(connection) as queries:
+            free = set(available_spaces(start, end).values_list("pk", flat=True))
+            fitting = best_slot(400, start, end)
+
+        self.assertEqual(free, {self.spaces[1].pk, self.spaces[2].pk})
+        self.assertEqual(fitting, self.spaces[1].pk)
+        self.assertEqual(self._reservation_reads(queries), [])
+
+    def test_edge_buckets_are_confirmed_against_reservations(self):
+        self._book(self.spaces[0], self.base, self.base + timedelta(minutes=10))
+        self._book(self.spaces[1], self.base, self.base + timedelta(hours=1))
+        start = self.base + timedelta(minutes=10)
+
+        with CaptureQueriesContext(connection) as queries:
+            busy = busy_slot_ids(start, start + timedelta(minutes=30))
+
+        self.assertEqual(busy, {self.spaces[1].pk})
+        self.assertEqual(len(self._reservation_reads(queries)), 1)
+
+    def test_moving_a_reservation_clears_the_old_buckets(self):
+        booking = self._book(self.spaces[0], self.base, self.base + timedelta(hours=1))
+
+        booking.start_time += timedelta(hours=3)
+        booking.end_time += timedelta(hours=3)
+        booking.save()
+
+        self.assertEqual(
+            busy_slot_ids(self.base, self.base + timedelta(hours=1)), set()
+        )
+        self.assertEqual(
+            busy_slot_ids(
+                self.base + timedelta(hours=3), self.base + timedelta(hours=4)
+            ),
+            {self.spaces[0].id},
+        )
+
+    def test_rebuild_recreates_rows(self):
+        self._book(self.spaces[2], self.base, self.base + timedelta(hours=2))
+        before = list(SlotAvailability.objects.values_list("parking_slot_id", "day"))
+        SlotAvailability.objects.all().delete()
+
+        written = rebuild_availability_index()
+
+        self.assertEqual(written, 1)
+        self.assertEqual(
+            list(SlotAvailability.objects.values_list("parking_slot_id", "day")),
+            before,
+        )
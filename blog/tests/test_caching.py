@@ -0,0 +1,41 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import SimpleTestCase
+
+from blog.caching import LOCK_SUFFIX, get_or_compute
+
+
+class GetOrComputeTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_computes_once_and_then_serves_from_cache(self):
+        compute = mock.Mock(return_value={"answer": 42})
+
+        first = get_or_compute("single-flight", compute, 60)
+        second = get_or_compute("single-flight", compute, 60)
+
+        self.assertEqual(first, second)
+        compute.assert_called_once()
+        self.assertIsNone(cache.get("single-flight" + LOCK_SUFFIX))
+
+    def test_waiter_uses_value_filled_by_lock_holder(self):
+        cache.add("busy" + LOCK_SUFFIX, 1, 10)
+        compute = mock.Mock(return_value="recomputed")
+
+        def fill_while_waiting(_seconds):
+            cache.set("busy", "from-holder", 60)
+
+        with mock.patch("blog.caching.time.sleep", side_effect=fill_while_waiting):
+            value = get_or_compute("busy", compute, 60)
+
+        self.assertEqual(value, "from-holder")
+        compute.assert_not_called()
+
+    def test_waiter_falls_back_when_holder_is_stuck(self):
+        cache.add("stuck" + LOCK_SUFFIX, 1, 10)
+
+        value = get_or_compute("stuck", lambda: "fallback", 60, wait=0.01, poll=0.005)
+
+        self.assertEqual(value, "fallback")
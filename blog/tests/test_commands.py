@@ -0,0 +1,91 @@
+import json
+import os
+import tempfile
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from blog.models import Client, ParkingLot, ParkingSpace, Reservation
+
+
+class ReconcileOccupancyCommandTests(TestCase):
+    def test_single_pass_reports_changes(self):
+        customer = Client.objects.create(
+            full_name="Command Driver",
+            contact="1234567890",
+            plate_number="CMD01",
+            dimension=400,
+        )
+        lot = ParkingLot.objects.create(lot_id=3, lot_capacity=1)
+        space = ParkingSpace.objects.create(
+            label="C1", parking_lot=lot, dimension_limit=500
+        )
+        Reservation.objects.create(
+            client=customer,
+            parking_slot=space,
+            start_time=timezone.now() - timedelta(hours=2),
+            end_time=timezone.now() - timedelta(hours=1),
+        )
+        ParkingSpace.objects.filter(pk=space.pk).update(is_occupied=True)
+        out = StringIO()
+
+        call_command("reconcile_occupancy", "--once", stdout=out)
+        space.refresh_from_db()
+
+        self.assertFalse(space.is_occupied)
+        self.assertIn("full pass took", out.getvalue())
+        self.assertIn("changed 1 rows", out.getvalue())
+
+
+class ImportReservationsCommandTests(TestCase):
+    def test_reports_throughput_and_row_errors(self):
+        customer = Client.objects.create(
+            full_name="Import Command Driver",
+            contact="1234567890",
+            plate_number="IMC01",
+            dimension=400,
+        )
+        ParkingSpace.objects.create(label="IC1", dimension_limit=500)
+        start = timezone.now() + timedelta(days=2)
+        rows = [
+            {
+                "client_id": customer.id,
+                "slot_label": "IC1",
+                "start_time": start.isoformat(),
+                "end_time": (start + timedelta(hours=1)).isoformat(),
+            },
+            {"client_id": customer.id, "slot_label": "missing"},
+        ]
+        with tempfile.NamedTemporaryFile(
+            "w", suffix=".jsonl", delete=False, encoding="utf-8"
+        ) as handle:
+            handle.write("\n".join(json.dumps(row) for row in rows))
+        self.addCleanup(os.remove, handle.name)
+        out, err = StringIO(), StringIO()
+
+        call_command("import_reservations", handle.name, stdout=out, stderr=err)
+
+        self.assertEqual(Reservation.objects.count(), 1)
+        self.assertIn("1 of 2 rows imported", out.getvalue())
+        self.assertIn("rows/s", out.getvalue())
+        self.assertIn("line 2:", err.getvalue())
+
+
+class CheckLotCountersCommandTests(TestCase):
+    def test_reports_and_repairs_drift(self):
+        lot = ParkingLot.objects.create(lot_id=31, lot_capacity=2)
+        ParkingSpace.objects.create(label="LC1", parking_lot=lot, dimension_limit=500)
+        ParkingLot.objects.filter(pk=lot.pk).update(total_spaces=5)
+
+        with self.assertRaises(CommandError):
+            call_command("check_lot_counters", stdout=StringIO())
+
+        out = StringIO()
+        call_command("check_lot_counters", "--repair", stdout=out)
+        lot.refresh_from_db()
+
+        self.assertIn("Repaired 1 lot(s).", out.getvalue())
+        self.assertEqual((lot.total_spaces, lot.occupied_spaces), (1, 0))
@@ -0,0 +1,90 @@
+import csv
+import gzip
+import io
+import json
+import os
+import tempfile
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from blog.exports import export_stream
+from blog.imports import import_reservations
+from blog.models import Client, ParkingSpace, Reservation
+
+
+class ExportTests(TestCase):
+    def setUp(self):
+        self.customer = Client.objects.create(
+            full_name="Export, Driver",
+            contact="1234567890",
+            plate_number="EXP01",
+            dimension=400,
+        )
+        self.space = ParkingSpace.objects.create(label="E1", dimension_limit=500)
+        start = timezone.now() + timedelta(days=1)
+        for offset in range(3):
+            Reservation.objects.create(
+                client=self.customer,
+                parking_slot=self.space,
+                start_time=start + timedelta(hours=offset * 2),
+                end_time=start + timedelta(hours=offset * 2 + 1),
+            )
+
+    def test_csv_streams_in_batches(self):
+        chunks = list(export_stream("reservations", "csv", chunk_size=2))
+
+        self.assertEqual(len(chunks), 2)
+        rows = list(csv.DictReader(io.StringIO(b"".join(chunks).decode())))
+        self.assertEqual(len(rows), 3)
+        self.assertEqual(rows[0]["client_name"], "Export, Driver")
+        self.assertEqual(rows[0]["slot_label"], "E1")
+
+    def test_jsonl_gzip_round_trips_through_the_importer(self):
+        payload = gzip.decompress(
+            b"".join(export_stream("reservations", "jsonl", compress=True))
+        ).decode()
+        records = [json.loads(line) for line in payload.splitlines()]
+        self.assertEqual(len(records), 3)
+
+        Reservation.objects.all().delete()
+        for record in records:
+            record.pop("reservation_number")
+        result = import_reservations(
+            io.StringIO("\n".join(json.dumps(record) for record in records)), "jsonl"
+        )
+        self.assertEqual(result.created, 3)
+
+    def test_view_requires_permission_and_streams(self):
+        url = reverse("export", args=["reservations"])
+        self.client.force_login(User.objects.create_user("clerk", password="pw"))
+        self.assertEqual(self.client.get(url).status_code, 403)
+
+        self.client.force_login(
+            User.objects.create_superuser("finance", "f@example.com", "pw")
+        )
+        response = self.client.get(url, {"format": "csv", "gzip": "1"})
+
+        self.assertTrue(response.streaming)
+        self.assertEqual(response["Content-Type"], "application/gzip")
+        self.assertIn("reservations.csv.gz", response["Content-Disposition"])
+        body = gzip.decompress(b"".join(response.streaming_content)).decode()
+        self.assertEqual(len(body.strip().splitlines()), 4)
+        self.assertEqual(
+            self.client.get(reverse("export", args=["secrets"])).status_code, 404
+        )
+
+    def test_command_writes_file(self):
+        handle, path = tempfile.mkstemp(suffix=".csv")
+        os.close(handle)
+        self.addCleanup(os.remove, path)
+
+        call_command("export_data", "clients", "--output", path, stderr=io.StringIO())
+
+        with open(path, newline="") as exported:
+            rows = list(csv.DictReader(exported))
+        self.assertEqual(rows[0]["plate_number"], "EXP01")
@@ -63,3 +63,15 @@ class ReservationFormTests(TestCase):
         self.assertTrue(form.is_valid())
         instance = form.save()
         self.assertEqual(instance.client, self.customer)
+
+    def test_pickers_render_only_the_selected_choice(self):
+        ParkingSpace.objects.create(label="F2", parking_lot=self.lot)
+        booking = ReservationForm(data=self._payload(self.start, self.end)).save()
+
+        form = ReservationForm(instance=booking)
+        html = str(form["client"]) + str(form["parking_slot"])
+
+        self.assertNotIn("<option", html)
+        self.assertIn('value="Form Driver - FORM01"', html)
+        self.assertIn('data-autocomplete-forward="client"', html)
+        self.assertNotIn("F2", html)
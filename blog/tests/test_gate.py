@@ -0,0 +1,181 @@
+from datetime import timedelta
+
+from django.contrib.auth.models import Permission, User
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from blog.gate import GateError, check_in, check_out, current_booking
+from blog.models import Client, ParkingLot, ParkingSpace, Reservation
+
+
+class GateTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.customer = Client.objects.create(
+            full_name="Gate Driver",
+            contact="1234567890",
+            plate_number="KL-01 AB 1234",
+            dimension=400,
+        )
+        self.lot = ParkingLot.objects.create(lot_id=61, lot_capacity=2)
+        self.space = ParkingSpace.objects.create(
+            label="G1", parking_lot=self.lot, dimension_limit=500
+        )
+        now = timezone.now()
+        self.reservation = Reservation.objects.create(
+            client=self.customer,
+            parking_slot=self.space,
+            start_time=now - timedelta(minutes=5),
+            end_time=now + timedelta(hours=1),
+            reservation_status=Reservation.ReservationStatus.CONFIRMED,
+        )
+
+    def test_current_booking_is_served_from_cache(self):
+        current_booking("kl01ab1234")
+
+        with CaptureQueriesContext(connection) as queries:
+            booking = current_booking("KL 01 AB 1234")
+
+        self.assertEqual(len(queries), 0)
+        self.assertEqual(booking["id"], self.reservation.pk)
+        self.assertEqual(booking["slot_label"], "G1")
+        self.assertEqual(booking["lot_id"], self.lot.pk)
+
+    def test_unknown_and_future_plates_have_no_current_booking(self):
+        self.assertIsNone(current_booking("NOPE99"))
+        self.reservation.start_time = timezone.now() + timedelta(hours=2)
+        self.reservation.end_time = timezone.now() + timedelta(hours=3)
+        self.reservation.save()
+
+        self.assertIsNone(current_booking("KL01AB1234"))
+
+    def test_reservation_writes_refresh_the_cached_entry(self):
+        self.assertIsNotNone(current_booking("KL01AB1234"))
+
+        self.reservation.reservation_status = Reservation.ReservationStatus.CANCELLED
+        self.reservation.save()
+
+        self.assertIsNone(current_booking("KL01AB1234"))
+
+    def test_plate_change_refreshes_both_plates(self):
+        self.assertIsNotNone(current_booking("KL01AB1234"))
+        self.assertIsNone(current_booking("NEW123"))
+
+        self.customer.plate_number = "NEW123"
+        self.customer.save()
+
+        self.assertIsNone(current_booking("KL01AB1234"))
+        self.assertEqual(current_booking("NEW123")["id"], self.reservation.pk)
+
+    def test_check_in_records_first_arrival(self):
+        arrived = timezone.now()
+
+        booking = check_in("KL01AB1234", now=arrived)
+        check_in("KL01AB1234", now=arrived + timedelta(minutes=1))
+
+        self.reservation.refresh_from_db()
+        self.assertEqual(self.reservation.arrived_at, arrived)
+        self.assertEqual(booking["arrived_at"], arrived)
+        self.assertEqual(current_booking("KL01AB1234")["arrived_at"], arrived)
+
+    def test_check_in_without_booking_fails(self):
+        with self.assertRaises(GateError):
+            check_in("NOPE99")
+
+    def test_check_out_records_departure_and_frees_slot(self):
+        check_in("KL01AB1234")
+        self.space.refresh_from_db()
+        self.assertTrue(self.space.is_occupied)
+
+        booking = check_out("KL01AB1234")
+
+        self.reservation.refresh_from_db()
+        self.space.refresh_from_db()
+        self.assertIsNotNone(self.reservation.departed_at)
+        self.assertEqual(
+            self.reservation.reservation_status,
+            Reservation.ReservationStatus.COMPLETED,
+        )
+        self.assertEqual(booking["departed_at"], self.reservation.departed_at)
+        self.assertFalse(self.space.is_occupied)
+        self.assertIsNone(current_booking("KL01AB1234"))
+        with self.assertRaises(GateError):
+            check_out("KL01AB1234")
+
+    def test_check_out_after_booking_ended(self):
+        check_in("KL01AB1234")
+        Reservation.objects.filter(pk=self.reservation.pk).update(
+            end_time=timezone.now() - timedelta(minutes=1)
+        )
+        cache.clear()
+
+        booking = check_out("KL01AB1234")
+
+        self.assertEqual(booking["id"], self.reservation.pk)
+        self.assertIsNotNone(booking["departed_at"])
+
+
+class GateViewTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="gate", password="strong-pass")
+        self.user.user_permissions.add(
+            Permission.objects.get(codename="change_reservation")
+        )
+        customer = Client.objects.create(
+            full_name="Gate Viewer",
+            contact="1234567890",
+            plate_number="GATE01",
+            dimension=400,
+        )
+        self.space = ParkingSpace.objects.create(
+            label="V1",
+            parking_lot=ParkingLot.objects.create(lot_id=62, lot_capacity=1),
+            dimension_limit=500,
+        )
+        self.reservation = Reservation.objects.create(
+            client=customer,
+            parking_slot=self.space,
+            start_time=timezone.now() - timedelta(minutes=5),
+            end_time=timezone.now() + timedelta(hours=1),
+            reservation_status=Reservation.ReservationStatus.CONFIRMED,
+        )
+
+    def test_lookup(self):
+        self.client.force_login(self.user)
+
+        found = self.client.get(reverse("gate_lookup"), {"plate": "gate01"}).json()
+        missing = self.client.get(reverse("gate_lookup"), {"plate": "X1"}).json()
+
+        self.assertEqual(found["reservation"]["slot_label"], "V1")
+        self.assertIsNone(missing["reservation"])
+        self.assertEqual(self.client.get(reverse("gate_lookup")).status_code, 400)
+
+    def test_check_in_and_out(self):
+        self.client.force_login(self.user)
+
+        arrived = self.client.post(reverse("gate_check_in"), {"plate": "GATE01"})
+        departed = self.client.post(reverse("gate_check_out"), {"plate": "GATE01"})
+        again = self.client.post(reverse("gate_check_out"), {"plate": "GATE01"})
+
+        self.assertEqual(arrived.status_code, 200)
+        self.assertIsNotNone(arrived.json()["reservation"]["arrived_at"])
+        self.assertIsNotNone(departed.json()["reservation"]["departed_at"])
+        self.assertEqual(again.status_code, 409)
+
+    def test_actions_need_change_permission_and_post(self):
+        other = User.objects.create_user(username="viewer", password="strong-pass")
+        self.client.force_login(other)
+
+        denied = self.client.post(reverse("gate_check_in"), {"plate": "GATE01"})
+        self.client.force_login(self.user)
+        wrong_method = self.client.get(reverse("gate_check_in"), {"plate": "GATE01"})
+
+        self.assertEqual(denied.status_code, 403)
+        self.assertEqual(wrong_method.status_code, 405)
+        self.reservation.refresh_from_db()
+        self.assertIsNone(self.reservation.arrived_at)
@@ -0,0 +1,142 @@
+import io
+import json
+from datetime import datetime, timedelta
+from datetime import timezone as dt_timezone
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.utils import timezone
+
+from blog.gate import current_booking
+from blog.imports import import_reservations, sweep_overlaps
+from blog.models import Client, ParkingLot, ParkingSpace, Reservation
+from blog.services import occupancy_version, slot_detail
+
+HEADER = "client_id,parking_slot_id,slot_label,start_time,end_time,reservation_status\n"
+
+
+class SweepOverlapsTests(TestCase):
+    def test_rejects_candidates_hitting_earlier_or_stored_bookings(self):
+        base = datetime(2030, 1, 1, 8, tzinfo=dt_timezone.utc)
+        hour = timedelta(hours=1)
+        stored = [(base + 5 * hour, base + 6 * hour)]
+        candidates = [
+            (base, base + 2 * hour, "a"),
+            (base + hour, base + 3 * hour, "b"),
+            (base + 2 * hour, base + 3 * hour, "c"),
+            (base + 4 * hour, base + 5 * hour + timedelta(minutes=1), "d"),
+        ]
+
+        accepted, rejected = sweep_overlaps(candidates, stored)
+
+        self.assertEqual(accepted, ["a", "c"])
+        self.assertEqual(rejected, ["b", "d"])
+
+
+class ReservationImportTests(TestCase):
+    def setUp(self):
+        self.customer = Client.objects.create(
+            full_name="Import Driver",
+            contact="1234567890",
+            plate_number="IMP01",
+            dimension=400,
+        )
+        self.lot = ParkingLot.objects.create(lot_id=20, lot_capacity=2)
+        self.first = ParkingSpace.objects.create(
+            label="M1", parking_lot=self.lot, dimension_limit=500
+        )
+        self.second = ParkingSpace.objects.create(
+            label="M2", parking_lot=self.lot, dimension_limit=500
+        )
+        self.start = timezone.now() + timedelta(days=1)
+
+    def _csv_line(self, slot, offset_hours, hours=1, label="", client=None):
+        start = self.start + timedelta(hours=offset_hours)
+        end = start + timedelta(hours=hours)
+        slot_id = slot.id if slot else ""
+        client_id = client if client is not None else self.customer.id
+        return (
+            f"{client_id},{slot_id},{label},{start.isoformat()},"
+            f"{end.isoformat()},CONFIRMED\n"
+        )
+
+    def test_import_drops_cached_gate_slot_and_occupancy_state(self):
+        cache.clear()
+        self.assertIsNone(current_booking("IMP01"))
+        self.assertIsNone(slot_detail(self.first.pk)["current_booking"])
+        version = occupancy_version()
+        self.start = timezone.now() - timedelta(minutes=10)
+
+        result = import_reservations(
+            io.StringIO(HEADER + self._csv_line(self.first, 0)), "csv"
+        )
+
+        self.assertEqual(result.created, 1)
+        booking = current_booking("IMP01")
+        self.assertIsNotNone(booking)
+        self.assertEqual(booking["slot_id"], self.first.pk)
+        self.assertIsNotNone(slot_detail(self.first.pk)["current_booking"])
+        self.assertNotEqual(occupancy_version(), version)
+
+    def test_csv_import_validates_and_bulk_inserts(self):
+        Reservation.objects.create(
+            client=self.customer,
+            parking_slot=self.second,
+            start_time=self.start + timedelta(hours=10),
+            end_time=self.start + timedelta(hours=11),
+        )
+        payload = (
+            HEADER
+            + self._csv_line(self.first, 0, hours=2)
+            + self._csv_line(self.first, 1)
+            + self._csv_line(None, 0, label="M2")
+            + self._csv_line(self.second, 10)
+            + self._csv_line(self.second, 3, client=999999)
+            + "oops,,,,,\n"
+        )
+
+        result = import_reservations(io.StringIO(payload), "csv", chunk_size=2)
+
+        self.assertEqual(result.rows, 6)
+        self.assertEqual(result.created, 2)
+        self.assertEqual(sorted(line for line, _ in result.errors), [3, 5, 6, 7])
+        self.assertEqual(Reservation.objects.count(), 3)
+        imported = Reservation.objects.get(parking_slot=self.first)
+        self.assertEqual(imported.total_cost, Decimal("5.00"))
+        self.assertIsNotNone(imported.reservation_number)
+        self.first.refresh_from_db()
+        self.assertTrue(self.first.is_occupied)
+
+    def test_jsonl_import_keeps_explicit_numbers_ahead_of_the_allocator(self):
+        start = self.start
+        rows = [
+            {
+                "reservation_number": 7000,
+                "client_id": self.customer.id,
+                "slot_label": "M1",
+                "start_time": start.isoformat(),
+                "end_time": (start + timedelta(hours=1)).isoformat(),
+            },
+        ]
+        payload = "\n".join(json.dumps(row) for row in rows) + "\n{not json}\n"
+
+        result = import_reservations(io.StringIO(payload), "jsonl")
+        follow_up = Reservation.objects.create(
+            client=self.customer,
+            parking_slot=self.second,
+            start_time=start,
+            end_time=start + timedelta(hours=1),
+        )
+
+        self.assertEqual(result.created, 1)
+        self.assertEqual(result.errors[0][0], 2)
+        self.assertGreater(follow_up.reservation_number, 7000)
+
+    def test_dry_run_writes_nothing(self):
+        payload = HEADER + self._csv_line(self.first, 0)
+
+        result = import_reservations(io.StringIO(payload), "csv", dry_run=True)
+
+        self.assertEqual(result.created, 1)
+        self.assertFalse(Reservation.objects.exists())
@@ -0,0 +1,129 @@
+import asyncio
+import json
+from datetime import timedelta
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from blog.live import Broadcaster, diff_state, format_event
+from blog.models import Client, ParkingLot, ParkingSpace, Reservation
+
+
+def _parse(chunk):
+    fields = dict(line.split(": ", 1) for line in chunk.decode().strip().splitlines())
+    return fields.get("event"), json.loads(fields.get("data", "null"))
+
+
+class BroadcasterTests(SimpleTestCase):
+    def test_diff_reports_changed_and_deleted_records(self):
+        previous = {1: {"id": 1, "occupied": 0}, 2: {"id": 2, "occupied": 1}}
+        current = {1: {"id": 1, "occupied": 1}, 3: {"id": 3, "occupied": 0}}
+
+        events = diff_state(previous, current, "lot")
+
+        self.assertCountEqual(
+            events,
+            [
+                ("lot", {"id": 1, "occupied": 1}),
+                ("lot", {"id": 3, "occupied": 0}),
+                ("lot", {"id": 2, "deleted": True}),
+            ],
+        )
+
+    def test_deleted_space_keeps_its_lot(self):
+        previous = {5: {"id": 5, "lot": 2, "is_occupied": False, "is_active": True}}
+
+        events = diff_state(previous, {}, "space")
+
+        self.assertEqual(events, [("space", {"id": 5, "deleted": True, "lot": 2})])
+
+    def test_format_event(self):
+        self.assertEqual(
+            format_event("lot", {"id": 1}, event_id=4),
+            b'id: 4\nevent: lot\ndata: {"id":1}\n\n',
+        )
+
+    async def test_publish_fans_out_and_resyncs_slow_clients(self):
+        broadcaster = Broadcaster()
+        broadcaster._task = asyncio.get_running_loop().create_future()
+        broadcaster._loop = asyncio.get_running_loop()
+        fast = asyncio.Queue()
+        slow = asyncio.Queue(maxsize=1)
+        broadcaster._subscribers.update({fast, slow})
+
+        broadcaster.publish("lot", {"id": 1})
+        broadcaster.publish("lot", {"id": 2})
+
+        self.assertEqual(fast.qsize(), 2)
+        self.assertEqual(slow.get_nowait()[1], "resync")
+        broadcaster.unsubscribe(fast)
+        broadcaster.unsubscribe(slow)
+        self.assertEqual(broadcaster.subscriber_count, 0)
+
+
+@override_settings(LIVE_POLL_SECONDS=0.01, LIVE_HEARTBEAT_SECONDS=5)
+class LiveOccupancyViewTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="live", password="strong-pass")
+        self.lot = ParkingLot.objects.create(lot_id=11, lot_capacity=2)
+        self.space = ParkingSpace.objects.create(
+            label="L1", parking_lot=self.lot, dimension_limit=500
+        )
+
+    async def test_requires_login(self):
+        response = await self.async_client.get(reverse("live_occupancy"))
+
+        self.assertEqual(response.status_code, 302)
+
+    async def test_streams_snapshot_then_changes(self):
+        await sync_to_async(self.async_client.force_login)(self.user)
+        response = await self.async_client.get(reverse("live_occupancy"))
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        stream = aiter(response.streaming_content)
+
+        self.assertTrue((await anext(stream)).startswith(b"retry:"))
+        name, data = _parse(await anext(stream))
+        self.assertEqual(name, "snapshot")
+        self.assertEqual(data["lots"][0]["occupied"], 0)
+
+        await sync_to_async(Reservation.objects.create)(
+            client=await sync_to_async(Client.objects.create)(
+                full_name="Live Driver",
+                contact="1234567890",
+                plate_number="LIVE01",
+                dimension=400,
+            ),
+            parking_slot=self.space,
+            start_time=timezone.now() - timedelta(minutes=5),
+            end_time=timezone.now() + timedelta(hours=1),
+            reservation_status=Reservation.ReservationStatus.CONFIRMED,
+        )
+
+        events = dict([_parse(await anext(stream)), _parse(await anext(stream))])
+        self.assertEqual(events["lot"]["occupied"], 1)
+        self.assertTrue(events["space"]["is_occupied"])
+        await response.streaming_content.aclose()
+
+    async def test_lot_filtered_stream_sees_deleted_spaces(self):
+        await sync_to_async(self.async_client.force_login)(self.user)
+        response = await self.async_client.get(
+            reverse("live_occupancy"), {"lot": self.lot.pk}
+        )
+        stream = aiter(response.streaming_content)
+        await anext(stream)
+        name, data = _parse(await anext(stream))
+        self.assertEqual([lot["id"] for lot in data["lots"]], [self.lot.pk])
+
+        space_id = self.space.pk
+        await sync_to_async(self.space.delete)()
+
+        events = [_parse(await anext(stream)) for _ in range(2)]
+        self.assertIn(
+            ("space", {"id": space_id, "deleted": True, "lot": self.lot.pk}), events
+        )
+        await response.streaming_content.aclose()
@@ -2,10 +2,12 @@ from datetime import timedelta
 from decimal import Decimal
 
 from django.core.exceptions import ValidationError
-from django.test import TestCase
+from django.db import IntegrityError, transaction
+from django.test import TestCase, TransactionTestCase
 from django.utils import timezone
 
-from blog.models import Client, ParkingLot, ParkingSpace, Reservation
+from blog.models import Client, NumberSequence, ParkingLot, ParkingSpace, Reservation
+from blog.sequences import BlockAllocator, reservation_numbers
 
 
 class ReservationModelTests(TestCase):
@@ -134,3 +136,115 @@ class ParkingSpaceTests(TestCase):
         )
 
         self.assertEqual(self.space.active_reservation, active)
+
+
+class ReservationNumberAllocatorTests(TransactionTestCase):
+    def setUp(self):
+        reservation_numbers.reset()
+        self.customer = Client.objects.create(
+            full_name="Sequence Driver",
+            contact="1234567890",
+            plate_number="SEQ01",
+            dimension=400,
+        )
+        self.space = ParkingSpace.objects.create(label="Q1", dimension_limit=500)
+
+    def test_allocates_in_blocks_without_querying_per_insert(self):
+        allocator = BlockAllocator("test_sequence", seed=lambda: 1000, block_size=5)
+
+        first = allocator.allocate(3)
+        with self.assertNumQueries(0):
+            second = allocator.allocate(2)
+        third = allocator.allocate(1)
+
+        self.assertEqual(first + second + third, list(range(1001, 1007)))
+
+    def test_separate_allocators_never_hand_out_the_same_number(self):
+        worker_a = BlockAllocator("shared_sequence", seed=lambda: 0, block_size=4)
+        worker_b = BlockAllocator("shared_sequence", seed=lambda: 0, block_size=4)
+
+        numbers = worker_a.allocate(3) + worker_b.allocate(3) + worker_a.allocate(3)
+
+        self.assertEqual(len(numbers), len(set(numbers)))
+
+    def test_seeds_from_existing_reservations(self):
+        start = timezone.now()
+        Reservation.objects.create(
+            reservation_number=5000,
+            client=self.customer,
+            parking_slot=self.space,
+            start_time=start,
+            end_time=start + timedelta(hours=1),
+        )
+        NumberSequence.objects.all().delete()
+
+        booking = Reservation.objects.create(
+            client=self.customer,
+            parking_slot=self.space,
+            start_time=start + timedelta(hours=1),
+            end_time=start + timedelta(hours=2),
+        )
+
+        self.assertEqual(booking.reservation_number, 5001)
+
+
+class ReservationOverlapGuardTests(TestCase):
+    def setUp(self):
+        self.customer = Client.objects.create(
+            full_name="Guard Driver",
+            contact="1234567890",
+            plate_number="GRD01",
+            dimension=400,
+        )
+        self.space = ParkingSpace.objects.create(label="G1", dimension_limit=500)
+        self.start = timezone.now()
+        self.end = self.start + timedelta(hours=1)
+        Reservation.objects.create(
+            client=self.customer,
+            parking_slot=self.space,
+            start_time=self.start,
+            end_time=self.end,
+            reservation_status=Reservation.ReservationStatus.CONFIRMED,
+        )
+
+    def test_database_rejects_overlap_that_bypasses_clean(self):
+        overlap = Reservation(
+            reservation_number=9999,
+            client=self.customer,
+            parking_slot=self.space,
+            start_time=self.start + timedelta(minutes=30),
+            end_time=self.end + timedelta(minutes=30),
+            reservation_status=Reservation.ReservationStatus.PENDING,
+        )
+
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Reservation.objects.bulk_create([overlap])
+
+    def test_save_reports_overlap_as_validation_error(self):
+        overlap = Reservation(
+            client=self.customer,
+            parking_slot=self.space,
+            start_time=self.start + timedelta(minutes=30),
+            end_time=self.end + timedelta(minutes=30),
+        )
+
+        with self.assertRaisesMessage(ValidationError, "not available"):
+            with transaction.atomic():
+                overlap.save()
+
+    def test_inactive_and_adjacent_bookings_are_allowed(self):
+        Reservation.objects.create(
+            client=self.customer,
+            parking_slot=self.space,
+            start_time=self.start,
+            end_time=self.end,
+            reservation_status=Reservation.ReservationStatus.CANCELLED,
+        )
+        adjacent = Reservation.objects.create(
+            client=self.customer,
+            parking_slot=self.space,
+            start_time=self.end,
+            end_time=self.end + timedelta(hours=1),
+        )
+
+        self.assertIsNotNone(adjacent.pk)
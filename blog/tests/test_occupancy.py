@@ -0,0 +1,151 @@
+import datetime as dt
+
+from asgiref.sync import sync_to_async
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from blog.models import (
+    Client,
+    OccupancyRollup,
+    OccupancySnapshot,
+    ParkingLot,
+    ParkingSpace,
+    Reservation,
+)
+from blog.occupancy import (
+    aoccupancy_series,
+    occupancy_series,
+    rollup_occupancy,
+    summarize_steps,
+)
+
+UTC = dt.timezone.utc
+
+
+class SnapshotWriteTests(TestCase):
+    def test_counter_changes_write_a_minute_snapshot(self):
+        lot = ParkingLot.objects.create(lot_id=51, lot_capacity=2)
+        space = ParkingSpace.objects.create(
+            label="H1", parking_lot=lot, dimension_limit=500
+        )
+        start = timezone.now() + dt.timedelta(hours=1)
+        Reservation.objects.create(
+            client=Client.objects.create(
+                full_name="History Driver",
+                contact="1234567890",
+                plate_number="HIST01",
+                dimension=400,
+            ),
+            parking_slot=space,
+            start_time=start,
+            end_time=start + dt.timedelta(hours=1),
+        )
+
+        snapshot = OccupancySnapshot.objects.get(parking_lot=lot)
+
+        # Both changes fell in the same minute, so the later one won.
+        self.assertEqual((snapshot.occupied, snapshot.total), (1, 1))
+        self.assertEqual(snapshot.taken_at.second, 0)
+
+
+class SummarizeStepsTests(TestCase):
+    def test_time_weighted_average(self):
+        start = dt.datetime(2026, 1, 1, 10, tzinfo=UTC)
+        points = [(start + dt.timedelta(minutes=15), 4, 10)]
+
+        avg, low, high, close, total = summarize_steps(
+            points, start, start + dt.timedelta(hours=1), opening=(0, 10)
+        )
+
+        self.assertEqual(avg, 3.0)
+        self.assertEqual((low, high, close, total), (0, 4, 4, 10))
+
+    def test_nothing_in_force(self):
+        start = dt.datetime(2026, 1, 1, tzinfo=UTC)
+        self.assertIsNone(summarize_steps([], start, start + dt.timedelta(hours=1)))
+
+
+@override_settings(
+    OCCUPANCY_SNAPSHOT_RETENTION_DAYS=1, OCCUPANCY_HOURLY_RETENTION_DAYS=30
+)
+class RollupTests(TestCase):
+    def setUp(self):
+        self.lot = ParkingLot.objects.create(lot_id=52, lot_capacity=10)
+        self.day = dt.datetime(2026, 3, 1, tzinfo=UTC)
+        for minute, occupied in [(0, 2), (30, 6), (24 * 60 - 60, 8)]:
+            OccupancySnapshot.objects.create(
+                parking_lot=self.lot,
+                taken_at=self.day + dt.timedelta(minutes=minute),
+                occupied=occupied,
+                total=10,
+            )
+
+    def test_rolls_up_hours_and_days_then_prunes(self):
+        now = self.day + dt.timedelta(days=3, minutes=5)
+
+        stats = rollup_occupancy(now=now)
+
+        hours = OccupancyRollup.objects.filter(
+            parking_lot=self.lot, resolution=OccupancyRollup.Resolution.HOUR
+        )
+        first_hour = hours.get(bucket_start=self.day)
+        self.assertEqual(first_hour.occupied_avg, 4.0)
+        self.assertEqual((first_hour.occupied_min, first_hour.occupied_max), (2, 6))
+        # Quiet hours carry the last value forward.
+        self.assertEqual(
+            hours.get(bucket_start=self.day + dt.timedelta(hours=5)).occupied_avg, 6
+        )
+        self.assertEqual(stats["hours"], 72)
+
+        first_day = OccupancyRollup.objects.get(
+            parking_lot=self.lot,
+            resolution=OccupancyRollup.Resolution.DAY,
+            bucket_start=self.day,
+        )
+        self.assertEqual((first_day.occupied_min, first_day.occupied_max), (2, 8))
+        self.assertEqual(first_day.occupied_close, 8)
+        self.assertEqual(stats["days"], 3)
+
+        # All raw points are older than the one-day retention window.
+        self.assertEqual(stats["pruned_snapshots"], 3)
+        self.assertFalse(OccupancySnapshot.objects.exists())
+
+        # A second run only adds what is new and keeps carrying the value.
+        later = rollup_occupancy(now=now + dt.timedelta(hours=2))
+        self.assertEqual(later["hours"], 2)
+        self.assertEqual(hours.order_by("-bucket_start").first().occupied_avg, 8)
+
+    def test_series_reads_rollups_for_long_ranges(self):
+        rollup_occupancy(now=self.day + dt.timedelta(days=3))
+
+        series = occupancy_series(
+            self.lot.pk,
+            self.day - dt.timedelta(days=300),
+            self.day + dt.timedelta(days=65),
+        )
+
+        self.assertEqual([point["at"] for point in series][:1], [self.day])
+        self.assertEqual(len(series), 3)
+        self.assertEqual(series[0]["max"], 8)
+
+    def test_minute_series_starts_with_value_in_force(self):
+        series = occupancy_series(
+            self.lot.pk,
+            self.day + dt.timedelta(minutes=10),
+            self.day + dt.timedelta(hours=2),
+            resolution="minute",
+        )
+
+        self.assertEqual([point["occupied"] for point in series], [2, 6])
+        self.assertEqual(series[0]["at"], self.day + dt.timedelta(minutes=10))
+
+    async def test_async_series_matches_sync(self):
+        start = self.day + dt.timedelta(minutes=10)
+        end = self.day + dt.timedelta(hours=2)
+
+        series = await aoccupancy_series(self.lot.pk, start, end, "minute")
+
+        expected = await sync_to_async(occupancy_series)(
+            self.lot.pk, start, end, "minute"
+        )
+        self.assertEqual(series, expected)
@@ -0,0 +1,71 @@
+from datetime import timedelta
+
+from django.test import TestCase
+from django.utils import timezone
+
+from blog.models import Client, ParkingSpace, Reservation
+from blog.pagination import InvalidCursor, KeysetPaginator
+
+
+class KeysetPaginatorTests(TestCase):
+    def setUp(self):
+        customer = Client.objects.create(
+            full_name="Page Driver",
+            contact="1234567890",
+            plate_number="PAGE01",
+            dimension=400,
+        )
+        base = timezone.now() + timedelta(days=1)
+        self.reservations = []
+        for index in range(5):
+            space = ParkingSpace.objects.create(label=f"K{index}", dimension_limit=500)
+            # Two bookings share a start time to exercise the id tie-breaker.
+            start = base + timedelta(hours=index // 2)
+            self.reservations.append(
+                Reservation.objects.create(
+                    client=customer,
+                    parking_slot=space,
+                    start_time=start,
+                    end_time=start + timedelta(hours=1),
+                )
+            )
+        self.expected = [
+            reservation.pk
+            for reservation in sorted(
+                self.reservations,
+                key=lambda item: (item.start_time, item.pk),
+                reverse=True,
+            )
+        ]
+        self.paginator = KeysetPaginator(
+            Reservation.objects.all(), ("-start_time", "-id"), per_page=2
+        )
+
+    def test_walks_forward_and_back_without_gaps(self):
+        seen = []
+        page = self.paginator.page()
+        self.assertFalse(page.has_previous)
+        pages = [page]
+        while page.has_next:
+            page = self.paginator.page(after=page.next_cursor)
+            pages.append(page)
+        for page in pages:
+            seen.extend(row.pk for row in page)
+
+        self.assertEqual(seen, self.expected)
+        self.assertEqual(len(pages), 3)
+
+        back = self.paginator.page(before=pages[-1].previous_cursor)
+        self.assertEqual([row.pk for row in back], [row.pk for row in pages[1]])
+        first = self.paginator.page(before=back.previous_cursor)
+        self.assertEqual([row.pk for row in first], self.expected[:2])
+        self.assertFalse(first.has_previous)
+
+    def test_page_query_count_is_constant(self):
+        cursor = self.paginator.page().next_cursor
+        with self.assertNumQueries(1):
+            self.paginator.page(after=cursor)
+
+    def test_rejects_garbage_cursor(self):
+        with self.assertRaises(InvalidCursor):
+            self.paginator.page(after="not-a-cursor")
@@ -0,0 +1,254 @@
+import json
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth.models import Permission, User
+from django.core.cache import cache
+from django.db import OperationalError
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from blog import sensors
+from blog.models import Client, ParkingLot, ParkingSpace, Reservation
+from blog.sensors import BufferFull, SensorBuffer, parse_reports
+from blog.services import refresh_parking_state
+
+
+class ParseReportsTests(SimpleTestCase):
+    def test_parses_events(self):
+        now = timezone.now()
+        body = json.dumps(
+            {
+                "events": [
+                    {"slot": 1, "occupied": True},
+                    {"slot": 2, "occupied": False, "at": "2026-01-01T10:00:00Z"},
+                ]
+            }
+        )
+
+        reports = parse_reports(body, now=now)
+
+        self.assertEqual(reports[0], (1, True, now))
+        self.assertEqual(reports[1][2].isoformat(), "2026-01-01T10:00:00+00:00")
+
+    @override_settings(SENSOR_BATCH_MAX=1)
+    def test_rejects_malformed_and_oversized_batches(self):
+        for body in (
+            "nope",
+            "[]",
+            '{"events": [{"slot": "A", "occupied": true}]}',
+            '{"events": [{"slot": 1, "occupied": 1}]}',
+            '{"events": [{"slot": 0, "occupied": true}]}',
+            '{"events": [{"slot": 1180591620717411303424, "occupied": true}]}',
+            '{"events": [{"slot": 1, "occupied": true, "at": "later"}]}',
+            json.dumps({"events": [{"slot": 1, "occupied": True}] * 2}),
+        ):
+            with self.subTest(body=body), self.assertRaises(ValueError):
+                parse_reports(body)
+
+
+class SensorBufferTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.lot = ParkingLot.objects.create(lot_id=71, lot_capacity=2)
+        self.first = ParkingSpace.objects.create(
+            label="S1", parking_lot=self.lot, dimension_limit=500
+        )
+        self.second = ParkingSpace.objects.create(
+            label="S2", parking_lot=self.lot, dimension_limit=500
+        )
+        self.buffer = SensorBuffer(autostart=False)
+
+    def test_keeps_latest_report_per_slot(self):
+        now = timezone.now()
+
+        self.buffer.offer(
+            [
+                (self.first.pk, True, now),
+                (self.first.pk, False, now + timedelta(seconds=1)),
+                (self.first.pk, True, now - timedelta(seconds=1)),
+                (self.second.pk, True, now),
+            ]
+        )
+        written = self.buffer.flush()
+
+        self.first.refresh_from_db()
+        self.second.refresh_from_db()
+        self.lot.refresh_from_db()
+        self.assertEqual(written, 2)
+        self.assertIs(self.first.sensor_occupied, False)
+        self.assertFalse(self.first.is_occupied)
+        self.assertTrue(self.second.is_occupied)
+        self.assertEqual(self.lot.occupied_spaces, 1)
+        metrics = self.buffer.metrics()
+        self.assertEqual(metrics["received"], 4)
+        self.assertEqual(metrics["coalesced"], 2)
+        self.assertEqual(metrics["written"], 2)
+        self.assertIsNotNone(metrics["flush_ms"]["p95"])
+
+    def test_flush_fills_lot_and_skips_stale_reports(self):
+        now = timezone.now()
+        self.buffer.offer([(self.first.pk, True, now), (self.second.pk, True, now)])
+        self.buffer.flush()
+        self.lot.refresh_from_db()
+        self.assertEqual(self.lot.current_status, "Full")
+
+        self.buffer.offer([(self.first.pk, False, now - timedelta(minutes=1))])
+        self.assertEqual(self.buffer.flush(), 0)
+        self.buffer.offer([(self.first.pk, True, now + timedelta(seconds=1))])
+        self.assertEqual(self.buffer.flush(), 0)
+
+    @override_settings(SENSOR_MAX_PENDING=1)
+    def test_refuses_new_slots_when_full(self):
+        now = timezone.now()
+        self.buffer.offer([(self.first.pk, True, now)])
+
+        self.buffer.offer([(self.first.pk, False, now)])
+        with self.assertRaises(BufferFull):
+            self.buffer.offer([(self.second.pk, True, now)])
+        self.assertEqual(self.buffer.pending_count, 1)
+        self.assertEqual(self.buffer.metrics()["rejected"], 1)
+
+    def test_failed_flush_keeps_reports(self):
+        self.buffer.offer([(self.first.pk, True, timezone.now())])
+
+        with (
+            mock.patch(
+                "blog.sensors.apply_sensor_reports", side_effect=OperationalError
+            ),
+            self.assertRaises(OperationalError),
+        ):
+            self.buffer.flush()
+
+        self.assertEqual(self.buffer.pending_count, 1)
+        self.assertEqual(self.buffer.flush(), 1)
+
+    def test_unwritable_report_is_dropped_without_blocking_the_batch(self):
+        now = timezone.now()
+        self.buffer.offer([(self.first.pk, True, now), (2**70, True, now)])
+
+        with self.assertLogs("blog.sensors", "ERROR"):
+            written = self.buffer.flush()
+
+        self.first.refresh_from_db()
+        self.assertEqual(written, 1)
+        self.assertTrue(self.first.is_occupied)
+        self.assertEqual(self.buffer.pending_count, 0)
+        self.assertEqual(self.buffer.metrics()["dropped"], 1)
+
+    def test_flush_thread_recovers_after_a_dropped_connection(self):
+        self.buffer.offer([(self.first.pk, True, timezone.now())])
+        apply = sensors.apply_sensor_reports
+        calls = []
+
+        def drop_first(reports):
+            calls.append(reports)
+            if len(calls) == 1:
+                raise OperationalError("server closed the connection unexpectedly")
+            return apply(reports)
+
+        with (
+            mock.patch("blog.sensors.apply_sensor_reports", side_effect=drop_first),
+            mock.patch("blog.sensors.close_old_connections") as close_old,
+            self.assertLogs("blog.sensors", "ERROR"),
+        ):
+            self.buffer._flush_logged()
+            self.assertEqual(self.buffer.pending_count, 1)
+            self.buffer._flush_logged()
+
+        self.assertEqual(close_old.call_count, 4)
+        self.assertEqual(self.buffer.pending_count, 0)
+        self.first.refresh_from_db()
+        self.assertTrue(self.first.is_occupied)
+        metrics = self.buffer.metrics()
+        self.assertEqual((metrics["failed_flushes"], metrics["written"]), (1, 1))
+
+    def test_booked_slot_stays_occupied_when_sensor_reports_empty(self):
+        customer = Client.objects.create(
+            full_name="Sensor Driver",
+            contact="1234567890",
+            plate_number="SNS01",
+            dimension=400,
+        )
+        Reservation.objects.create(
+            client=customer,
+            parking_slot=self.first,
+            start_time=timezone.now() - timedelta(minutes=5),
+            end_time=timezone.now() + timedelta(hours=1),
+            reservation_status=Reservation.ReservationStatus.CONFIRMED,
+        )
+
+        self.buffer.offer([(self.first.pk, False, timezone.now())])
+        self.buffer.flush()
+
+        self.first.refresh_from_db()
+        self.assertIs(self.first.sensor_occupied, False)
+        self.assertTrue(self.first.is_occupied)
+
+    def test_full_reconcile_respects_sensor_state(self):
+        self.buffer.offer([(self.second.pk, True, timezone.now())])
+        self.buffer.flush()
+
+        refresh_parking_state()
+
+        self.second.refresh_from_db()
+        self.lot.refresh_from_db()
+        self.assertTrue(self.second.is_occupied)
+        self.assertEqual(self.lot.occupied_spaces, 1)
+
+
+class SensorViewTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="sensor", password="strong-pass")
+        self.user.user_permissions.add(
+            Permission.objects.get(codename="change_parkingspace")
+        )
+        self.space = ParkingSpace.objects.create(
+            label="W1",
+            parking_lot=ParkingLot.objects.create(lot_id=72, lot_capacity=1),
+            dimension_limit=500,
+        )
+        self.buffer = SensorBuffer(autostart=False)
+        patcher = mock.patch("blog.views.sensor_buffer", self.buffer)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _post(self, payload):
+        return self.client.post(
+            reverse("sensor_events"),
+            json.dumps(payload),
+            content_type="application/json",
+        )
+
+    def test_accepts_batch_and_reports_metrics(self):
+        self.client.force_login(self.user)
+
+        response = self._post({"events": [{"slot": self.space.pk, "occupied": True}]})
+        self.buffer.flush()
+        metrics = self.client.get(reverse("sensor_metrics")).json()
+
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.json(), {"accepted": 1})
+        self.space.refresh_from_db()
+        self.assertTrue(self.space.is_occupied)
+        self.assertEqual(metrics["received"], 1)
+        self.assertGreater(metrics["events_per_second"], 0)
+
+    @override_settings(SENSOR_MAX_PENDING=0)
+    def test_backpressure(self):
+        self.client.force_login(self.user)
+
+        response = self._post({"events": [{"slot": self.space.pk, "occupied": True}]})
+
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response["Retry-After"], "1")
+
+    def test_needs_permission_and_valid_body(self):
+        other = User.objects.create_user(username="viewer", password="strong-pass")
+        self.client.force_login(other)
+        self.assertEqual(self._post({"events": []}).status_code, 403)
+
+        self.client.force_login(self.user)
+        self.assertEqual(self._post({"wrong": []}).status_code, 400)
@@ -1,10 +1,21 @@
 from datetime import timedelta
+from unittest import mock, skipUnless
 
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.utils import timezone
 
 from blog.models import Client, ParkingLot, ParkingSpace, Reservation
-from blog.services import refresh_parking_state
+from blog.services import (
+    available_spaces,
+    clients_by_plate,
+    lot_counter_drift,
+    recent_reservations_by_slot,
+    reconcile_boundaries,
+    refresh_parking_state,
+    search_clients,
+)
 
 
 class RefreshParkingStateTests(TestCase):
@@ -59,3 +70,370 @@ class RefreshParkingStateTests(TestCase):
 
         self.assertFalse(self.space.is_occupied)
         self.assertEqual(self.lot.current_status, "Open")
+
+
+class IncrementalOccupancyTests(TestCase):
+    def setUp(self):
+        self.customer = Client.objects.create(
+            full_name="Incremental Driver",
+            contact="1234567890",
+            plate_number="INC01",
+            dimension=400,
+        )
+        self.lot = ParkingLot.objects.create(lot_id=77, lot_capacity=2)
+        self.first = ParkingSpace.objects.create(
+            label="I1", parking_lot=self.lot, dimension_limit=500
+        )
+        self.second = ParkingSpace.objects.create(
+            label="I2", parking_lot=self.lot, dimension_limit=500
+        )
+
+    def _book(self, space, start, end):
+        return Reservation.objects.create(
+            client=self.customer,
+            parking_slot=space,
+            start_time=start,
+            end_time=end,
+            reservation_status=Reservation.ReservationStatus.CONFIRMED,
+        )
+
+    def _snapshot(self):
+        spaces = dict(ParkingSpace.objects.values_list("id", "is_occupied"))
+        lots = dict(ParkingLot.objects.values_list("id", "current_status"))
+        return spaces, lots
+
+    def test_reservation_writes_update_slot_and_lot(self):
+        now = timezone.now()
+        first = self._book(self.first, now, now + timedelta(hours=1))
+        self._book(self.second, now, now + timedelta(hours=1))
+
+        self.first.refresh_from_db()
+        self.lot.refresh_from_db()
+        self.assertTrue(self.first.is_occupied)
+        self.assertEqual(self.lot.current_status, "Full")
+
+        first.delete()
+        self.first.refresh_from_db()
+        self.lot.refresh_from_db()
+        self.assertFalse(self.first.is_occupied)
+        self.assertEqual(self.lot.current_status, "Open")
+
+    def test_moving_a_reservation_frees_the_previous_slot(self):
+        now = timezone.now()
+        booking = self._book(self.first, now, now + timedelta(hours=1))
+
+        booking.parking_slot = self.second
+        booking.save()
+
+        self.first.refresh_from_db()
+        self.second.refresh_from_db()
+        self.assertFalse(self.first.is_occupied)
+        self.assertTrue(self.second.is_occupied)
+
+    def test_incremental_state_matches_full_reconcile(self):
+        now = timezone.now()
+        other_lot = ParkingLot.objects.create(lot_id=78, lot_capacity=0)
+        third = ParkingSpace.objects.create(
+            label="I3", parking_lot=other_lot, dimension_limit=500
+        )
+        self._book(self.first, now, now + timedelta(hours=1))
+        self._book(third, now + timedelta(hours=2), now + timedelta(hours=3))
+        cancelled = self._book(self.second, now, now + timedelta(hours=1))
+        cancelled.reservation_status = Reservation.ReservationStatus.CANCELLED
+        cancelled.save()
+
+        incremental = self._snapshot()
+        refresh_parking_state()
+
+        self.assertEqual(self._snapshot(), incremental)
+
+
+class LotCounterTests(TestCase):
+    def setUp(self):
+        self.customer = Client.objects.create(
+            full_name="Counter Driver",
+            contact="1234567890",
+            plate_number="CNT01",
+            dimension=400,
+        )
+        self.lot = ParkingLot.objects.create(lot_id=41, lot_capacity=0)
+        self.other_lot = ParkingLot.objects.create(lot_id=42, lot_capacity=0)
+        self.space = ParkingSpace.objects.create(
+            label="C1", parking_lot=self.lot, dimension_limit=500
+        )
+        ParkingSpace.objects.create(
+            label="C2", parking_lot=self.lot, dimension_limit=500
+        )
+
+    def counters(self, lot):
+        lot.refresh_from_db()
+        return lot.total_spaces, lot.occupied_spaces, lot.available_spaces
+
+    def test_counters_follow_slots_and_occupancy(self):
+        self.assertEqual(self.counters(self.lot), (2, 0, 2))
+
+        start = timezone.now() + timedelta(hours=1)
+        reservation = Reservation.objects.create(
+            client=self.customer,
+            parking_slot=self.space,
+            start_time=start,
+            end_time=start + timedelta(hours=1),
+        )
+        self.assertEqual(self.counters(self.lot), (2, 1, 1))
+
+        self.space.refresh_from_db()
+        self.space.parking_lot = self.other_lot
+        self.space.save()
+        self.assertEqual(self.counters(self.lot), (1, 0, 1))
+        self.assertEqual(self.counters(self.other_lot), (1, 1, 0))
+        self.other_lot.refresh_from_db()
+        self.assertEqual(self.other_lot.current_status, "Full")
+
+        reservation.delete()
+        self.assertEqual(self.counters(self.other_lot), (1, 0, 1))
+
+        self.space.delete()
+        self.assertEqual(self.counters(self.other_lot), (0, 0, 0))
+        self.assertEqual(lot_counter_drift(), [])
+
+    def test_full_reconcile_repairs_drifted_counters(self):
+        ParkingLot.objects.filter(pk=self.lot.pk).update(
+            total_spaces=9, occupied_spaces=4
+        )
+        self.assertEqual(len(lot_counter_drift()), 1)
+
+        refresh_parking_state()
+
+        self.assertEqual(self.counters(self.lot), (2, 0, 2))
+        self.assertEqual(lot_counter_drift(), [])
+
+
+class ReconcileBoundariesTests(TestCase):
+    def setUp(self):
+        self.customer = Client.objects.create(
+            full_name="Boundary Driver",
+            contact="1234567890",
+            plate_number="BND01",
+            dimension=400,
+        )
+        self.lot = ParkingLot.objects.create(lot_id=88, lot_capacity=1)
+        self.space = ParkingSpace.objects.create(
+            label="B1", parking_lot=self.lot, dimension_limit=500
+        )
+
+    def test_frees_slot_whose_booking_ended_since_last_tick(self):
+        start = timezone.now()
+        end = start + timedelta(minutes=30)
+        Reservation.objects.create(
+            client=self.customer,
+            parking_slot=self.space,
+            start_time=start,
+            end_time=end,
+            reservation_status=Reservation.ReservationStatus.PENDING,
+        )
+        self.space.refresh_from_db()
+        self.assertTrue(self.space.is_occupied)
+
+        changed = reconcile_boundaries(
+            end - timedelta(minutes=1), now=end + timedelta(minutes=1)
+        )
+        self.space.refresh_from_db()
+        self.lot.refresh_from_db()
+
+        self.assertEqual(changed, 2)
+        self.assertFalse(self.space.is_occupied)
+        self.assertEqual(self.lot.current_status, "Open")
+
+    def test_ignores_bookings_outside_the_window(self):
+        start = timezone.now()
+        Reservation.objects.create(
+            client=self.customer,
+            parking_slot=self.space,
+            start_time=start,
+            end_time=start + timedelta(hours=3),
+            reservation_status=Reservation.ReservationStatus.CONFIRMED,
+        )
+
+        changed = reconcile_boundaries(
+            start + timedelta(hours=1), now=start + timedelta(hours=2)
+        )
+
+        self.assertEqual(changed, 0)
+
+
+class AvailableSpacesTests(TestCase):
+    def setUp(self):
+        self.customer = Client.objects.create(
+            full_name="Search Driver",
+            contact="1234567890",
+            plate_number="SRCH01",
+            dimension=400,
+        )
+        self.lot = ParkingLot.objects.create(lot_id=60, lot_capacity=4)
+        self.other_lot = ParkingLot.objects.create(lot_id=61, lot_capacity=4)
+        self.spaces = [
+            ParkingSpace.objects.create(
+                label=f"S{index}",
+                parking_lot=self.lot if index % 2 else self.other_lot,
+                floor_number=1 + index % 3,
+                space_type="BOX" if index % 2 else "Angular",
+                dimension_limit=400 + index * 50,
+            )
+            for index in range(6)
+        ]
+        self.start = timezone.now() + timedelta(hours=1)
+        for space, offset in zip(self.spaces[:3], (0, 2, 4)):
+            Reservation.objects.create(
+                client=self.customer,
+                parking_slot=space,
+                start_time=self.start + timedelta(hours=offset),
+                end_time=self.start + timedelta(hours=offset + 1),
+                reservation_status=Reservation.ReservationStatus.CONFIRMED,
+            )
+
+    def test_matches_is_available_for_every_slot(self):
+        windows = [
+            (self.start, self.start + timedelta(hours=1)),
+            (self.start + timedelta(minutes=30), self.start + timedelta(hours=3)),
+            (self.start + timedelta(hours=5), self.start + timedelta(hours=6)),
+        ]
+        for start, end in windows:
+            with CaptureQueriesContext(connection) as queries:
+                found = set(available_spaces(start, end).values_list("id", flat=True))
+            # Index rows, the edge-bucket check and the slots themselves.
+            self.assertLessEqual(len(queries), 3)
+            expected = {
+                space.id for space in self.spaces if space.is_available(start, end)
+            }
+            self.assertEqual(found, expected)
+
+    def test_filters_narrow_the_result(self):
+        end = self.start + timedelta(hours=1)
+
+        results = available_spaces(
+            self.start,
+            end,
+            lot=self.lot.id,
+            space_type="BOX",
+            min_dimension=500,
+        )
+
+        self.assertEqual(
+            [space.label for space in results],
+            [space.label for space in self.spaces[3:] if space.parking_lot == self.lot],
+        )
+
+    def test_inactive_slots_are_excluded(self):
+        self.spaces[5].is_active = False
+        self.spaces[5].save()
+
+        results = available_spaces(self.start, self.start + timedelta(hours=1))
+
+        self.assertNotIn(self.spaces[5], results)
+
+
+class RecentReservationsBySlotTests(TestCase):
+    def setUp(self):
+        customer = Client.objects.create(
+            full_name="Recent Driver",
+            contact="1234567890",
+            plate_number="RCNT01",
+            dimension=400,
+        )
+        self.busy = ParkingSpace.objects.create(label="R1", dimension_limit=500)
+        self.quiet = ParkingSpace.objects.create(label="R2", dimension_limit=500)
+        self.empty = ParkingSpace.objects.create(label="R3", dimension_limit=500)
+        base = timezone.now() - timedelta(days=10)
+        self.busy_starts = []
+        for day in range(4):
+            start = base + timedelta(days=day)
+            Reservation.objects.create(
+                client=customer,
+                parking_slot=self.busy,
+                start_time=start,
+                end_time=start + timedelta(hours=1),
+            )
+            self.busy_starts.append(start)
+        Reservation.objects.create(
+            client=customer,
+            parking_slot=self.quiet,
+            start_time=base,
+            end_time=base + timedelta(hours=1),
+        )
+
+    def assert_top_two(self, grouped):
+        self.assertEqual(
+            [entry.start_time for entry in grouped[self.busy.pk]],
+            sorted(self.busy_starts, reverse=True)[:2],
+        )
+        self.assertEqual(len(grouped[self.quiet.pk]), 1)
+        self.assertNotIn(self.empty.pk, grouped)
+
+    def test_window_function_path_uses_one_query(self):
+        slot_ids = [self.busy.pk, self.quiet.pk, self.empty.pk]
+        with self.assertNumQueries(1):
+            grouped = recent_reservations_by_slot(slot_ids, limit=2)
+            # Clients come from the same query.
+            [entry.client.full_name for entry in grouped[self.busy.pk]]
+        self.assert_top_two(grouped)
+
+    def test_grouping_fallback_without_window_functions(self):
+        slot_ids = [self.busy.pk, self.quiet.pk, self.empty.pk]
+        with mock.patch.object(connection.features, "supports_over_clause", False):
+            with self.assertNumQueries(1):
+                grouped = recent_reservations_by_slot(slot_ids, limit=2)
+        self.assert_top_two(grouped)
+
+
+class ClientSearchTests(TestCase):
+    def setUp(self):
+        self.plated = Client.objects.create(
+            full_name="Maria Lopez",
+            contact="0712345678",
+            plate_number="kl-01 ab",
+            dimension=400,
+        )
+        self.other = Client.objects.create(
+            full_name="Klaus Meyer",
+            contact="0799999999",
+            plate_number="XY99",
+            dimension=400,
+        )
+
+    def test_plate_key_is_case_folded_without_separators(self):
+        self.assertEqual(self.plated.plate_key, "kl01ab")
+
+        self.plated.plate_number = "ZZ 12"
+        self.plated.save(update_fields=["plate_number"])
+        self.plated.refresh_from_db()
+        self.assertEqual(self.plated.plate_key, "zz12")
+
+    def test_keys_fit_names_that_grow_when_case_folded(self):
+        client = Client.objects.create(
+            full_name="ß" * 120,
+            contact="0700000000",
+            plate_number="ß" * 10,
+            dimension=1,
+            car_type="Sedan",
+        )
+
+        client.full_clean()
+        self.assertEqual(client.name_key, "ss" * 120)
+        self.assertEqual(client.plate_key, "ss" * 10)
+        self.assertEqual(list(clients_by_plate("SS" * 10)), [client])
+
+    def test_exact_plate_lookup_ignores_formatting(self):
+        self.assertEqual(list(clients_by_plate("KL 01-AB")), [self.plated])
+        self.assertFalse(clients_by_plate("KL01").exists())
+        self.assertFalse(clients_by_plate(" - ").exists())
+
+    def test_search_matches_name_plate_and_contact_prefixes(self):
+        self.assertEqual(list(search_clients("kl")), [self.other, self.plated])
+        self.assertEqual(list(search_clients("maria")), [self.plated])
+        self.assertEqual(list(search_clients("0799")), [self.other])
+
+    @skipUnless(connection.vendor == "sqlite", "EXPLAIN output is SQLite's")
+    def test_exact_plate_lookup_uses_the_index(self):
+        plan = clients_by_plate("KL01AB").explain()
+
+        self.assertIn("INDEX", plan)
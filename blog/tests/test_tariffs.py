@@ -0,0 +1,134 @@
+import datetime as dt
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from blog.models import (
+    Client,
+    ParkingLot,
+    ParkingSpace,
+    Reservation,
+    Tariff,
+    TariffBand,
+)
+from blog.tariffs import bump_tariff_version, quote_many
+
+UTC = dt.timezone.utc
+
+
+class TariffEngineTests(TestCase):
+    def setUp(self):
+        self.addCleanup(bump_tariff_version)
+        self.lot = ParkingLot.objects.create(lot_id=30, lot_capacity=5)
+        self.other_lot = ParkingLot.objects.create(lot_id=31, lot_capacity=5)
+        self.day = dt.datetime(2031, 3, 4, tzinfo=UTC)
+
+    def _at(self, hours):
+        return self.day + timedelta(hours=hours)
+
+    def test_default_rate_matches_previous_flat_pricing(self):
+        costs = quote_many(
+            [
+                (None, None, self._at(8), self._at(10)),
+                (self.lot.id, "BOX", self._at(8), self._at(8.5)),
+            ]
+        )
+
+        self.assertEqual(costs, [Decimal("5.00"), Decimal("1.25")])
+
+    def test_most_specific_tariff_and_bands_apply(self):
+        evening = Tariff.objects.create(
+            name="Lot 30", parking_lot=self.lot, hourly_rate=Decimal("4.00")
+        )
+        TariffBand.objects.create(
+            tariff=evening,
+            starts_at=dt.time(18),
+            ends_at=dt.time(6),
+            hourly_rate=Decimal("1.00"),
+        )
+        Tariff.objects.create(
+            name="Angular anywhere", space_type="Angular", hourly_rate=Decimal("3.00")
+        )
+
+        costs = quote_many(
+            [
+                (self.lot.id, "BOX", self._at(16), self._at(20)),
+                (self.lot.id, "BOX", self._at(23), self._at(25)),
+                (self.other_lot.id, "Angular", self._at(9), self._at(10)),
+                (self.other_lot.id, "BOX", self._at(9), self._at(10)),
+            ]
+        )
+
+        self.assertEqual(
+            costs,
+            [Decimal("10.00"), Decimal("2.00"), Decimal("3.00"), Decimal("2.50")],
+        )
+
+    def test_daily_cap_limits_each_calendar_day(self):
+        Tariff.objects.create(
+            name="Capped", hourly_rate=Decimal("2.00"), daily_cap=Decimal("10.00")
+        )
+
+        costs = quote_many(
+            [
+                (None, None, self._at(1), self._at(4)),
+                (None, None, self._at(0), self._at(12)),
+                (None, None, self._at(20), self._at(24 * 2 + 2)),
+            ]
+        )
+
+        self.assertEqual(costs, [Decimal("6.00"), Decimal("10.00"), Decimal("22.00")])
+
+    def test_bulk_quote_prices_thousands_of_windows(self):
+        windows = [
+            (self.lot.id, "BOX", self._at(n % 24), self._at(n % 24 + 1))
+            for n in range(5000)
+        ]
+        bump_tariff_version()
+
+        # Compiling the rate table is the only database work.
+        with self.assertNumQueries(2):
+            costs = quote_many(windows)
+
+        self.assertEqual(len(costs), 5000)
+        self.assertTrue(all(cost == Decimal("2.50") for cost in costs))
+
+
+class RecomputeCostsTests(TestCase):
+    def setUp(self):
+        self.addCleanup(bump_tariff_version)
+        customer = Client.objects.create(
+            full_name="Tariff Driver",
+            contact="1234567890",
+            plate_number="TRF01",
+            dimension=400,
+        )
+        self.space = ParkingSpace.objects.create(label="T1", dimension_limit=500)
+        start = timezone.now() + timedelta(days=1)
+        self.active = Reservation.objects.create(
+            client=customer,
+            parking_slot=self.space,
+            start_time=start,
+            end_time=start + timedelta(hours=2),
+        )
+        self.cancelled = Reservation.objects.create(
+            client=customer,
+            parking_slot=self.space,
+            start_time=start,
+            end_time=start + timedelta(hours=2),
+            reservation_status=Reservation.ReservationStatus.CANCELLED,
+        )
+
+    def test_rate_change_reprices_active_reservations_only(self):
+        Tariff.objects.create(name="New rate", hourly_rate=Decimal("3.00"))
+
+        call_command("recompute_reservation_costs", stdout=StringIO())
+        self.active.refresh_from_db()
+        self.cancelled.refresh_from_db()
+
+        self.assertEqual(self.active.total_cost, Decimal("6.00"))
+        self.assertEqual(self.cancelled.total_cost, Decimal("5.00"))
@@ -1,7 +1,13 @@
 from datetime import timedelta
+from unittest import mock
 
+from asgiref.sync import sync_to_async
 from django.contrib.auth.models import User
-from django.test import TestCase
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.utils import timezone
 
@@ -10,6 +16,7 @@ from blog.models import Client, ParkingLot, ParkingSpace, Reservation
 
 class ViewFlowTests(TestCase):
     def setUp(self):
+        cache.clear()
         self.user = User.objects.create_user(username="tester", password="strong-pass")
         self.customer = Client.objects.create(
             full_name="View Driver",
@@ -98,6 +105,19 @@ class ViewFlowTests(TestCase):
         self.assertEqual(response.status_code, 200)
         self.assertIn("spaces", response.context)
 
+    def test_parking_space_view_query_count_is_flat(self):
+        self.client.force_login(self.user)
+        self.client.get(reverse("parking_space_page"))
+        with CaptureQueriesContext(connection) as few_slots:
+            self.client.get(reverse("parking_space_page"))
+
+        for index in range(5):
+            ParkingSpace.objects.create(label=f"VX{index}", dimension_limit=500)
+        with CaptureQueriesContext(connection) as many_slots:
+            self.client.get(reverse("parking_space_page"))
+
+        self.assertEqual(len(many_slots), len(few_slots))
+
     def test_reservation_edit_and_delete(self):
         self.client.force_login(self.user)
         start = timezone.now() + timedelta(hours=1)
@@ -160,3 +180,447 @@ class ViewFlowTests(TestCase):
 
         self.assertEqual(response.status_code, 302)
         self.assertEqual(response.url, reverse("dashboard_page"))
+
+    @override_settings(RESERVATION_PAGE_SIZE=1)
+    def test_reservation_list_is_paginated_and_filtered(self):
+        self.client.force_login(self.user)
+        start = timezone.now() + timedelta(days=1)
+        for offset, status in enumerate(
+            [
+                Reservation.ReservationStatus.CONFIRMED,
+                Reservation.ReservationStatus.CANCELLED,
+            ]
+        ):
+            Reservation.objects.create(
+                client=self.customer,
+                parking_slot=self.space,
+                start_time=start + timedelta(hours=offset * 2),
+                end_time=start + timedelta(hours=offset * 2 + 1),
+                reservation_status=status,
+            )
+
+        first = self.client.get(reverse("reservation_page"))
+        self.assertEqual(len(first.context["reservations"]), 1)
+        self.assertIsNotNone(first.context["next_page_query"])
+
+        second = self.client.get(
+            reverse("reservation_page") + "?" + first.context["next_page_query"]
+        )
+        self.assertEqual(
+            second.context["reservations"].object_list[0].reservation_status,
+            Reservation.ReservationStatus.CONFIRMED,
+        )
+        self.assertIsNone(second.context["next_page_query"])
+
+        filtered = self.client.get(
+            reverse("reservation_page"),
+            {"status": Reservation.ReservationStatus.CANCELLED},
+        )
+        self.assertEqual(len(filtered.context["reservations"]), 1)
+        self.assertIsNone(filtered.context["next_page_query"])
+
+
+class AvailabilityApiTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="api", password="strong-pass")
+        self.lot = ParkingLot.objects.create(lot_id=7, lot_capacity=2)
+        self.booked = ParkingSpace.objects.create(
+            label="AP1", parking_lot=self.lot, dimension_limit=500
+        )
+        self.free = ParkingSpace.objects.create(
+            label="AP2", parking_lot=self.lot, dimension_limit=500
+        )
+        self.start = timezone.now() + timedelta(hours=1)
+        self.end = self.start + timedelta(hours=1)
+        Reservation.objects.create(
+            client=Client.objects.create(
+                full_name="Api Driver",
+                contact="1234567890",
+                plate_number="API01",
+                dimension=400,
+            ),
+            parking_slot=self.booked,
+            start_time=self.start,
+            end_time=self.end,
+            reservation_status=Reservation.ReservationStatus.CONFIRMED,
+        )
+
+    def test_returns_free_slots_as_json(self):
+        self.client.force_login(self.user)
+
+        response = self.client.get(
+            reverse("availability_api"),
+            {"start": self.start.isoformat(), "end": self.end.isoformat()},
+        )
+
+        self.assertEqual(response.status_code, 200)
+        payload = response.json()
+        self.assertEqual(payload["count"], 1)
+        self.assertEqual(payload["spaces"][0]["label"], "AP2")
+        self.assertEqual(payload["spaces"][0]["lot_number"], 7)
+        self.assertIn("max-age", response["Cache-Control"])
+
+    def test_rejects_invalid_window(self):
+        self.client.force_login(self.user)
+
+        response = self.client.get(
+            reverse("availability_api"),
+            {"start": self.end.isoformat(), "end": self.start.isoformat()},
+        )
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("error", response.json())
+
+
+class OccupancyApiTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="poller", password="strong-pass")
+        self.lot = ParkingLot.objects.create(lot_id=8, lot_capacity=3)
+        self.space = ParkingSpace.objects.create(
+            label="OA1", parking_lot=self.lot, dimension_limit=500
+        )
+        ParkingSpace.objects.create(label="OA2", parking_lot=self.lot, floor_number=2)
+        self.client.force_login(self.user)
+
+    def test_unchanged_data_revalidates_with_304(self):
+        first = self.client.get(reverse("lots_api"))
+        self.assertEqual(first.status_code, 200)
+        self.assertIn("no-cache", first["Cache-Control"])
+
+        again = self.client.get(reverse("lots_api"), HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(again.status_code, 304)
+
+    def test_reservation_write_changes_etag(self):
+        etag = self.client.get(reverse("spaces_api"))["ETag"]
+        Reservation.objects.create(
+            client=Client.objects.create(
+                full_name="Etag Driver",
+                contact="1234567890",
+                plate_number="ETAG01",
+                dimension=400,
+            ),
+            parking_slot=self.space,
+            start_time=timezone.now() - timedelta(minutes=5),
+            end_time=timezone.now() + timedelta(hours=1),
+            reservation_status=Reservation.ReservationStatus.CONFIRMED,
+        )
+
+        response = self.client.get(reverse("spaces_api"), HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_field_selection_and_column_layout(self):
+        lots = self.client.get(
+            reverse("lots_api"), {"fields": "lot_id,total_spaces,available_spaces"}
+        ).json()
+        self.assertEqual(
+            lots["results"],
+            [{"lot_id": 8, "total_spaces": 2, "available_spaces": 3}],
+        )
+
+        spaces = self.client.get(
+            reverse("spaces_api"),
+            {"fields": "label,floor_number", "layout": "columns", "floor": 2},
+        ).json()
+        self.assertEqual(spaces["fields"], ["label", "floor_number"])
+        self.assertEqual(spaces["rows"], [["OA2", 2]])
+
+    def test_rejects_unknown_field(self):
+        response = self.client.get(reverse("spaces_api"), {"fields": "label,secret"})
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("secret", response.json()["error"])
+
+
+class AsyncViewTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="async", password="strong-pass")
+        self.lot = ParkingLot.objects.create(lot_id=9, lot_capacity=2)
+        ParkingSpace.objects.create(label="AS1", parking_lot=self.lot)
+        ParkingSpace.objects.create(label="AS2", parking_lot=self.lot)
+        self.start = timezone.now() + timedelta(hours=1)
+        self.end = self.start + timedelta(hours=1)
+
+    async def test_dashboard_matches_sync_view(self):
+        response = await self.async_client.get(reverse("async_dashboard"))
+        self.assertEqual(response.status_code, 302)
+
+        await sync_to_async(self.client.force_login)(self.user)
+        await sync_to_async(self.async_client.force_login)(self.user)
+        response = await self.async_client.get(reverse("async_dashboard"))
+        expected = await sync_to_async(self.client.get)(reverse("dashboard_page"))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context["total_slots"], 2)
+        self.assertEqual(response.context["available_slots"], 2)
+        for key in ("total_clients", "total_slots", "available_slots"):
+            self.assertEqual(response.context[key], expected.context[key])
+
+    async def test_parking_lots_require_login(self):
+        response = await self.async_client.get(reverse("async_parking_lot"))
+        self.assertEqual(response.status_code, 302)
+
+        await sync_to_async(self.async_client.force_login)(self.user)
+        response = await self.async_client.get(reverse("async_parking_lot"))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context["lots"]), 1)
+
+    async def test_availability_matches_sync_and_revalidates(self):
+        await sync_to_async(self.client.force_login)(self.user)
+        await sync_to_async(self.async_client.force_login)(self.user)
+        params = {"start": self.start.isoformat(), "end": self.end.isoformat()}
+
+        response = await self.async_client.get(
+            reverse("async_availability_api"), params
+        )
+        expected = await sync_to_async(self.client.get)(
+            reverse("availability_api"), params
+        )
+
+        self.assertEqual(response.json(), expected.json())
+        self.assertEqual(response["ETag"], expected["ETag"])
+        again = await self.async_client.get(
+            reverse("async_availability_api"),
+            params,
+            headers={"if-none-match": response["ETag"]},
+        )
+        self.assertEqual(again.status_code, 304)
+
+
+class LoginModalTests(TestCase):
+    def test_anonymous_pages_render_the_login_modal(self):
+        response = self.client.get(reverse("index_page"))
+
+        self.assertContains(response, 'id="loginModal"')
+        self.assertContains(response, 'name="username"')
+
+    def test_signed_in_pages_never_build_the_form(self):
+        user = User.objects.create_user(username="modal", password="strong-pass")
+        self.client.force_login(user)
+
+        with mock.patch("blog.context_processors._login_form") as build:
+            response = self.client.get(reverse("about_us_page"))
+
+        self.assertNotContains(response, 'id="loginModal"')
+        build.assert_not_called()
+
+
+class AutocompleteTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="picker", password="strong-pass")
+        self.client.force_login(self.user)
+        self.van = Client.objects.create(
+            full_name="Anna  Van Dyke",
+            contact="1234567890",
+            plate_number="VAN01",
+            dimension=450,
+        )
+        Client.objects.create(
+            full_name="Bob Stone",
+            contact="1234567890",
+            plate_number="BOB01",
+            dimension=1,
+        )
+        ParkingSpace.objects.create(label="AC1", dimension_limit=400)
+        ParkingSpace.objects.create(label="AC2", dimension_limit=500)
+        ParkingSpace.objects.create(label="AC3", dimension_limit=600, is_active=False)
+
+    def test_clients_match_name_prefix_case_insensitively(self):
+        response = self.client.get(reverse("client_autocomplete"), {"q": "anna van"})
+
+        self.assertEqual(
+            response.json()["results"],
+            [{"id": self.van.pk, "text": "Anna  Van Dyke - VAN01", "dimension": 450}],
+        )
+
+    def test_slots_fit_the_client_and_are_active(self):
+        response = self.client.get(
+            reverse("slot_autocomplete"), {"q": "ac", "client": self.van.pk}
+        )
+
+        self.assertEqual(
+            [item["text"] for item in response.json()["results"]], ["AC2 (Floor 1)"]
+        )
+
+    def test_slots_match_the_indexed_label_key(self):
+        space = ParkingSpace.objects.get(label="AC1")
+        space.label = "Deck-1"
+        space.save(update_fields=["label"])
+
+        response = self.client.get(reverse("slot_autocomplete"), {"q": " dECK"})
+
+        self.assertEqual(ParkingSpace.objects.get(pk=space.pk).label_key, "deck-1")
+        self.assertEqual(
+            [item["id"] for item in response.json()["results"]], [space.pk]
+        )
+
+    def test_unknown_client_is_rejected(self):
+        response = self.client.get(reverse("slot_autocomplete"), {"client": 0})
+
+        self.assertEqual(response.status_code, 400)
+
+
+class ClientListTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="desk", password="strong-pass")
+        self.client.force_login(self.user)
+        self.clients = [
+            Client.objects.create(
+                full_name=f"Driver {index}",
+                contact=f"07000000{index}",
+                plate_number=f"AB-{index}",
+                dimension=400,
+            )
+            for index in range(3)
+        ]
+
+    @override_settings(CLIENT_PAGE_SIZE=2)
+    def test_list_is_cursor_paginated_newest_first(self):
+        first = self.client.get(reverse("client_page"))
+        self.assertEqual(
+            [entry.pk for entry in first.context["clients"]],
+            [self.clients[2].pk, self.clients[1].pk],
+        )
+
+        second = self.client.get(
+            reverse("client_page") + "?" + first.context["next_page_query"]
+        )
+        self.assertEqual(
+            [entry.pk for entry in second.context["clients"]], [self.clients[0].pk]
+        )
+
+    def test_list_filters_on_search_term(self):
+        response = self.client.get(reverse("client_page"), {"q": "ab1"})
+
+        self.assertEqual(list(response.context["clients"]), [self.clients[1]])
+
+    def test_search_api_finds_exact_plate(self):
+        response = self.client.get(reverse("client_search_api"), {"plate": "ab 2"})
+
+        payload = response.json()
+        self.assertEqual(payload["count"], 1)
+        self.assertEqual(payload["results"][0]["plate_number"], "AB-2")
+        self.assertEqual(self.client.get(reverse("client_search_api")).status_code, 400)
+
+    def test_search_api_rejects_non_positive_limit(self):
+        for limit in ("0", "-3"):
+            with self.subTest(limit=limit):
+                response = self.client.get(
+                    reverse("client_search_api"), {"q": "ab", "limit": limit}
+                )
+                self.assertEqual(response.status_code, 400)
+        limited = self.client.get(reverse("client_search_api"), {"q": "ab", "limit": 1})
+        self.assertEqual(limited.json()["count"], 1)
+
+
+class ReservationAdminImportTests(TestCase):
+    def test_upload_imports_rows(self):
+        admin_user = User.objects.create_superuser(
+            username="admin", password="strong-pass", email="admin@example.com"
+        )
+        customer = Client.objects.create(
+            full_name="Admin Import",
+            contact="1234567890",
+            plate_number="ADM01",
+            dimension=400,
+        )
+        ParkingSpace.objects.create(label="AD1", dimension_limit=500)
+        start = timezone.now() + timedelta(days=3)
+        upload = SimpleUploadedFile(
+            "bookings.csv",
+            (
+                "client_id,slot_label,start_time,end_time\n"
+                f"{customer.id},AD1,{start.isoformat()},"
+                f"{(start + timedelta(hours=1)).isoformat()}\n"
+            ).encode(),
+        )
+        self.client.force_login(admin_user)
+
+        response = self.client.post(
+            reverse("admin:blog_reservation_import"), {"file": upload}, follow=True
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(Reservation.objects.count(), 1)
+        self.assertContains(response, "Import CSV/JSONL")
+
+
+class DashboardCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="ops", password="strong-pass")
+        self.customer = Client.objects.create(
+            full_name="Dash Driver",
+            contact="1234567890",
+            plate_number="DASH01",
+            dimension=400,
+        )
+        self.space = ParkingSpace.objects.create(label="D1", dimension_limit=500)
+        self.client.force_login(self.user)
+
+    def test_stats_are_cached_until_a_write(self):
+        self.client.get(reverse("dashboard_page"))
+        with self.assertNumQueries(1):  # the authenticated user only
+            cached = self.client.get(reverse("dashboard_page"))
+        self.assertEqual(cached.context["total_clients"], 1)
+
+        start = timezone.now() + timedelta(hours=1)
+        Reservation.objects.create(
+            client=self.customer,
+            parking_slot=self.space,
+            start_time=start,
+            end_time=start + timedelta(hours=1),
+        )
+        refreshed = self.client.get(reverse("dashboard_page"))
+
+        self.assertEqual(refreshed.context["available_slots"], 0)
+        self.assertEqual(len(refreshed.context["upcoming_reservations"]), 1)
+
+
+class SlotDetailTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="slots", password="strong-pass")
+        self.customer = Client.objects.create(
+            full_name="Detail Driver",
+            contact="1234567890",
+            plate_number="DTL01",
+            dimension=400,
+        )
+        self.space = ParkingSpace.objects.create(label="S1", dimension_limit=500)
+        self.url = reverse("parking_space_detail", args=[self.space.id])
+        self.client.force_login(self.user)
+
+    def test_fragment_is_cached_and_invalidated_by_reservations(self):
+        first = self.client.get(self.url)
+        self.assertEqual(first.status_code, 200)
+        self.assertContains(first, "No active booking.")
+        with self.assertNumQueries(1):  # the authenticated user only
+            self.client.get(self.url)
+
+        start = timezone.now() + timedelta(hours=1)
+        Reservation.objects.create(
+            client=self.customer,
+            parking_slot=self.space,
+            start_time=start,
+            end_time=start + timedelta(hours=1),
+        )
+
+        self.assertContains(self.client.get(self.url), "Detail Driver")
+
+    def test_unknown_slot_is_404(self):
+        response = self.client.get(
+            reverse("parking_space_detail", args=[self.space.id + 100])
+        )
+
+        self.assertEqual(response.status_code, 404)
+
+    def test_list_page_no_longer_embeds_details(self):
+        response = self.client.get(reverse("parking_space_page"))
+
+        self.assertContains(response, self.url)
+        self.assertNotContains(response, "Recent reservations")
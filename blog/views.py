@@ -1,15 +1,61 @@
+import math
+from datetime import datetime, timedelta
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
 from django.contrib import messages
 from django.contrib.auth import login, logout
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.forms import AuthenticationForm, UserCreationForm
-from django.db.models import Count, Q
+from django.contrib.auth.views import redirect_to_login
+from django.core.cache import cache
+from django.core.exceptions import PermissionDenied
+from django.db.models import F
+from django.http import (
+    Http404,
+    HttpResponseNotAllowed,
+    JsonResponse,
+    StreamingHttpResponse,
+)
 from django.shortcuts import get_object_or_404, redirect, render
 from django.urls import reverse
 from django.utils import timezone
-
-from blog.forms import ClientForm, ParkingLotForm, ParkingSpaceForm, ReservationForm
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.dateparse import parse_date, parse_datetime
+from django.views.decorators.http import condition, require_GET, require_POST
+
+from blog.allocation import NoSlotAvailable, best_slot
+from blog.analytics import analytics_report
+from blog.exports import DATASETS as EXPORT_DATASETS
+from blog.exports import FORMATS as EXPORT_FORMATS
+from blog.exports import export_filename, export_stream
+from blog.forms import (
+    ClientForm,
+    ParkingLotForm,
+    ParkingSpaceForm,
+    ReservationFilterForm,
+    ReservationForm,
+)
+from blog.gate import GateError, check_in, check_out, current_booking
+from blog.live import event_stream
 from blog.models import Client, ParkingLot, ParkingSpace, Reservation
-from blog.services import refresh_parking_state
+from blog.pagination import InvalidCursor, KeysetPaginator
+from blog.sensors import BufferFull, parse_reports, sensor_buffer
+from blog.services import (
+    AUTOCOMPLETE_LIMIT,
+    aavailable_spaces,
+    adashboard_stats,
+    aoccupancy_version,
+    available_spaces,
+    clients_by_plate,
+    dashboard_stats,
+    filter_clients,
+    occupancy_version,
+    search_clients,
+    search_slots,
+    slot_detail,
+)
 
 
 def index_view(request):
@@ -22,32 +68,7 @@ def about_us_view(request):
 
 @login_required
 def dashboard_view(request):
-    refresh_parking_state()
-    now = timezone.now()
-    total_clients = Client.objects.count()
-    total_slots = ParkingSpace.objects.count()
-    available_slots = ParkingSpace.objects.filter(
-        is_active=True, is_occupied=False
-    ).count()
-    active_reservations = Reservation.objects.filter(
-        reservation_status__in=Reservation.ACTIVE_STATUSES,
-        start_time__lte=now,
-        end_time__gte=now,
-    )
-    upcoming_reservations = (
-        Reservation.objects.select_related("client", "parking_slot")
-        .filter(start_time__gte=now)
-        .order_by("start_time")[:5]
-    )
-
-    context = {
-        "total_clients": total_clients,
-        "total_slots": total_slots,
-        "available_slots": available_slots,
-        "active_reservations": active_reservations.count(),
-        "upcoming_reservations": upcoming_reservations,
-    }
-    return render(request, "dashboard.html", context)
+    return render(request, "dashboard.html", dashboard_stats())
 
 
 def cover_view(request):
@@ -85,7 +106,6 @@ def parking_view(request):
 
 @login_required
 def parking_lot_view(request):
-    refresh_parking_state()
     lot_form = ParkingLotForm(request.POST or None)
     show_modal = False
 
@@ -99,18 +119,8 @@ def parking_lot_view(request):
         )
         show_modal = True
 
-    lots = (
-        ParkingLot.objects.annotate(
-            total_spaces=Count("spaces"),
-            occupied_spaces=Count("spaces", filter=Q(spaces__is_occupied=True)),
-        )
-        .prefetch_related("spaces")
-        .order_by("lot_id")
-    )
-    for lot in lots:
-        capacity = lot.lot_capacity or lot.total_spaces
-        lot.available_spaces = max(capacity - lot.occupied_spaces, 0)
-        lot.capacity_display = capacity
+    # Counters are stored on the lot; the prefetch feeds the per-lot slot table.
+    lots = ParkingLot.objects.prefetch_related("spaces").order_by("lot_id")
 
     return render(
         request,
@@ -125,7 +135,6 @@ def parking_lot_view(request):
 
 @login_required
 def parking_space_view(request):
-    refresh_parking_state()
     spaces = (
         ParkingSpace.objects.select_related("parking_lot")
         .all()
@@ -136,7 +145,6 @@ def parking_space_view(request):
 
     if request.method == "POST" and form.is_valid():
         form.save()
-        refresh_parking_state()
         messages.success(request, "Parking slot created successfully.")
         return redirect("parking_space_page")
     elif request.method == "POST":
@@ -151,9 +159,6 @@ def parking_space_view(request):
     reservation_map = {res.parking_slot_id: res for res in active_reservations}
     for space in spaces:
         space.current_booking = reservation_map.get(space.id)
-        space.recent_reservations = list(
-            space.reservations.select_related("client").order_by("-start_time")[:5]
-        )
 
     return render(
         request,
@@ -166,9 +171,32 @@ def parking_space_view(request):
     )
 
 
+@login_required
+@require_GET
+def parking_space_detail_view(request, space_id):
+    """Detail fragment for one slot, fetched when its modal opens."""
+    detail = slot_detail(space_id)
+    if detail is None:
+        raise Http404("Parking slot not found.")
+    response = render(request, "partials/slot_detail.html", detail)
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
 @login_required
 def client_view(request):
-    clients = Client.objects.all().order_by("-created_at")
+    query = request.GET.get("q", "").strip()
+    paginator = KeysetPaginator(
+        filter_clients(Client.objects.all(), query),
+        ("-id",),
+        settings.CLIENT_PAGE_SIZE,
+    )
+    try:
+        clients = paginator.page(
+            after=request.GET.get("after"), before=request.GET.get("before")
+        )
+    except InvalidCursor:
+        clients = paginator.page()
     form = ClientForm(request.POST or None)
     show_modal = False
 
@@ -183,7 +211,14 @@ def client_view(request):
     return render(
         request,
         "client.html",
-        {"clients": clients, "form": form, "show_client_modal": show_modal},
+        {
+            "clients": clients,
+            "query": query,
+            "next_page_query": _page_query(request, after=clients.next_cursor),
+            "previous_page_query": _page_query(request, before=clients.previous_cursor),
+            "form": form,
+            "show_client_modal": show_modal,
+        },
     )
 
 
@@ -227,29 +262,56 @@ def delete_client_view(request, client_id):
     return render(request, "confirm_delete.html", {"object": client_obj})
 
 
+def _page_query(request, **cursor):
+    """Return the current query string with the page cursor replaced."""
+    ((name, value),) = cursor.items()
+    if value is None:
+        return None
+    query = request.GET.copy()
+    query.pop("after", None)
+    query.pop("before", None)
+    query[name] = value
+    return query.urlencode()
+
+
 @login_required
 def reservation_view(request):
-    refresh_parking_state()
-    reservations = (
-        Reservation.objects.select_related("client", "parking_slot")
-        .all()
-        .order_by("-start_time")
+    filters = ReservationFilterForm(request.GET or None)
+    paginator = KeysetPaginator(
+        filters.filter(Reservation.objects.select_related("client", "parking_slot")),
+        ("-start_time", "-id"),
+        settings.RESERVATION_PAGE_SIZE,
     )
+    try:
+        page = paginator.page(
+            after=request.GET.get("after"), before=request.GET.get("before")
+        )
+    except InvalidCursor:
+        page = paginator.page()
     form = ReservationForm(request.POST or None)
     show_modal = False
 
     if request.method == "POST" and form.is_valid():
-        form.save()
-        refresh_parking_state()
-        messages.success(request, "Reservation saved and slot locked.")
-        return redirect("reservation_page")
-    elif request.method == "POST":
+        try:
+            reservation = form.save()
+        except NoSlotAvailable as exc:
+            form.add_error("parking_slot", str(exc))
+        else:
+            messages.success(
+                request,
+                f"Reservation saved and slot {reservation.parking_slot.label} locked.",
+            )
+            return redirect("reservation_page")
+    if request.method == "POST":
         messages.error(request, "Something went wrong. Please review the form.")
         show_modal = True
 
     available_slots = ParkingSpace.objects.filter(is_active=True, is_occupied=False)
     context = {
-        "reservations": reservations,
+        "reservations": page,
+        "filters": filters,
+        "next_page_query": _page_query(request, after=page.next_cursor),
+        "previous_page_query": _page_query(request, before=page.previous_cursor),
         "form": form,
         "available_slots": available_slots.count(),
         "show_reservation_modal": show_modal,
@@ -264,7 +326,6 @@ def reservation_edit_view(request, reservation_id):
 
     if request.method == "POST" and form.is_valid():
         form.save()
-        refresh_parking_state()
         messages.success(request, "Reservation updated.")
         return redirect("reservation_page")
     elif request.method == "POST":
@@ -282,7 +343,6 @@ def reservation_delete_view(request, reservation_id):
     reservation_instance = get_object_or_404(Reservation, id=reservation_id)
     if request.method == "POST":
         reservation_instance.delete()
-        refresh_parking_state()
         messages.success(request, "Reservation deleted.")
         return redirect("reservation_page")
     return render(
@@ -304,3 +364,555 @@ def sign_up_view(request):
         messages.error(request, "We could not create that account.")
 
     return render(request, "sign_up.html", {"form": sign_up_form})
+
+
+def _datetime_param(request, name):
+    raw = request.GET.get(name)
+    value = parse_datetime(raw) if raw else None
+    if value is None:
+        raise ValueError(f"'{name}' must be an ISO 8601 datetime.")
+    if timezone.is_naive(value):
+        value = timezone.make_aware(value)
+    return value
+
+
+def _occupancy_etag(request, *args, **kwargs):
+    return f'"occupancy-{occupancy_version()}"'
+
+
+def _bool_param(request, name):
+    raw = request.GET.get(name)
+    if raw in (None, ""):
+        return None
+    if raw.lower() in ("1", "true", "yes"):
+        return True
+    if raw.lower() in ("0", "false", "no"):
+        return False
+    raise ValueError(f"'{name}' must be true or false.")
+
+
+def _fields_param(request, allowed):
+    raw = request.GET.get("fields")
+    if not raw:
+        return list(allowed)
+    fields = [name.strip() for name in raw.split(",") if name.strip()]
+    unknown = sorted(set(fields) - set(allowed))
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}.")
+    return fields
+
+
+def _api_response(request, records, fields):
+    """Serialize ``records`` compactly, as objects or as a column table."""
+    if request.GET.get("layout") == "columns":
+        payload = {
+            "fields": fields,
+            "rows": [[record[name] for name in fields] for record in records],
+        }
+    else:
+        payload = {
+            "results": [{name: record[name] for name in fields} for record in records]
+        }
+    payload["count"] = len(records)
+    response = JsonResponse(payload, json_dumps_params={"separators": (",", ":")})
+    # Pollers revalidate every time and mostly get a 304 back.
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+def _date_param(request, name, default):
+    raw = request.GET.get(name)
+    if not raw:
+        return default
+    value = parse_date(raw)
+    if value is None:
+        raise ValueError(f"'{name}' must be an ISO 8601 date.")
+    return value
+
+
+def _int_param(request, name):
+    raw = request.GET.get(name)
+    if raw in (None, ""):
+        return None
+    try:
+        return int(raw)
+    except ValueError:
+        raise ValueError(f"'{name}' must be an integer.") from None
+
+
+def _availability_filters(request):
+    """Parse the availability query string; raise ValueError when invalid."""
+    filters = {
+        "start": _datetime_param(request, "start"),
+        "end": _datetime_param(request, "end"),
+        "lot": _int_param(request, "lot"),
+        "floor": _int_param(request, "floor"),
+        "space_type": request.GET.get("type") or None,
+        "min_dimension": _int_param(request, "min_dimension"),
+    }
+    if filters["end"] <= filters["start"]:
+        raise ValueError("'end' must be later than 'start'.")
+    return filters
+
+
+def _availability_cache_key(version, filters):
+    # Keyed on the occupancy version so writes show up immediately.
+    return "availability:{}:{}:{}:{}:{}:{}:{}".format(
+        version,
+        filters["start"].isoformat(),
+        filters["end"].isoformat(),
+        filters["lot"],
+        filters["floor"],
+        filters["space_type"],
+        filters["min_dimension"],
+    )
+
+
+def _space_filters(filters):
+    return {
+        name: filters[name] for name in ("lot", "floor", "space_type", "min_dimension")
+    }
+
+
+def _availability_rows(spaces):
+    return spaces.values(
+        "id",
+        "label",
+        "floor_number",
+        "space_type",
+        "dimension_limit",
+        lot=F("parking_lot_id"),
+        lot_number=F("parking_lot__lot_id"),
+    )
+
+
+def _availability_payload(filters, spaces):
+    return {
+        "start": filters["start"].isoformat(),
+        "end": filters["end"].isoformat(),
+        "spaces": spaces,
+        "count": len(spaces),
+    }
+
+
+def _availability_response(payload):
+    response = JsonResponse(payload)
+    patch_cache_control(
+        response, private=True, max_age=settings.AVAILABILITY_CACHE_SECONDS
+    )
+    return response
+
+
+@login_required
+@require_GET
+@condition(etag_func=_occupancy_etag)
+def availability_api_view(request):
+    """Return every active slot that is free for the requested window."""
+    try:
+        filters = _availability_filters(request)
+    except ValueError as exc:
+        return JsonResponse({"error": str(exc)}, status=400)
+
+    cache_key = _availability_cache_key(occupancy_version(), filters)
+    payload = cache.get(cache_key)
+    if payload is None:
+        spaces = available_spaces(
+            filters["start"], filters["end"], **_space_filters(filters)
+        )
+        payload = _availability_payload(filters, list(_availability_rows(spaces)))
+        cache.set(cache_key, payload, settings.AVAILABILITY_CACHE_SECONDS)
+    return _availability_response(payload)
+
+
+@login_required
+@require_GET
+def analytics_api_view(request):
+    """Occupancy heatmaps and revenue for ``[start, end)``, last 30 days by default."""
+    today = timezone.localdate()
+    try:
+        start = _date_param(request, "start", today - timedelta(days=30))
+        end = _date_param(request, "end", today + timedelta(days=1))
+        lot = _int_param(request, "lot")
+        report = analytics_report(start, end, lot=lot)
+    except ValueError as exc:
+        return JsonResponse({"error": str(exc)}, status=400)
+
+    response = JsonResponse(report)
+    patch_cache_control(
+        response, private=True, max_age=settings.ANALYTICS_CACHE_SECONDS
+    )
+    return response
+
+
+@login_required
+@require_GET
+def export_view(request, dataset):
+    """Stream every reservation or client as CSV or JSON Lines."""
+    if dataset not in EXPORT_DATASETS:
+        raise Http404("Unknown export.")
+    if not request.user.has_perm(EXPORT_DATASETS[dataset]):
+        raise PermissionDenied
+    fmt = request.GET.get("format", "csv")
+    compress = request.GET.get("gzip") in ("1", "true", "yes")
+    filters = {}
+    try:
+        if fmt not in EXPORT_FORMATS:
+            raise ValueError(f"'format' must be one of {', '.join(EXPORT_FORMATS)}.")
+        if dataset == "reservations":
+            for name in ("start", "end"):
+                day = _date_param(request, name, None)
+                if day is not None:
+                    filters[name] = timezone.make_aware(
+                        datetime.combine(day, datetime.min.time())
+                    )
+            filters["status"] = request.GET.get("status") or None
+    except ValueError as exc:
+        return JsonResponse({"error": str(exc)}, status=400)
+
+    if compress:
+        content_type = "application/gzip"
+    else:
+        content_type = "text/csv" if fmt == "csv" else "application/x-ndjson"
+    response = StreamingHttpResponse(
+        export_stream(dataset, fmt, compress=compress, **filters),
+        content_type=content_type,
+    )
+    filename = export_filename(dataset, fmt, compress)
+    response["Content-Disposition"] = f'attachment; filename="{filename}"'
+    patch_cache_control(response, private=True, no_store=True)
+    return response
+
+
+LOT_API_FIELDS = (
+    "id",
+    "lot_id",
+    "current_status",
+    "capacity",
+    "total_spaces",
+    "occupied_spaces",
+    "available_spaces",
+)
+SPACE_API_FIELDS = {
+    "id": "id",
+    "label": "label",
+    "lot": "parking_lot_id",
+    "floor_number": "floor_number",
+    "space_type": "space_type",
+    "dimension_limit": "dimension_limit",
+    "is_active": "is_active",
+    "is_occupied": "is_occupied",
+    "sensor_occupied": "sensor_occupied",
+}
+
+
+@login_required
+@require_GET
+@condition(etag_func=_occupancy_etag)
+def lots_api_view(request):
+    """List parking lots with their stored slot counters."""
+    try:
+        fields = _fields_param(request, LOT_API_FIELDS)
+    except ValueError as exc:
+        return JsonResponse({"error": str(exc)}, status=400)
+    records = [
+        {name: getattr(lot, name) for name in LOT_API_FIELDS}
+        for lot in ParkingLot.objects.order_by("lot_id", "pk")
+    ]
+    return _api_response(request, records, fields)
+
+
+@login_required
+@require_GET
+@condition(etag_func=_occupancy_etag)
+def spaces_api_view(request):
+    """List parking slots, optionally filtered by lot, floor, type and state."""
+    try:
+        fields = _fields_param(request, SPACE_API_FIELDS)
+        lot = _int_param(request, "lot")
+        floor = _int_param(request, "floor")
+        active = _bool_param(request, "active")
+        occupied = _bool_param(request, "occupied")
+    except ValueError as exc:
+        return JsonResponse({"error": str(exc)}, status=400)
+
+    spaces = ParkingSpace.objects.order_by("floor_number", "label")
+    if lot is not None:
+        spaces = spaces.filter(parking_lot_id=lot)
+    if floor is not None:
+        spaces = spaces.filter(floor_number=floor)
+    if request.GET.get("type"):
+        spaces = spaces.filter(space_type=request.GET["type"])
+    if active is not None:
+        spaces = spaces.filter(is_active=active)
+    if occupied is not None:
+        spaces = spaces.filter(is_occupied=occupied)
+    columns = [SPACE_API_FIELDS[name] for name in fields]
+    records = [dict(zip(fields, row)) for row in spaces.values_list(*columns)]
+    return _api_response(request, records, fields)
+
+
+@login_required
+@require_GET
+def client_autocomplete_view(request):
+    """Clients whose name, plate or contact starts with ``q``, for the pickers."""
+    results = [
+        {"id": client.pk, "text": str(client), "dimension": client.dimension}
+        for client in search_clients(request.GET.get("q", "")).only(
+            "id", "full_name", "plate_number", "dimension"
+        )
+    ]
+    return JsonResponse({"results": results})
+
+
+CLIENT_SEARCH_FIELDS = (
+    "id",
+    "full_name",
+    "plate_number",
+    "contact",
+    "dimension",
+    "car_type",
+)
+
+
+@login_required
+@require_GET
+def client_search_api_view(request):
+    """Find clients by exact ``plate`` or by a name, plate or contact prefix ``q``."""
+    try:
+        limit = _int_param(request, "limit")
+    except ValueError as exc:
+        return JsonResponse({"error": str(exc)}, status=400)
+    if limit is not None and limit < 1:
+        return JsonResponse({"error": "'limit' must be at least 1."}, status=400)
+    limit = min(limit or AUTOCOMPLETE_LIMIT, 100)
+    if "plate" in request.GET:
+        clients = clients_by_plate(request.GET["plate"]).order_by("pk")[:limit]
+    elif request.GET.get("q", "").strip():
+        clients = search_clients(request.GET["q"], limit=limit)
+    else:
+        return JsonResponse({"error": "Pass 'q' or 'plate'."}, status=400)
+    results = list(clients.values(*CLIENT_SEARCH_FIELDS))
+    return JsonResponse({"results": results, "count": len(results)})
+
+
+@login_required
+@require_GET
+def slot_autocomplete_view(request):
+    """Active slots labelled ``q...``; with ``client``, only those that fit it."""
+    try:
+        client_id = _int_param(request, "client")
+    except ValueError as exc:
+        return JsonResponse({"error": str(exc)}, status=400)
+    dimension = None
+    if client_id is not None:
+        dimension = (
+            Client.objects.filter(pk=client_id)
+            .values_list("dimension", flat=True)
+            .first()
+        )
+        if dimension is None:
+            return JsonResponse({"error": "Unknown client."}, status=400)
+    results = [
+        {
+            "id": space.pk,
+            "text": str(space),
+            "dimension_limit": space.dimension_limit,
+        }
+        for space in search_slots(request.GET.get("q", ""), dimension=dimension)
+    ]
+    return JsonResponse({"results": results})
+
+
+@login_required
+@require_GET
+def best_slot_api_view(request):
+    """The smallest free slot fitting ``client`` for ``start``..``end``, or null."""
+    try:
+        start = _datetime_param(request, "start")
+        end = _datetime_param(request, "end")
+        if end <= start:
+            raise ValueError("'end' must be after 'start'.")
+        client_id = _int_param(request, "client")
+        if client_id is None:
+            raise ValueError("Pass 'client'.")
+        lot = _int_param(request, "lot")
+        floor = _int_param(request, "floor")
+    except ValueError as exc:
+        return JsonResponse({"error": str(exc)}, status=400)
+    client = get_object_or_404(Client, pk=client_id)
+    slot_id = best_slot(client.dimension, start, end, lot=lot, floor=floor)
+    slot = None
+    if slot_id is not None:
+        slot = (
+            ParkingSpace.objects.filter(pk=slot_id)
+            .values(
+                "id", "label", "floor_number", "dimension_limit", lot=F("parking_lot")
+            )
+            .first()
+        )
+    return JsonResponse({"client": client.pk, "slot": slot})
+
+
+@login_required
+@require_GET
+def gate_lookup_view(request):
+    """The booking ``plate`` may enter on right now, or null."""
+    plate = request.GET.get("plate", "").strip()
+    if not plate:
+        return JsonResponse({"error": "Pass 'plate'."}, status=400)
+    return JsonResponse({"plate": plate, "reservation": current_booking(plate)})
+
+
+def _gate_action(request, action):
+    if not request.user.has_perm("blog.change_reservation"):
+        raise PermissionDenied
+    plate = request.POST.get("plate", "").strip()
+    if not plate:
+        return JsonResponse({"error": "Pass 'plate'."}, status=400)
+    try:
+        booking = action(plate)
+    except GateError as exc:
+        return JsonResponse({"error": str(exc)}, status=409)
+    return JsonResponse({"plate": plate, "reservation": booking})
+
+
+@login_required
+@require_POST
+def gate_check_in_view(request):
+    """Record the arrival of ``plate`` on its current booking."""
+    return _gate_action(request, check_in)
+
+
+@login_required
+@require_POST
+def gate_check_out_view(request):
+    """Record the departure of ``plate`` and complete its booking."""
+    return _gate_action(request, check_out)
+
+
+@login_required
+@require_POST
+def sensor_events_view(request):
+    """Queue a batch of bay sensor reports for the next flush."""
+    if not request.user.has_perm("blog.change_parkingspace"):
+        raise PermissionDenied
+    try:
+        reports = parse_reports(request.body)
+    except ValueError as exc:
+        return JsonResponse({"error": str(exc)}, status=400)
+    try:
+        accepted = sensor_buffer.offer(reports)
+    except BufferFull as exc:
+        response = JsonResponse({"error": str(exc)}, status=503)
+        response["Retry-After"] = str(max(math.ceil(settings.SENSOR_FLUSH_SECONDS), 1))
+        return response
+    return JsonResponse({"accepted": accepted}, status=202)
+
+
+@login_required
+@require_GET
+def sensor_metrics_view(request):
+    """Ingestion rate, flush latency and totals of this worker's sensor buffer."""
+    return JsonResponse(sensor_buffer.metrics())
+
+
+def alogin_required(view):
+    """``login_required`` for async views; Django wraps only sync ones before 5.1."""
+
+    @wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        if not await sync_to_async(lambda: request.user.is_authenticated)():
+            return redirect_to_login(request.get_full_path())
+        return await view(request, *args, **kwargs)
+
+    return wrapper
+
+
+def arequire_GET(view):
+    """``require_GET`` for async views."""
+
+    @wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        if request.method != "GET":
+            return HttpResponseNotAllowed(["GET"])
+        return await view(request, *args, **kwargs)
+
+    return wrapper
+
+
+# Async variants of the read-heavy pages, routed under /async/ next to the sync
+# ones. Querysets are evaluated with the async ORM before rendering, and the
+# render itself runs in a worker thread because templates may still touch the
+# session or the user.
+
+
+@alogin_required
+@arequire_GET
+async def async_dashboard_view(request):
+    stats = await adashboard_stats()
+    return await sync_to_async(render)(request, "dashboard.html", stats)
+
+
+@alogin_required
+@arequire_GET
+async def async_parking_lot_view(request):
+    lots = [
+        lot
+        async for lot in ParkingLot.objects.prefetch_related("spaces").order_by(
+            "lot_id"
+        )
+    ]
+    return await sync_to_async(render)(
+        request,
+        "ParkingLot.html",
+        {"lots": lots, "lot_form": ParkingLotForm(), "show_lot_modal": False},
+    )
+
+
+@alogin_required
+@arequire_GET
+async def async_availability_api_view(request):
+    """Async ``availability_api_view``, sharing its cache entries and ETag."""
+    try:
+        filters = _availability_filters(request)
+    except ValueError as exc:
+        return JsonResponse({"error": str(exc)}, status=400)
+
+    version = await aoccupancy_version()
+    etag = f'"occupancy-{version}"'
+    not_modified = get_conditional_response(request, etag=etag)
+    if not_modified is not None:
+        return not_modified
+
+    cache_key = _availability_cache_key(version, filters)
+    payload = await cache.aget(cache_key)
+    if payload is None:
+        spaces = await aavailable_spaces(
+            filters["start"], filters["end"], **_space_filters(filters)
+        )
+        spaces = [row async for row in _availability_rows(spaces)]
+        payload = _availability_payload(filters, spaces)
+        await cache.aset(cache_key, payload, settings.AVAILABILITY_CACHE_SECONDS)
+    response = _availability_response(payload)
+    response["ETag"] = etag
+    return response
+
+
+@alogin_required
+@arequire_GET
+async def live_occupancy_view(request):
+    """Stream lot and slot occupancy changes as Server-Sent Events.
+
+    Async so that, served over ASGI, an idle subscriber holds no thread.
+    """
+    try:
+        lot = _int_param(request, "lot")
+    except ValueError as exc:
+        return JsonResponse({"error": str(exc)}, status=400)
+    response = StreamingHttpResponse(
+        event_stream(lot=lot), content_type="text/event-stream"
+    )
+    response["Cache-Control"] = "no-cache"
+    # Keep nginx from buffering the stream.
+    response["X-Accel-Buffering"] = "no"
+    return response
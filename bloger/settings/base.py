@@ -150,6 +150,60 @@ CACHES = {
 }
 SESSION_ENGINE = "django.contrib.sessions.backends.cache"
 
+# Reservation numbers each worker reserves per round-trip (see blog.sequences).
+RESERVATION_NUMBER_BLOCK_SIZE = env.int("RESERVATION_NUMBER_BLOCK_SIZE", default=20)
+
+# Background occupancy reconciler (`manage.py reconcile_occupancy`).
+OCCUPANCY_RECONCILE_INTERVAL = env.float("OCCUPANCY_RECONCILE_INTERVAL", default=30)
+OCCUPANCY_FULL_RECONCILE_EVERY = env.int("OCCUPANCY_FULL_RECONCILE_EVERY", default=20)
+
+# Rows per page of the reservation list (keyset paginated).
+RESERVATION_PAGE_SIZE = env.int("RESERVATION_PAGE_SIZE", default=50)
+# Rows per page of the client list (keyset paginated).
+CLIENT_PAGE_SIZE = env.int("CLIENT_PAGE_SIZE", default=50)
+# Occupancy history (`manage.py rollup_occupancy`): raw minute snapshots and
+# hourly rollups are dropped after these many days; daily rollups are kept.
+OCCUPANCY_SNAPSHOT_RETENTION_DAYS = env.int(
+    "OCCUPANCY_SNAPSHOT_RETENTION_DAYS", default=14
+)
+OCCUPANCY_HOURLY_RETENTION_DAYS = env.int(
+    "OCCUPANCY_HOURLY_RETENTION_DAYS", default=400
+)
+
+# Upper bound on how stale the cached dashboard counters may get.
+DASHBOARD_CACHE_SECONDS = env.int("DASHBOARD_CACHE_SECONDS", default=60)
+
+# How long an analytics report for a date range may be served from cache.
+ANALYTICS_CACHE_SECONDS = env.int("ANALYTICS_CACHE_SECONDS", default=900)
+
+# How long a slot's detail fragment may be served from cache.
+SLOT_DETAIL_CACHE_SECONDS = env.int("SLOT_DETAIL_CACHE_SECONDS", default=300)
+
+# Gate check-in/check-out: upper bound on how long a plate's cached bookings
+# are served, and how early before its start a booking lets a vehicle in.
+# Writes only drop the entries in their own worker's cache, so with several
+# workers use a shared CACHE_URL or keep GATE_CACHE_SECONDS short.
+GATE_CACHE_SECONDS = env.int("GATE_CACHE_SECONDS", default=300)
+GATE_EARLY_ARRIVAL_MINUTES = env.int("GATE_EARLY_ARRIVAL_MINUTES", default=15)
+
+# Bay sensor ingestion (/api/sensors/events/): flush interval of the write-behind
+# buffer, slots it may hold before refusing batches, and events per batch.
+SENSOR_FLUSH_SECONDS = env.float("SENSOR_FLUSH_SECONDS", default=0.5)
+SENSOR_MAX_PENDING = env.int("SENSOR_MAX_PENDING", default=10000)
+SENSOR_BATCH_MAX = env.int("SENSOR_BATCH_MAX", default=1000)
+
+# How long availability search results may be served from cache.
+AVAILABILITY_CACHE_SECONDS = env.int("AVAILABILITY_CACHE_SECONDS", default=15)
+# Bucket size of the availability bitmap index; must divide 1440. Changing it
+# requires `manage.py rebuild_availability_index`.
+AVAILABILITY_BUCKET_MINUTES = env.int("AVAILABILITY_BUCKET_MINUTES", default=15)
+
+# Live occupancy feed (/live/occupancy/): how often each worker checks for
+# changes, the heartbeat interval and how long one stream stays open.
+LIVE_POLL_SECONDS = env.float("LIVE_POLL_SECONDS", default=1.0)
+LIVE_HEARTBEAT_SECONDS = env.float("LIVE_HEARTBEAT_SECONDS", default=15)
+LIVE_STREAM_SECONDS = env.float("LIVE_STREAM_SECONDS", default=600)
+
 ADMINS = parse_admins(env.list("ADMINS", default=[]))
 EMAIL_BACKEND = env("EMAIL_BACKEND")
 DEFAULT_FROM_EMAIL = env("DEFAULT_FROM_EMAIL", default="webmaster@localhost")
@@ -8,21 +8,40 @@ from django.urls import include, path
 from blog.views import (
     about_us_view,
     add_client_view,
+    analytics_api_view,
+    async_availability_api_view,
+    async_dashboard_view,
+    async_parking_lot_view,
+    availability_api_view,
+    best_slot_api_view,
+    client_autocomplete_view,
+    client_search_api_view,
     client_view,
     cover_view,
     dashboard_view,
     delete_client_view,
     edit_client_view,
+    export_view,
+    gate_check_in_view,
+    gate_check_out_view,
+    gate_lookup_view,
     index_view,
+    live_occupancy_view,
     login_view,
     logout_view,
+    lots_api_view,
     parking_lot_view,
+    parking_space_detail_view,
     parking_space_view,
     parking_view,
     reservation_delete_view,
     reservation_edit_view,
     reservation_view,
+    sensor_events_view,
+    sensor_metrics_view,
     sign_up_view,
+    slot_autocomplete_view,
+    spaces_api_view,
 )
 
 urlpatterns = [
@@ -37,6 +56,11 @@ urlpatterns = [
     path("parking/", parking_view, name="parking_page"),
     path("parking_lot/", parking_lot_view, name="parking_lot_page"),
     path("parking_space/", parking_space_view, name="parking_space_page"),
+    path(
+        "parking_space/<int:space_id>/detail/",
+        parking_space_detail_view,
+        name="parking_space_detail",
+    ),
     path("reservation/", reservation_view, name="reservation_page"),
     path(
         "reservation/<int:reservation_id>/edit/",
@@ -54,6 +78,32 @@ urlpatterns = [
         "delete_client/<int:client_id>/", delete_client_view, name="delete_client_page"
     ),
     path("sign_up/", sign_up_view, name="sign_up_page"),
+    path("api/lots/", lots_api_view, name="lots_api"),
+    path("api/clients/", client_search_api_view, name="client_search_api"),
+    path(
+        "api/autocomplete/clients/",
+        client_autocomplete_view,
+        name="client_autocomplete",
+    ),
+    path("api/autocomplete/slots/", slot_autocomplete_view, name="slot_autocomplete"),
+    path("api/spaces/", spaces_api_view, name="spaces_api"),
+    path("api/sensors/events/", sensor_events_view, name="sensor_events"),
+    path("api/sensors/metrics/", sensor_metrics_view, name="sensor_metrics"),
+    path("api/gate/", gate_lookup_view, name="gate_lookup"),
+    path("api/gate/check-in/", gate_check_in_view, name="gate_check_in"),
+    path("api/gate/check-out/", gate_check_out_view, name="gate_check_out"),
+    path("api/availability/", availability_api_view, name="availability_api"),
+    path("api/best-slot/", best_slot_api_view, name="best_slot_api"),
+    path("live/occupancy/", live_occupancy_view, name="live_occupancy"),
+    path("async/dashboard/", async_dashboard_view, name="async_dashboard"),
+    path("async/parking_lot/", async_parking_lot_view, name="async_parking_lot"),
+    path(
+        "async/api/availability/",
+        async_availability_api_view,
+        name="async_availability_api",
+    ),
+    path("api/analytics/", analytics_api_view, name="analytics_api"),
+    path("export/<str:dataset>/", export_view, name="export"),
 ]
 
 if settings.DEBUG and "debug_toolbar" in settings.INSTALLED_APPS:
@@ -0,0 +1,64 @@
+// Search boxes rendered by blog.forms.AutocompleteInput. Matches are fetched
+// as the user types; picking one stores its id in the hidden input.
+document.addEventListener('DOMContentLoaded', function () {
+    document.querySelectorAll('[data-autocomplete-url]').forEach((box) => {
+        const hidden = box.querySelector('[data-autocomplete-value]');
+        const input = box.querySelector('[data-autocomplete-input]');
+        const options = box.querySelector('datalist');
+        const form = box.closest('form');
+        const forward = (box.dataset.autocompleteForward || '').split(',').filter(Boolean);
+        let matches = new Map();
+        let timer = null;
+
+        const choose = () => {
+            const id = matches.get(input.value);
+            const value = id === undefined ? '' : String(id);
+            if (hidden.value === value) return;
+            hidden.value = value;
+            hidden.dispatchEvent(new Event('change', {bubbles: true}));
+        };
+
+        const search = () => {
+            const params = new URLSearchParams({q: input.value});
+            forward.forEach((name) => {
+                const other = form && form.querySelector(`[name="${name}"]`);
+                if (other && other.value) params.set(name, other.value);
+            });
+            fetch(`${box.dataset.autocompleteUrl}?${params}`, {credentials: 'same-origin'})
+                .then((response) => (response.ok ? response.json() : {results: []}))
+                .then((payload) => {
+                    matches = new Map(payload.results.map((item) => [item.text, item.id]));
+                    options.replaceChildren(...payload.results.map((item) => {
+                        const option = document.createElement('option');
+                        option.value = item.text;
+                        return option;
+                    }));
+                    choose();
+                })
+                .catch(() => {});
+        };
+
+        input.addEventListener('input', () => {
+            if (matches.has(input.value)) {
+                choose();
+                return;
+            }
+            clearTimeout(timer);
+            timer = setTimeout(search, 200);
+        });
+        // Offer the first matches when an empty box is focused.
+        input.addEventListener('focus', () => {
+            if (!input.value && !matches.size) search();
+        });
+
+        // A new client can change which slots fit, so drop stale matches.
+        if (form && forward.length) {
+            form.addEventListener('change', (event) => {
+                if (forward.includes(event.target.name)) {
+                    matches = new Map();
+                    options.replaceChildren();
+                }
+            });
+        }
+    });
+});